@@ -0,0 +1,257 @@
+"""Image uploads: EXIF stripping and fixed-size variants.
+
+A variant is the original scaled down (never up) to fit a square box and
+written in each of a few formats under ``<upload dir>/variants/``.  The
+resulting dict is stored on the owning model, so rendering a variant is a URL
+lookup:
+
+    {'small': {'width': 96, 'height': 72, 'webp': 'unit_images/variants/x-small.webp',
+               'jpg': 'unit_images/variants/x-small.jpg'}, ...}
+
+Rank insignia are built synchronously by rank.insignia.  Fields registered with
+track_image_variants() are handled off the request: a new upload is re-encoded
+without its EXIF metadata when it is saved and its variants field is reset to
+``{}``, which marks it pending for the build_image_variants worker.  The
+worker also strips EXIF from originals stored before uploads were cleaned.
+"""
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_delete, pre_save
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Transparent insignia keep PNG as the fallback format; photos use JPEG
+VARIANT_FORMATS = (
+    ('webp', 'WEBP', {'quality': 85, 'method': 6}),
+    ('png', 'PNG', {'optimize': True}),
+)
+PHOTO_FORMATS = (
+    ('webp', 'WEBP', {'quality': 80, 'method': 6}),
+    ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+# Boxes cover 2x displays: 'small' for avatars/icons up to 48px, 'medium' up to 120px
+PHOTO_SIZES = (('small', 96), ('medium', 240), ('large', 1024))
+
+# Sent by build_pending_variants with the model as sender and the row's pk
+variants_built = Signal()
+
+# (model, image field name) -> (variants field name, sizes)
+_tracked = {}
+
+
+def _variant_name(name, size_name, ext):
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(directory, 'variants', f"{stem}-{size_name}.{ext}")
+
+
+def build_variants(storage, name, sizes, formats=VARIANT_FORMATS):
+    """Write variants of the stored image ``name`` for each ``(size_name, box)``; return their names.
+
+    Sizes larger than the original are skipped, except that the smallest size
+    is always written so there is at least one variant.
+    """
+    with storage.open(name, 'rb') as fh, Image.open(fh) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+
+    variants = {}
+    for index, (size_name, box) in enumerate(sorted(sizes, key=lambda size: size[1])):
+        if index and box > max(image.size):
+            break
+        resized = image.copy()
+        resized.thumbnail((box, box), Image.Resampling.LANCZOS)
+        variant = {'width': resized.width, 'height': resized.height}
+        for ext, pil_format, options in formats:
+            frame = resized
+            if pil_format == 'JPEG' and frame.mode == 'RGBA':
+                frame = Image.new('RGB', frame.size, (255, 255, 255))
+                frame.paste(resized, mask=resized.getchannel('A'))
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, **options)
+            variant[ext] = storage.save(_variant_name(name, size_name, ext), ContentFile(buffer.getvalue()))
+        variants[size_name] = variant
+    return variants
+
+
+def delete_variants(storage, variants):
+    """Remove the files listed in a build_variants() result"""
+    for variant in (variants or {}).values():
+        if isinstance(variant, dict):
+            for key, value in variant.items():
+                if key not in ('width', 'height'):
+                    storage.delete(value)
+
+
+def variant_urls(field_file, size_name):
+    """``(webp_url, fallback_url)`` of one variant of a tracked image, or None if none have been built"""
+    instance = getattr(field_file, 'instance', None)
+    if not field_file or instance is None:
+        return None
+    tracked = _tracked.get((instance._meta.concrete_model, field_file.field.name))
+    variants = (getattr(instance, tracked[0], None) or {}) if tracked else {}
+    variant = variants.get(size_name)
+    if variant is None:
+        # Sizes larger than the original are not built; the largest one that was stands in
+        variant = max(
+            (built for built in variants.values() if isinstance(built, dict)),
+            key=lambda built: built['width'], default=None,
+        )
+    if not isinstance(variant, dict):
+        return None
+    fallback = variant.get('jpg') or variant.get('png')
+    return field_file.storage.url(variant['webp']), field_file.storage.url(fallback)
+
+
+def variant_url(field_file, size_name):
+    """Fallback-format (JPEG/PNG) URL of a variant, or the original's URL until it is built"""
+    if not field_file:
+        return ''
+    urls = variant_urls(field_file, size_name)
+    return urls[1] if urls else field_file.url
+
+
+_EXTENSIONS = {'JPEG': ('.jpg', '.jpeg'), 'PNG': ('.png',), 'WEBP': ('.webp',)}
+
+
+def strip_metadata(upload):
+    """Re-encode a JPEG/PNG/WebP upload without EXIF (orientation applied); returns a ContentFile or None.
+
+    GIFs are returned as None (kept as uploaded): they carry no EXIF and
+    re-encoding would drop animation.
+    """
+    upload.seek(0)
+    with Image.open(upload) as source:
+        image_format = 'JPEG' if source.format == 'MPO' else source.format
+        if image_format not in ('JPEG', 'PNG', 'WEBP'):
+            return None
+        icc_profile = source.info.get('icc_profile')
+        image = ImageOps.exif_transpose(source)
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L', 'CMYK'):
+            image = image.convert('RGB')
+        options = {'quality': 90} if image_format in ('JPEG', 'WEBP') else {'optimize': True}
+        if icc_profile:
+            options['icc_profile'] = icc_profile
+        buffer = io.BytesIO()
+        image.save(buffer, image_format, **options)
+    stem, ext = os.path.splitext(os.path.basename(upload.name))
+    if ext.lower() not in _EXTENSIONS[image_format]:
+        ext = _EXTENSIONS[image_format][0]
+    return ContentFile(buffer.getvalue(), name=stem + ext)
+
+
+def rewrite_without_metadata(storage, name):
+    """Store a copy of the original ``name`` without EXIF if it still has any; returns the name to use.
+
+    Covers files uploaded before uploads were stripped.  The copy gets a new
+    name; the caller deletes whichever file ends up unreferenced.
+    """
+    with storage.open(name, 'rb') as fh:
+        with Image.open(fh) as source:
+            if not (source.info.get('exif') or source.getexif()):
+                return name
+        cleaned = strip_metadata(fh)
+    if cleaned is None:
+        return name
+    return storage.save(os.path.join(os.path.dirname(name), cleaned.name), cleaned)
+
+
+def track_image_variants(model, field_name, variants_field, sizes=PHOTO_SIZES):
+    """Strip EXIF from new uploads of ``model.field_name`` and queue their variants for the worker"""
+    _tracked[model, field_name] = (variants_field, sizes)
+    uid = f"{model._meta.label}.{field_name}"
+
+    def prepare_upload(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or (update_fields is not None and field_name not in update_fields):
+            return
+        field_file = getattr(instance, field_name)
+        old_variants = getattr(instance, variants_field)
+        if field_file and field_file._committed:
+            return
+        if field_file:
+            # An uncommitted file is a new upload, written to storage by this save
+            try:
+                cleaned = strip_metadata(field_file.file)
+            except (OSError, ValueError, SyntaxError) as exc:
+                logger.warning("Keeping %s upload %s as uploaded: %s", uid, field_file.name, exc)
+            else:
+                if cleaned is not None:
+                    setattr(instance, field_name, cleaned)
+        setattr(instance, variants_field, {})
+        if update_fields is not None and variants_field not in update_fields:
+            # update_fields is frozen by now, so the reset is written next to this save
+            sender._base_manager.filter(pk=instance.pk).update(**{variants_field: {}})
+        if old_variants:
+            storage = field_file.storage
+            transaction.on_commit(lambda: delete_variants(storage, old_variants))
+
+    def remove_variants(sender, instance, **kwargs):
+        storage = getattr(instance, field_name).storage
+        variants = getattr(instance, variants_field)
+        transaction.on_commit(lambda: delete_variants(storage, variants))
+
+    pre_save.connect(prepare_upload, sender=model, weak=False, dispatch_uid=f"images.prepare:{uid}")
+    post_delete.connect(remove_variants, sender=model, weak=False, dispatch_uid=f"images.remove:{uid}")
+
+
+def _build_one(model, pk, field_name, name, variants_field, sizes):
+    storage = model._meta.get_field(field_name).storage
+    try:
+        cleaned_name = rewrite_without_metadata(storage, name)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as exc:
+        logger.warning("Keeping %s with its metadata: %s", name, exc)
+        cleaned_name = name
+    try:
+        variants = build_variants(storage, cleaned_name, sizes, PHOTO_FORMATS)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as exc:
+        # Recorded so the worker does not retry it forever; --rebuild clears it
+        logger.warning("Could not build variants of %s: %s", name, exc)
+        variants = {'error': str(exc)}
+    # Skip rows whose image was replaced or removed while this one was being built
+    updated = model._base_manager.filter(pk=pk, **{field_name: name}).update(
+        **{field_name: cleaned_name, variants_field: variants}
+    )
+    if cleaned_name != name:
+        storage.delete(name if updated else cleaned_name)
+    if updated:
+        variants_built.send(sender=model, pk=pk)
+        return True
+    delete_variants(storage, variants)
+    return False
+
+
+def build_pending_variants(batch_size=50):
+    """Build variants for up to ``batch_size`` tracked images that have none; returns how many were built"""
+    built = 0
+    for (model, field_name), (variants_field, sizes) in _tracked.items():
+        pending = (
+            model._base_manager
+            .filter(**{variants_field: {}})
+            .exclude(**{f'{field_name}__isnull': True})
+            .exclude(**{field_name: ''})
+            .order_by('pk')
+            .values_list('pk', field_name)[:batch_size - built]
+        )
+        for pk, name in pending:
+            built += _build_one(model, pk, field_name, name, variants_field, sizes)
+        if built >= batch_size:
+            break
+    return built
+
+
+def reset_variants(batch_size=500):
+    """Delete every tracked image's variants and mark them all pending again"""
+    reset = 0
+    for (model, field_name), (variants_field, _) in _tracked.items():
+        storage = model._meta.get_field(field_name).storage
+        built = model._base_manager.exclude(**{variants_field: {}}).order_by('pk')
+        for pk, variants in built.values_list('pk', variants_field).iterator(chunk_size=batch_size):
+            delete_variants(storage, variants)
+            reset += model._base_manager.filter(pk=pk).update(**{variants_field: {}})
+    return reset
@@ -0,0 +1,156 @@
+"""Keyset (cursor) pagination.
+
+Pages are addressed by an opaque token holding the sort key of the first/last
+row shown, so page N costs the same index range scan as page 1: no OFFSET and
+no COUNT(*) unless a count is explicitly asked for.
+"""
+import base64
+import datetime
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder truncates to milliseconds; keys must round-trip exactly
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def encode_cursor(values):
+    """Encode a sort key as an opaque URL-safe token"""
+    payload = json.dumps(list(values), cls=_CursorEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, size=None):
+    """Decode a token from encode_cursor(); returns None if it is missing or malformed"""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(values, list) or (size is not None and len(values) != size):
+        return None
+    return values
+
+
+def keyset_q(ordering, cursor, backwards=False):
+    """Q for rows strictly after (or before) ``cursor`` in ``ordering``.
+
+    ``cursor`` holds one value per ``ordering`` entry, as decoded by decode_cursor().
+    """
+    fields = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+    q = Q()
+    for i, (name, descending) in enumerate(fields):
+        op = 'lt' if descending != backwards else 'gt'
+        equal = {fields[j][0]: cursor[j] for j in range(i)}
+        q |= Q(**equal, **{f'{name}__{op}': cursor[i]})
+    # Redundant bound on the leading column lets the database range-scan its index
+    name, descending = fields[0]
+    op = 'lte' if descending != backwards else 'gte'
+    return q & Q(**{f'{name}__{op}': cursor[0]})
+
+
+class CursorPage:
+    """One keyset page; iterate it like a Django Page"""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class CursorPaginator:
+    """Paginate a queryset by keyset on ``ordering``.
+
+    ``ordering`` is a list of field paths (``'-'`` for descending) whose last
+    entry must be unique, e.g. ``('user__last_name', 'user__first_name', 'id')``.
+    Ordering fields must be non-null; annotations (such as search_rank) work too.
+    """
+
+    def __init__(self, queryset, ordering, per_page=20):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+
+    def _fields(self):
+        return [(field.lstrip('-'), field.startswith('-')) for field in self.ordering]
+
+    def _key(self, obj):
+        key = []
+        for name, _ in self._fields():
+            value = obj
+            for attr in name.split('__'):
+                value = getattr(value, attr)
+            key.append(value)
+        return key
+
+    def page(self, after=None, before=None):
+        """Return the CursorPage after/before the given tokens (first page if neither is valid)"""
+        size = len(self.ordering)
+        after, before = decode_cursor(after, size), decode_cursor(before, size)
+        backwards = before is not None and after is None
+        cursor = before if backwards else after
+
+        queryset = self.queryset
+        if cursor is not None:
+            queryset = queryset.filter(keyset_q(self.ordering, cursor, backwards))
+        if backwards:
+            ordering = [f[1:] if f.startswith('-') else f'-{f}' for f in self.ordering]
+        else:
+            ordering = self.ordering
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, cursor is not None
+
+        return CursorPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=encode_cursor(self._key(rows[-1])) if rows else None,
+            previous_cursor=encode_cursor(self._key(rows[0])) if rows else None,
+        )
+
+    @cached_property
+    def count(self):
+        """Exact row count (a full COUNT(*); only call it when the number is really needed)"""
+        return self.queryset.count()
+
+    def approximate_count(self):
+        """Planner row estimate on PostgreSQL; None elsewhere (no COUNT(*) is run)"""
+        conn = connections[self.queryset.db]
+        if conn.vendor != 'postgresql':
+            return None
+        sql, params = self.queryset.order_by().values('pk').query.sql_with_params()
+        with conn.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
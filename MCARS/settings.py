@@ -66,6 +66,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
         'Members.middleware.ThemeMiddleware',
+        'Members.middleware.RoleMiddleware',
 ]
 
 ROOT_URLCONF = 'MCARS.urls'
@@ -165,12 +166,27 @@ EMAIL_HOST_USER = os.getenv('EMAIL_HOST_USER', '')
 EMAIL_HOST_PASSWORD = os.getenv('EMAIL_HOST_PASSWORD', '')
 DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', 'webmaster@localhost')
 
+# Outbound email queue (delivered by `manage.py send_queued_emails`)
+EMAIL_QUEUE_BATCH_SIZE = int(os.getenv('EMAIL_QUEUE_BATCH_SIZE', '50'))
+EMAIL_QUEUE_MAX_ATTEMPTS = int(os.getenv('EMAIL_QUEUE_MAX_ATTEMPTS', '5'))
+EMAIL_QUEUE_RETRY_BACKOFF = int(os.getenv('EMAIL_QUEUE_RETRY_BACKOFF', '60'))  # seconds, doubled per attempt
+EMAIL_QUEUE_LEASE_SECONDS = int(os.getenv('EMAIL_QUEUE_LEASE_SECONDS', '300'))  # 5 minutes
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Authentication settings
 LOGIN_REDIRECT_URL = '/member/dashboard/'
 LOGOUT_REDIRECT_URL = '/'
 
+# Cache (env-driven). Use a shared backend such as Redis in production so that
+# cached lookups and their invalidation are consistent across gunicorn workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'mcars-default'),
+    }
+}
+
 # Configure throttling and blocking (env-driven)
 FAILED_LOGIN_ATTEMPTS_ALLOWED = int(os.getenv('FAILED_LOGIN_ATTEMPTS_ALLOWED', '5'))
 BLOCKED_EMAILS_CACHE_TTL = int(os.getenv('BLOCKED_EMAILS_CACHE_TTL', '86400'))  # 24 hours in seconds
@@ -182,3 +198,31 @@ RANK_DEFAULTS = {
     'DEFAULT_PAYGRADE_ID': None,  # Set to a Rank ID or None
     'DEFAULT_THEME_ID': None      # Set to a Theme ID or None
 }
+RANK_SETTINGS_CACHE_TTL = int(os.getenv('RANK_SETTINGS_CACHE_TTL', '3600'))  # 1 hour in seconds
+
+# Org chart cache; entries are also keyed on the unit hierarchy version
+ORG_CHART_CACHE_TTL = int(os.getenv('ORG_CHART_CACHE_TTL', '3600'))  # 1 hour in seconds
+
+# Membership expiry sweep (expire_memberships); renewal reminders are off unless reminder days is above 0
+MEMBERSHIP_EXPIRY_CHUNK_SIZE = int(os.getenv('MEMBERSHIP_EXPIRY_CHUNK_SIZE', '1000'))
+MEMBERSHIP_RENEWAL_REMINDER_DAYS = int(os.getenv('MEMBERSHIP_RENEWAL_REMINDER_DAYS', '0'))
+
+# Roster import (import_members / manager upload): rows validated and inserted per transaction
+MEMBER_IMPORT_CHUNK_SIZE = int(os.getenv('MEMBER_IMPORT_CHUNK_SIZE', '500'))
+
+# Roster exports (export_data / manager downloads): rows fetched per database round trip
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Member/rank manager dashboard counters (also served as JSON for auto-refresh)
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv('DASHBOARD_STATS_CACHE_TTL', '60'))  # 1 minute in seconds
+
+# Member portal dashboard data (payments, children, insignia); dropped when any of them change
+MEMBER_DASHBOARD_CACHE_TTL = int(os.getenv('MEMBER_DASHBOARD_CACHE_TTL', '300'))  # 5 minutes in seconds
+
+# Per-user group names behind request.roles; dropped when the user's groups change.
+# Invalidation only reaches other processes through a shared cache, so with the
+# per-process locmem default a group change can take up to this long to apply
+# in other workers; raise it only with a shared CACHE_BACKEND.
+ROLE_CACHE_TTL = int(os.getenv(
+    'ROLE_CACHE_TTL', '10' if 'locmem' in CACHES['default']['BACKEND'].lower() else '300'
+))  # seconds
@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+
+from Members.models import Member
+
+from .pagination import CursorPaginator, encode_cursor
+
+
+def make_member(username, first_name='Test', last_name='Member'):
+    user = User.objects.create_user(username, first_name=first_name, last_name=last_name)
+    return Member.objects.create(user=user, phone_number='555-0100')
+
+
+class CursorPaginatorTests(TestCase):
+    ordering = ('user__last_name', 'user__first_name', 'id')
+
+    @classmethod
+    def setUpTestData(cls):
+        # Repeated names make the unique id column break ties across page boundaries
+        for i in range(23):
+            make_member(f'member{i}', first_name=f'First{i % 2}', last_name=f'Last{i % 5}')
+        cls.expected = list(
+            Member.objects.order_by(*cls.ordering).values_list('id', flat=True)
+        )
+
+    def paginator(self):
+        return CursorPaginator(Member.objects.select_related('user'), self.ordering, per_page=5)
+
+    def test_walks_forward_and_back_without_gaps_or_repeats(self):
+        paginator = self.paginator()
+        pages = [paginator.page()]
+        self.assertFalse(pages[0].has_previous)
+        while pages[-1].has_next:
+            pages.append(paginator.page(after=pages[-1].next_cursor))
+
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        self.assertEqual([m.id for page in pages for m in page], self.expected)
+        self.assertTrue(pages[-1].has_previous)
+
+        backwards = [pages[-1]]
+        while backwards[-1].has_previous:
+            backwards.append(paginator.page(before=backwards[-1].previous_cursor))
+        self.assertEqual(
+            [[m.id for m in page] for page in reversed(backwards)],
+            [[m.id for m in page] for page in pages],
+        )
+        self.assertTrue(backwards[-1].has_next)
+
+    def test_invalid_cursor_falls_back_to_the_first_page(self):
+        paginator = self.paginator()
+        first = [m.id for m in paginator.page()]
+
+        for token in ('not-a-cursor', encode_cursor(['only-one-value'])):
+            page = paginator.page(after=token)
+            self.assertEqual([m.id for m in page], first)
+            self.assertFalse(page.has_previous)
+
+    def test_last_page_and_count(self):
+        paginator = self.paginator()
+        last_on_page_four = Member.objects.select_related('user').get(pk=self.expected[19])
+        cursor = encode_cursor([last_on_page_four.user.last_name, last_on_page_four.user.first_name, last_on_page_four.pk])
+
+        page = paginator.page(after=cursor)
+
+        self.assertEqual([m.id for m in page], self.expected[20:])
+        self.assertFalse(page.has_next)
+        self.assertEqual(paginator.count, 23)
+
+    def test_approximate_count_never_counts_rows(self):
+        paginator = self.paginator()
+        if connection.vendor == 'postgresql':
+            self.assertIsInstance(paginator.approximate_count(), int)
+            return
+        # No planner estimate here; the directory shows no total rather than a COUNT(*) per page
+        with self.assertNumQueries(0):
+            self.assertIsNone(paginator.approximate_count())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import MembershipType, Address, Member, Child, Payment
+from .models import MembershipType, Address, Member, Child, Payment, OutboundEmail
 from .utils import block_email
 
 class ChildInline(admin.TabularInline):
@@ -34,9 +34,16 @@ class PaymentAdmin(admin.ModelAdmin):
     list_filter = ('status', 'payment_date')
     search_fields = ('member__user__first_name', 'member__user__last_name', 'transaction_id')
 
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
+
 # Register all models - each one only once
 admin.site.register(MembershipType, MembershipTypeAdmin)
 admin.site.register(Member, MemberAdmin)
 admin.site.register(Address)
 admin.site.register(Child)
 admin.site.register(Payment, PaymentAdmin)
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
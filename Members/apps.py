@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MembersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'Members'
+
+    def ready(self):
+        # Keep denormalized member fields current
+        from . import signals  # noqa: F401
@@ -0,0 +1,197 @@
+"""Roster export datasets for the export_data command and manager downloads.
+
+Each dataset returns ``(columns, rows)``: rows are flat dicts read with a
+``values()`` projection and ``.iterator(chunk_size=EXPORT_CHUNK_SIZE)``.  Rank and
+theme names come from small lookup tables loaded once per export rather than
+being resolved per row.  Encode them with MCARS.exports.
+"""
+from django.conf import settings
+
+
+class _RankLookup:
+    """Rank/theme names by id, plus the default rank for people without one"""
+
+    def __init__(self):
+        from rank.models import Rank, RankSettings, Theme
+
+        self.ranks = {rank['id']: rank for rank in Rank.objects.values('id', 'paygrade', 'short_name', 'long_name')}
+        self.themes = dict(Theme.objects.values_list('id', 'name'))
+        rank_settings = RankSettings.get_cached()
+        self.default_rank_id = rank_settings.default_paygrade_id if rank_settings else None
+
+    def rank(self, rank_id, use_default=True):
+        if rank_id is None and use_default:
+            rank_id = self.default_rank_id
+        return self.ranks.get(rank_id, {})
+
+    def fill(self, row, rank_id, use_default=True):
+        rank = self.rank(rank_id, use_default)
+        row['paygrade'] = rank.get('paygrade', '')
+        row['rank'] = rank.get('long_name', '')
+        return row
+
+
+def _iterate(queryset, fields):
+    return queryset.values(*fields).iterator(chunk_size=settings.EXPORT_CHUNK_SIZE)
+
+
+def member_export(queryset=None):
+    from .models import Member
+
+    if queryset is None:
+        queryset = Member.objects.all()
+    columns = [
+        ('membership_id', 'Membership ID'),
+        ('user__username', 'Username'),
+        ('user__first_name', 'First Name'),
+        ('user__last_name', 'Last Name'),
+        ('user__email', 'Email'),
+        ('phone_number', 'Phone'),
+        ('status', 'Status'),
+        ('membership_type__name', 'Membership Type'),
+        ('member_since', 'Member Since'),
+        ('approval_date', 'Approved'),
+        ('expiration_date', 'Expires'),
+        ('paygrade', 'Paygrade'),
+        ('rank', 'Rank'),
+        ('address__street', 'Street'),
+        ('address__city', 'City'),
+        ('address__state', 'State'),
+        ('address__zip_code', 'ZIP Code'),
+        ('address__country', 'Country'),
+    ]
+    fields = [key for key, _ in columns if key not in ('paygrade', 'rank')] + ['rank_association__rank_id']
+
+    def rows():
+        lookup = _RankLookup()
+        for row in _iterate(queryset.order_by('pk'), fields):
+            yield lookup.fill(row, row['rank_association__rank_id'])
+
+    return columns, rows()
+
+
+def child_export(queryset=None):
+    from .models import Child
+
+    if queryset is None:
+        queryset = Child.objects.all()
+    columns = [
+        ('child_id', 'Child ID'),
+        ('first_name', 'First Name'),
+        ('last_name', 'Last Name'),
+        ('birthdate', 'Birthdate'),
+        ('status', 'Status'),
+        ('parent__membership_id', 'Parent Membership ID'),
+        ('parent__display_name', 'Parent'),
+        ('paygrade', 'Paygrade'),
+        ('rank', 'Rank'),
+        ('created_at', 'Added'),
+    ]
+    fields = [key for key, _ in columns if key not in ('paygrade', 'rank')] + ['child_rank_association__rank_id']
+
+    def rows():
+        lookup = _RankLookup()
+        for row in _iterate(queryset.order_by('pk'), fields):
+            yield lookup.fill(row, row['child_rank_association__rank_id'])
+
+    return columns, rows()
+
+
+def unit_membership_export(queryset=None):
+    from units.models import UnitMembership
+
+    if queryset is None:
+        queryset = UnitMembership.objects.all()
+    columns = [
+        ('unit__name', 'Unit'),
+        ('unit__hull', 'Hull'),
+        ('unit__type', 'Unit Type'),
+        ('member__membership_id', 'Membership ID'),
+        ('member__display_name', 'Member'),
+        ('position__name', 'Position'),
+        ('joined_date', 'Joined'),
+    ]
+    return columns, _iterate(queryset.order_by('unit__path', 'pk'), [key for key, _ in columns])
+
+
+def payment_export(queryset=None):
+    from .models import Payment
+
+    if queryset is None:
+        queryset = Payment.objects.all()
+    columns = [
+        ('transaction_id', 'Transaction ID'),
+        ('member__membership_id', 'Membership ID'),
+        ('member__display_name', 'Member'),
+        ('amount', 'Amount'),
+        ('payment_date', 'Date'),
+        ('status', 'Status'),
+        ('payment_method', 'Method'),
+        ('notes', 'Notes'),
+    ]
+    return columns, _iterate(queryset.order_by('pk'), [key for key, _ in columns])
+
+
+def rank_history_export():
+    """Member then child rank history, oldest first"""
+    from rank.models import ChildRankHistory, MemberRankHistory
+
+    columns = [
+        ('person_type', 'Type'),
+        ('person_id', 'Membership/Child ID'),
+        ('name', 'Name'),
+        ('change_type', 'Change'),
+        ('previous_rank', 'Previous Rank'),
+        ('rank', 'Rank'),
+        ('previous_theme', 'Previous Theme'),
+        ('theme', 'Theme'),
+        ('effective_date', 'Effective Date'),
+        ('assigned_by__username', 'Assigned By'),
+        ('notes', 'Notes'),
+        ('created_at', 'Recorded'),
+    ]
+    common = [
+        'change_type', 'rank_id', 'previous_rank_id', 'theme_id', 'previous_theme_id',
+        'effective_date', 'assigned_by__username', 'notes', 'created_at',
+    ]
+    sources = [
+        ('member', MemberRankHistory, ['member__membership_id', 'member__display_name']),
+        ('child', ChildRankHistory, ['child__child_id', 'child__first_name', 'child__last_name']),
+    ]
+
+    def rows():
+        lookup = _RankLookup()
+        for person_type, model, person_fields in sources:
+            queryset = model.objects.order_by('effective_date', 'created_at', 'pk')
+            for row in _iterate(queryset, common + person_fields):
+                if person_type == 'member':
+                    row['person_id'] = row['member__membership_id']
+                    row['name'] = row['member__display_name']
+                else:
+                    row['person_id'] = row['child__child_id']
+                    row['name'] = f"{row['child__first_name']} {row['child__last_name']}"
+                row['person_type'] = person_type
+                row['rank'] = lookup.rank(row['rank_id'], False).get('long_name', '')
+                row['previous_rank'] = lookup.rank(row['previous_rank_id'], False).get('long_name', '')
+                row['theme'] = lookup.themes.get(row['theme_id'], '')
+                row['previous_theme'] = lookup.themes.get(row['previous_theme_id'], '')
+                yield row
+
+    return columns, rows()
+
+
+EXPORT_DATASETS = {
+    'members': member_export,
+    'children': child_export,
+    'unit-memberships': unit_membership_export,
+    'payments': payment_export,
+    'rank-history': rank_history_export,
+}
+
+EXPORT_LABELS = [
+    ('members', 'Members'),
+    ('children', 'Children'),
+    ('unit-memberships', 'Unit Memberships'),
+    ('payments', 'Payments'),
+    ('rank-history', 'Rank History'),
+]
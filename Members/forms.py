@@ -2,7 +2,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
-from .models import Member, MembershipType, Address, Child, FAQ, FAQCategory
+from .models import Member, MembershipType, Address, Child, FAQ, FAQCategory, MemberImport
 from .utils import is_email_blocked
 
 # --------------------
@@ -142,6 +142,29 @@ class CustomUserCreationForm(UserCreationForm):
         return email
 
 
+class ImportedUserForm(CustomUserCreationForm):
+    """CustomUserCreationForm rules for one roster import row.
+
+    Imported accounts get an unusable password (members set one through password
+    reset), and username/email conflicts are checked per chunk by Members.importer
+    rather than with a query per row.
+    """
+
+    class Meta(CustomUserCreationForm.Meta):
+        fields = ['username', 'email', 'first_name', 'last_name']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name in ('password1', 'password2'):
+            self.fields.pop(name, None)
+
+    def clean_username(self):
+        return self.cleaned_data.get('username')
+
+    def validate_unique(self):
+        pass
+
+
 class ContactForm(forms.Form):
     name = forms.CharField(max_length=100, required=True, widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Your Name'}))
     email = forms.EmailField(required=True, widget=forms.EmailInput(attrs={'class': 'form-control', 'placeholder': 'Your Email'}))
@@ -196,3 +219,26 @@ class ConvertChildToMemberForm(forms.Form):
         if User.objects.filter(email__iexact=email).exists():
             raise ValidationError('An account with this email already exists.')
         return email
+
+
+# --------------------
+# Manager tool: roster import
+# --------------------
+class MemberImportUploadForm(forms.ModelForm):
+    class Meta:
+        model = MemberImport
+        fields = ['file', 'default_status']
+        labels = {'file': 'Roster file (.csv or .jsonl)', 'default_status': 'Status for rows without one'}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['file'].widget.attrs.update({'class': 'form-control', 'accept': '.csv,.jsonl,.ndjson'})
+        self.fields['default_status'].widget.attrs.update({'class': 'form-select'})
+
+    def clean_file(self):
+        upload = self.cleaned_data['file']
+        extension = upload.name.rsplit('.', 1)[-1].lower()
+        if extension not in ('csv', 'jsonl', 'ndjson'):
+            raise ValidationError('Upload a .csv or .jsonl file.')
+        self.instance.format = 'csv' if extension == 'csv' else 'jsonl'
+        return upload
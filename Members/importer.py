@@ -0,0 +1,360 @@
+"""Streaming roster import.
+
+A MemberImport's file (CSV with a header row, or JSON Lines) is read lazily and
+processed in chunks of MEMBER_IMPORT_CHUNK_SIZE rows.  Each row is validated with
+the registration form rules (ImportedUserForm/AddressForm); username, email and
+membership ID conflicts are found with one query each per chunk; valid rows are
+written with bulk_create.  The chunk's inserts, its row errors and the job's
+rows_processed checkpoint commit together, so an interrupted import resumes
+right after the last committed chunk.
+
+Imports uploaded from the manager pages are left pending and run by the
+process_member_imports worker (run_pending_imports), not inside the request.
+
+Columns: username, email, first_name, last_name, phone_number, membership_id,
+membership_type (name), status, expiration_date, street, city, state, zip_code,
+country.  Only the four user columns are required.
+"""
+import csv
+import io
+import itertools
+import json
+import logging
+import uuid
+from datetime import datetime, time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .search import build_search_document
+from .stats import invalidate_dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_FIELDS = ('street', 'city', 'state', 'zip_code', 'country')
+
+
+def iter_rows(fileobj, file_format):
+    """Yield ``(row_number, data)`` from a binary roster file.
+
+    Row numbers count data rows from 1 (the CSV header is not a row); ``data`` is
+    None for a JSON line that could not be parsed into an object.
+    """
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(text), 1):
+            yield number, {key.strip(): (value or '').strip() for key, value in row.items() if isinstance(key, str)}
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            yield number, None
+            continue
+        yield number, {
+            str(key).strip(): '' if value is None else str(value).strip()
+            for key, value in data.items()
+        }
+
+
+def _parse_expiration(value):
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        parsed = datetime.combine(day, time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def validate_row(data, membership_types, default_status):
+    """Validate one roster row; returns ``(cleaned, None)`` or ``(None, {field: [messages]})``"""
+    from .forms import AddressForm, ImportedUserForm
+    from .models import Member
+
+    if data is None:
+        return None, {'__all__': ['Line is not a JSON object.']}
+
+    errors = {}
+    user_form = ImportedUserForm(data=data)
+    if not user_form.is_valid():
+        errors.update({field: list(messages) for field, messages in user_form.errors.items()})
+
+    address = None
+    address_data = {field: data.get(field, '') for field in ADDRESS_FIELDS}
+    if any(address_data.values()):
+        address_data['country'] = address_data['country'] or 'USA'
+        address_form = AddressForm(data=address_data)
+        if address_form.is_valid():
+            address = address_form.cleaned_data
+        else:
+            errors.update({field: list(messages) for field, messages in address_form.errors.items()})
+
+    membership_type = None
+    if data.get('membership_type'):
+        membership_type = membership_types.get(data['membership_type'].lower())
+        if membership_type is None:
+            errors['membership_type'] = [f"Unknown membership type {data['membership_type']!r}."]
+
+    status = data.get('status') or default_status
+    if status not in dict(Member.STATUS_CHOICES):
+        errors['status'] = [f"Unknown status {status!r}."]
+
+    phone_number = data.get('phone_number', '')
+    if len(phone_number) > Member._meta.get_field('phone_number').max_length:
+        errors['phone_number'] = ['Phone number is too long.']
+
+    membership_id = data.get('membership_id') or str(uuid.uuid4())
+    if len(membership_id) > Member._meta.get_field('membership_id').max_length:
+        errors['membership_id'] = ['Membership ID is too long.']
+
+    expiration_date = None
+    if data.get('expiration_date'):
+        try:
+            expiration_date = _parse_expiration(data['expiration_date'])
+        except ValueError:
+            errors['expiration_date'] = ['Enter a date (YYYY-MM-DD) or ISO datetime.']
+
+    if errors:
+        return None, errors
+    return {
+        'user': user_form.cleaned_data,
+        'address': address,
+        'membership_type': membership_type,
+        'status': status,
+        'phone_number': phone_number,
+        'membership_id': membership_id,
+        'expiration_date': expiration_date,
+    }, None
+
+
+def _find_conflicts(rows):
+    """Split validated ``(number, cleaned)`` rows into (new rows, {number: errors})"""
+    from .models import Member
+
+    usernames = {row['user']['username'].lower() for _, row in rows}
+    emails = {row['user']['email'].lower() for _, row in rows}
+    membership_ids = {row['membership_id'] for _, row in rows}
+    taken_usernames = set(
+        User.objects.annotate(key=Lower('username')).filter(key__in=usernames).values_list('key', flat=True)
+    )
+    taken_emails = set(
+        User.objects.annotate(key=Lower('email')).filter(key__in=emails).values_list('key', flat=True)
+    )
+    taken_ids = set(
+        Member.objects.filter(membership_id__in=membership_ids).values_list('membership_id', flat=True)
+    )
+
+    fresh, conflicts = [], {}
+    for number, row in rows:
+        username = row['user']['username'].lower()
+        email = row['user']['email'].lower()
+        errors = {}
+        if username in taken_usernames:
+            errors['username'] = ['A user with that username already exists.']
+        if email in taken_emails:
+            errors['email'] = ['An account with this email already exists.']
+        if row['membership_id'] in taken_ids:
+            errors['membership_id'] = ['A member with this membership ID already exists.']
+        if errors:
+            conflicts[number] = errors
+            continue
+        # Later rows in the same file conflict with this one
+        taken_usernames.add(username)
+        taken_emails.add(email)
+        taken_ids.add(row['membership_id'])
+        fresh.append((number, row))
+    return fresh, conflicts
+
+
+def _insert(rows, batch_size):
+    """bulk_create the User, Address and Member rows for validated, conflict-free rows"""
+    from .models import Address, Member
+
+    now = timezone.now()
+    users = [
+        User(
+            username=row['user']['username'],
+            email=row['user']['email'],
+            first_name=row['user']['first_name'],
+            last_name=row['user']['last_name'],
+            password=make_password(None),
+        )
+        for _, row in rows
+    ]
+    User.objects.bulk_create(users, batch_size=batch_size)
+    if any(user.pk is None for user in users):
+        ids = dict(User.objects.filter(username__in=[u.username for u in users]).values_list('username', 'pk'))
+        for user in users:
+            user.pk = ids[user.username]
+
+    addresses = {number: Address(**row['address']) for number, row in rows if row['address']}
+    if connection.features.can_return_rows_from_bulk_insert:
+        Address.objects.bulk_create(addresses.values(), batch_size=batch_size)
+    else:
+        for address in addresses.values():
+            address.save()
+
+    members = []
+    for user, (number, row) in zip(users, rows):
+        member = Member(
+            user=user,
+            address=addresses.get(number),
+            membership_type=row['membership_type'],
+            phone_number=row['phone_number'],
+            status=row['status'],
+            membership_id=row['membership_id'],
+            display_name=f"{user.first_name} {user.last_name}",
+            search_document=build_search_document(
+                user.first_name, user.last_name, user.email, row['phone_number'], row['membership_id'],
+            ),
+        )
+        member.refresh_profile_missing()
+        if row['status'] == 'active':
+            member.approval_date = now
+            member.expiration_date = row['expiration_date'] or member.compute_expiration_date(now)
+        else:
+            member.expiration_date = row['expiration_date']
+        members.append(member)
+    Member.objects.bulk_create(members, batch_size=batch_size)
+    return users
+
+
+def _process_chunk(job, chunk, membership_types, batch_size):
+    from .models import Member, MemberImportError
+    from .utils import refresh_display_names
+
+    valid, row_errors = [], []
+    for number, data in chunk:
+        cleaned, errors = validate_row(data, membership_types, job.default_status)
+        if errors:
+            row_errors.append(MemberImportError(
+                member_import=job, row=number, reason=MemberImportError.REASON_INVALID, errors=errors,
+            ))
+        else:
+            valid.append((number, cleaned))
+
+    with transaction.atomic():
+        fresh, conflicts = _find_conflicts(valid) if valid else ([], {})
+        created = []
+        if fresh:
+            try:
+                with transaction.atomic():
+                    created = _insert(fresh, batch_size)
+            except IntegrityError:
+                # Someone registered a clashing account meanwhile: retry row by row
+                for number, row in fresh:
+                    try:
+                        with transaction.atomic():
+                            created += _insert([(number, row)], batch_size)
+                    except IntegrityError as exc:
+                        conflicts[number] = {'__all__': [f"Already exists ({exc})."]}
+        for number, errors in sorted(conflicts.items()):
+            row_errors.append(MemberImportError(
+                member_import=job, row=number, reason=MemberImportError.REASON_CONFLICT, errors=errors,
+            ))
+        MemberImportError.objects.bulk_create(row_errors, batch_size=batch_size)
+
+        if created:
+            # Prefix the default rank now that the members exist
+            refresh_display_names(Member.objects.filter(user__in=[user.pk for user in created]))
+
+        job.rows_processed = chunk[-1][0]
+        job.created_count += len(created)
+        job.skipped_count += len(conflicts)
+        job.error_count += len(row_errors) - len(conflicts)
+        job.save(update_fields=['rows_processed', 'created_count', 'skipped_count', 'error_count'])
+    return len(created)
+
+
+def run_import(job, chunk_size=None, batch_size=500, progress=None):
+    """Import ``job``'s file from its rows_processed checkpoint to the end.
+
+    ``progress`` is called with the job after every committed chunk.  Conflicting
+    rows are skipped and reported, so re-running a finished file is a no-op.
+    Returns the job.
+    """
+    from .models import MemberImport, MembershipType
+
+    chunk_size = chunk_size or settings.MEMBER_IMPORT_CHUNK_SIZE
+    membership_types = {mt.name.lower(): mt for mt in MembershipType.objects.all()}
+
+    job.status = MemberImport.STATUS_RUNNING
+    job.last_error = ''
+    job.finished_at = None
+    job.save(update_fields=['status', 'last_error', 'finished_at'])
+
+    created = 0
+    try:
+        with job.file.open('rb') as fileobj:
+            rows = iter_rows(fileobj, job.format)
+            rows = itertools.dropwhile(lambda item: item[0] <= job.rows_processed, rows)
+            while True:
+                chunk = list(itertools.islice(rows, chunk_size))
+                if not chunk:
+                    break
+                created += _process_chunk(job, chunk, membership_types, batch_size)
+                if progress:
+                    progress(job)
+    except Exception as exc:
+        logger.exception("Member import %s failed after row %s", job.pk, job.rows_processed)
+        job.status = MemberImport.STATUS_FAILED
+        job.last_error = str(exc)
+        job.save(update_fields=['status', 'last_error'])
+        raise
+    finally:
+        if created:
+            invalidate_dashboard_stats()
+
+    job.status = MemberImport.STATUS_COMPLETED
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'finished_at'])
+    return job
+
+
+def claim_pending_import():
+    """Mark the oldest pending import running and return it, or None if there is none"""
+    from .models import MemberImport
+
+    pending = MemberImport.objects.filter(status=MemberImport.STATUS_PENDING).order_by('pk')
+    for pk in pending.values_list('pk', flat=True)[:10]:
+        # Another worker may claim the same row; only the one whose update matches runs it
+        if MemberImport.objects.filter(pk=pk, status=MemberImport.STATUS_PENDING).update(
+            status=MemberImport.STATUS_RUNNING
+        ):
+            return MemberImport.objects.get(pk=pk)
+    return None
+
+
+def run_pending_imports(chunk_size=None, batch_size=500, limit=None):
+    """Run queued imports one after another; returns ``(completed, failed)``.
+
+    A failed import is left with status failed and its checkpoint, so it can be
+    queued again from its detail page.
+    """
+    completed = failed = 0
+    while limit is None or completed + failed < limit:
+        job = claim_pending_import()
+        if job is None:
+            break
+        try:
+            run_import(job, chunk_size=chunk_size, batch_size=batch_size)
+        except Exception:
+            failed += 1
+        else:
+            completed += 1
+    return completed, failed
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from Members.models import Member
+from Members.utils import approve_members
+
+
+class Command(BaseCommand):
+    help = 'Approve pending member registrations (oldest first) in one transaction'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help='Approve at most this many members')
+        parser.add_argument('--approver', help='Username recorded as approved_by / rank assigner')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk INSERT/UPDATE statement')
+
+    def handle(self, *args, **options):
+        approver = None
+        if options['approver']:
+            try:
+                approver = User.objects.get(username=options['approver'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['approver']!r}")
+
+        pending = Member.objects.filter(status='pending').order_by('member_since', 'pk')
+        if options['limit'] is not None:
+            pending = Member.objects.filter(
+                pk__in=list(pending.values_list('pk', flat=True)[:options['limit']]), status='pending',
+            )
+
+        approved = approve_members(pending, approver, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Approved {len(approved)} member(s); approval emails queued."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from Members.utils import refresh_display_names
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized Member.display_name (ranked name) for every member'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Members processed per batch')
+
+    def handle(self, *args, **options):
+        updated = refresh_display_names(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Updated display names for {updated} member(s)."))
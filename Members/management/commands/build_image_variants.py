@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from MCARS.images import build_pending_variants, reset_variants
+
+
+class Command(BaseCommand):
+    help = ('Build resized variants of uploaded profile, unit and event images that do not have them yet, '
+            'stripping EXIF from originals uploaded before uploads were cleaned')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help='Images per batch')
+        parser.add_argument('--rebuild', action='store_true', help='Delete all existing variants and build them again')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll for new uploads')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls when idle with --loop')
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            self.stdout.write(f"Cleared the variants of {reset_variants()} image(s)")
+
+        total = 0
+        while True:
+            built = build_pending_variants(options['batch_size'])
+            total += built
+            if built:
+                self.stdout.write(f"Built variants for {built} image(s)")
+                # Drain the backlog before sleeping
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total} image(s) processed."))
@@ -0,0 +1,30 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+
+from Members.utils import expire_memberships, queue_renewal_reminders
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Mark active memberships past their expiration date as expired and queue renewal reminders'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows per UPDATE (default: MEMBERSHIP_EXPIRY_CHUNK_SIZE)')
+        parser.add_argument('--remind-days', type=int, default=None,
+                            help='Queue reminders for memberships expiring within this many days; 0 disables (default: MEMBERSHIP_RENEWAL_REMINDER_DAYS, off unless set)')
+        parser.add_argument('--loop', action='store_true', help='Keep running and sweep every --interval seconds')
+        parser.add_argument('--interval', type=float, default=3600.0, help='Seconds between sweeps with --loop')
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_memberships(chunk_size=options['chunk_size'])
+            reminded = queue_renewal_reminders(days=options['remind_days'])
+            summary = f"Expired {expired} membership(s); queued {reminded} renewal reminder(s)."
+            logger.info(summary)
+            self.stdout.write(self.style.SUCCESS(summary))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,35 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from MCARS.exports import EXPORT_FORMATS, stream_export
+from Members.exports import EXPORT_DATASETS
+
+
+class Command(BaseCommand):
+    help = 'Stream a roster dataset (members, children, unit memberships, payments, rank history) to a file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORT_DATASETS))
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        columns, rows = EXPORT_DATASETS[options['dataset']]()
+        chunks = stream_export(options['format'], columns, rows, sheet_name=options['dataset'])
+
+        if options['output']:
+            out = open(options['output'], 'wb')
+        elif options['format'] == 'xlsx' and sys.stdout.isatty():
+            raise CommandError('Refusing to write XLSX to a terminal; use --output or redirect stdout')
+        else:
+            out = sys.stdout.buffer
+        try:
+            for chunk in chunks:
+                out.write(chunk.encode() if isinstance(chunk, str) else chunk)
+            out.flush()
+        finally:
+            if options['output']:
+                out.close()
+        if options['output']:
+            self.stderr.write(f"Wrote {options['dataset']} export to {options['output']}")
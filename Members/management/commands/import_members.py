@@ -0,0 +1,87 @@
+import csv
+import json
+import os
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from Members.importer import run_import
+from Members.models import Member, MemberImport
+
+
+class Command(BaseCommand):
+    help = 'Import members from a CSV (with header row) or JSON Lines roster; re-run with --resume to continue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help='Roster file (.csv or .jsonl)')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='File format (default: from the extension)')
+        parser.add_argument('--resume', type=int, metavar='IMPORT_ID', help='Continue an earlier import after its last committed chunk')
+        parser.add_argument('--status', choices=[key for key, _ in Member.STATUS_CHOICES], default='active',
+                            help='Status for rows without a status column (default: active)')
+        parser.add_argument('--created-by', help='Username recorded on the import')
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows validated and committed per transaction')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk INSERT statement')
+        parser.add_argument('--report', help='Write the rows that were not imported to this CSV file')
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                job = MemberImport.objects.get(pk=options['resume'])
+            except MemberImport.DoesNotExist:
+                raise CommandError(f"No import with id {options['resume']}")
+            if job.status == MemberImport.STATUS_COMPLETED:
+                raise CommandError(f"Import {job.pk} already completed")
+        elif options['path']:
+            job = self._create_job(options)
+        else:
+            raise CommandError('Give a roster file or --resume IMPORT_ID')
+
+        self.stdout.write(f"Import {job.pk}: starting after row {job.rows_processed}")
+        try:
+            run_import(
+                job, chunk_size=options['chunk_size'], batch_size=options['batch_size'],
+                progress=lambda j: self.stdout.write(
+                    f"  row {j.rows_processed}: {j.created_count} created, {j.skipped_count} skipped, {j.error_count} invalid"
+                ),
+            )
+        except Exception as exc:
+            raise CommandError(f"Import {job.pk} failed after row {job.rows_processed}: {exc}; "
+                               f"continue with --resume {job.pk}")
+
+        if options['report']:
+            self._write_report(job, options['report'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Import {job.pk} finished: {job.created_count} created, "
+            f"{job.skipped_count} skipped (already exist), {job.error_count} invalid"
+        ))
+
+    def _create_job(self, options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f"No such file: {path}")
+        file_format = options['format']
+        if file_format is None:
+            file_format = 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+        created_by = None
+        if options['created_by']:
+            try:
+                created_by = User.objects.get(username=options['created_by'])
+            except User.DoesNotExist:
+                raise CommandError(f"No user named {options['created_by']!r}")
+
+        job = MemberImport(format=file_format, default_status=options['status'], created_by=created_by)
+        # Keep a copy in media storage so the import can be resumed later
+        with open(path, 'rb') as fh:
+            job.file.save(os.path.basename(path), File(fh), save=False)
+        job.save()
+        return job
+
+    def _write_report(self, job, path):
+        with open(path, 'w', newline='') as fh:
+            writer = csv.writer(fh)
+            writer.writerow(['row', 'reason', 'errors'])
+            for error in job.row_errors.iterator():
+                writer.writerow([error.row, error.reason, json.dumps(error.errors)])
+        self.stdout.write(f"Wrote row report to {path}")
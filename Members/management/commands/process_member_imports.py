@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Members.importer import run_pending_imports
+
+
+class Command(BaseCommand):
+    help = 'Run roster imports uploaded from the manager pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=None, help='Rows validated and committed per transaction (default: MEMBER_IMPORT_CHUNK_SIZE)')
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per bulk INSERT statement')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll for new uploads')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls when idle with --loop')
+
+    def handle(self, *args, **options):
+        total_completed = total_failed = 0
+        while True:
+            completed, failed = run_pending_imports(options['chunk_size'], options['batch_size'], limit=1)
+            total_completed += completed
+            total_failed += failed
+            if completed or failed:
+                self.stdout.write(f"Completed {completed}, failed {failed}")
+                # Drain the queue before sleeping
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_completed} import(s) completed, {total_failed} failed."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from Members.search import create_search_index, refresh_search_documents
+
+
+class Command(BaseCommand):
+    help = 'Recompute Member.search_document and rebuild the directory search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Members processed per batch')
+
+    def handle(self, *args, **options):
+        updated = refresh_search_documents(batch_size=options['batch_size'])
+        create_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated search documents for {updated} member(s); rebuilt the {connection.vendor} search index."
+        ))
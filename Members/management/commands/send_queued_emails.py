@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from Members.utils import send_queued_emails
+
+
+class Command(BaseCommand):
+    help = 'Deliver queued outbound emails in batches over a reused connection'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help='Messages per batch (default: EMAIL_QUEUE_BATCH_SIZE)')
+        parser.add_argument('--max-attempts', type=int, default=None, help='Attempts before a message is marked failed (default: EMAIL_QUEUE_MAX_ATTEMPTS)')
+        parser.add_argument('--loop', action='store_true', help='Keep running and poll the queue')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds to sleep between polls when idle with --loop')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_queued_emails(options['batch_size'], options['max_attempts'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                self.stdout.write(f"Sent {sent}, failed {failed}")
+                # Drain the backlog before sleeping
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(f"Done: {total_sent} sent, {total_failed} failed attempts."))
@@ -2,7 +2,7 @@ from django.http import HttpResponseForbidden
 from django.urls import reverse
 from django.shortcuts import redirect
 from django.contrib import messages
-from .utils import is_ip_blocked
+from .utils import THEME_SESSION_KEY, is_ip_blocked
 
 class SecurityMiddleware:
     def __init__(self, get_response):
@@ -24,12 +24,16 @@ class ThemeMiddleware:
     def __call__(self, request):
         # Set theme context variable for templates
         if hasattr(request, 'user') and request.user.is_authenticated:
-            try:
-                # Try to get the member's theme preference
-                request.theme = request.user.member.theme_preference
-            except:
-                # Default to light theme if there's an error
-                request.theme = 'light'
+            # The member's preference is cached in the session (written through by
+            # remember_theme_preference), so most requests skip the Member query
+            theme = request.session.get(THEME_SESSION_KEY)
+            if theme is None:
+                from .models import Member
+                theme = Member.objects.filter(user_id=request.user.pk).values_list('theme_preference', flat=True).first()
+                if theme:
+                    request.session[THEME_SESSION_KEY] = theme
+            # Default to light theme for users without a member profile
+            request.theme = theme or 'light'
         else:
             # Default theme for non-authenticated users
             request.theme = request.session.get('theme', 'light')
@@ -54,7 +58,7 @@ from django.http import HttpResponseForbidden
 from django.urls import reverse
 from django.shortcuts import redirect
 from django.contrib import messages
-from .utils import is_ip_blocked
+from .utils import THEME_SESSION_KEY, is_ip_blocked
 
 class SecurityMiddleware:
     def __init__(self, get_response):
@@ -82,4 +86,16 @@ class SecurityMiddleware:
             ip = x_forwarded_for.split(',')[0]
         else:
             ip = request.META.get('REMOTE_ADDR')
-        return ip
\ No newline at end of file
+        return ip
+
+class RoleMiddleware:
+    """Expose the user's roles as request.roles, loaded once per request (see Members.roles)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from django.utils.functional import SimpleLazyObject
+        from .roles import get_roles
+        request.roles = SimpleLazyObject(lambda: get_roles(getattr(request, 'user', None)))
+        return self.get_response(request)
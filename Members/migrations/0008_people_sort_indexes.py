@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+USER_NAME_INDEX = 'auth_user_name_sort_idx'
+
+
+def add_user_name_index(apps, schema_editor):
+    """Index auth_user by (last_name, first_name) for the member side of the people listing"""
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    schema_editor.add_index(User, models.Index(fields=['last_name', 'first_name'], name=USER_NAME_INDEX))
+
+
+def remove_user_name_index(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    schema_editor.remove_index(User, models.Index(fields=['last_name', 'first_name'], name=USER_NAME_INDEX))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('Members', '0007_child_child_id_child_created_at_child_profile_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='child',
+            index=models.Index(fields=['last_name', 'first_name', 'id'], name='child_name_sort_idx'),
+        ),
+        migrations.RunPython(add_user_name_index, remove_user_name_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Members', '0009_outbound_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='display_name',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:10
+
+import re
+
+from django.db import migrations, models
+
+from Members.search import FTS_TABLE, SQLITE_TRIGGERS, create_sqlite_triggers
+
+# Frozen copies of the Members.search helpers as they were when this migration was written.
+# The trigger SQL is shared with Members.search so every copy of the triggers stays identical.
+TOKEN_RE = re.compile(r'\w+')
+MEMBER_TABLE = 'Members_member'
+TSVECTOR_INDEX = 'members_member_search_tsv_idx'
+TRIGRAM_INDEX = 'members_member_search_trgm_idx'
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def build_search_document(first_name='', last_name='', email='', phone_number='', membership_id=''):
+    terms = tokenize(f"{first_name} {last_name} {email}")
+    if email:
+        terms.append(email.lower())
+    digits = re.sub(r'\D', '', phone_number or '')
+    if digits:
+        terms.append(digits)
+    terms.extend(tokenize(phone_number))
+    terms.extend(tokenize(str(membership_id or '')))
+    return ' '.join(dict.fromkeys(terms))
+
+
+def populate_search_documents(apps, schema_editor):
+    Member = apps.get_model('Members', 'Member')
+    batch = []
+    for member in Member.objects.select_related('user').iterator(chunk_size=500):
+        member.search_document = build_search_document(
+            member.user.first_name, member.user.last_name, member.user.email,
+            member.phone_number, member.membership_id,
+        )
+        batch.append(member)
+        if len(batch) >= 500:
+            Member.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Member.objects.bulk_update(batch, ['search_document'])
+
+
+def add_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    table = conn.ops.quote_name(MEMBER_TABLE)
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TSVECTOR_INDEX} ON {table}"
+                f" USING GIN (to_tsvector('simple', search_document))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {table}"
+                f" USING GIN (search_document gin_trgm_ops)"
+            )
+        elif conn.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}"
+                f" USING fts5(search_document, content={table}, content_rowid='id')"
+            )
+            create_sqlite_triggers(cursor, table)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def remove_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {TSVECTOR_INDEX}")
+            cursor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+        elif conn.vendor == 'sqlite':
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Members', '0010_member_display_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(add_search_index, remove_search_index),
+    ]
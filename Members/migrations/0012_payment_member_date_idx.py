@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Members', '0011_member_search_document'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['member', '-payment_date', '-id'], name='payment_member_date_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:21
+
+from django.db import migrations, models
+
+from Members.profile import compute_profile_missing
+
+
+def populate_profile_flags(apps, schema_editor):
+    Member = apps.get_model('Members', 'Member')
+    batch = []
+    for member in Member.objects.select_related('user', 'address').iterator(chunk_size=500):
+        member.profile_missing = compute_profile_missing(member.phone_number, member.user, member.address)
+        member.profile_complete = member.profile_missing == 0
+        batch.append(member)
+        if len(batch) >= 500:
+            Member.objects.bulk_update(batch, ['profile_missing', 'profile_complete'])
+            batch = []
+    Member.objects.bulk_update(batch, ['profile_missing', 'profile_complete'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Members', '0014_member_import'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='member',
+            name='profile_complete',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='profile_missing',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_profile_flags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:31
+
+import Members.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Members', '0015_member_profile_complete'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='child',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='member',
+            name='profile_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='child',
+            name='profile_image',
+            field=models.ImageField(blank=True, help_text='Upload a profile image (JPG, PNG, or GIF, max 5MB)', null=True, upload_to='child_profile_images/', validators=[Members.validators.validate_image_extension, Members.validators.validate_image_size, Members.validators.validate_image_content]),
+        ),
+        migrations.AlterField(
+            model_name='member',
+            name='profile_image',
+            field=models.ImageField(blank=True, help_text='Upload a profile image (JPG, PNG, or GIF, max 5MB)', null=True, upload_to='profile_images/', validators=[Members.validators.validate_image_extension, Members.validators.validate_image_size, Members.validators.validate_image_content]),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+from Members.search import FTS_TABLE, create_sqlite_triggers
+
+# 0015 and 0016 rebuild Members_member on SQLite, which drops the triggers 0011 created
+MEMBER_TABLE = 'Members_member'
+
+
+def restore_search_triggers(apps, schema_editor):
+    conn = schema_editor.connection
+    if conn.vendor != 'sqlite' or FTS_TABLE not in conn.introspection.table_names():
+        return
+    with conn.cursor() as cursor:
+        create_sqlite_triggers(cursor, conn.ops.quote_name(MEMBER_TABLE))
+        # Pick up members written while the triggers were missing
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Members', '0016_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -7,7 +7,7 @@ import Members.validators
 class Migration(migrations.Migration):
 
     dependencies = [
-        ('Members', '0001_initial'),  # Update this to your latest migration
+        ('Members', 'add_profile_image'),
     ]
 
     operations = [
@@ -4,7 +4,7 @@ from django.utils import timezone
 from datetime import timedelta
 import uuid
 import os
-from .validators import validate_image_extension, validate_image_size
+from .validators import validate_image_content, validate_image_extension, validate_image_size
 
 # Create your models here.
 class MembershipType(models.Model):
@@ -68,12 +68,71 @@ class Member(models.Model):
         upload_to='profile_images/', 
         null=True, 
         blank=True,
-        validators=[validate_image_extension, validate_image_size],
+        validators=[validate_image_extension, validate_image_size, validate_image_content],
         help_text='Upload a profile image (JPG, PNG, or GIF, max 5MB)'
     )
+    # Resized copies of profile_image, built by the build_image_variants worker (see MCARS.images)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Denormalized ranked name ("PFC Jane Doe") for cheap list/select rendering.
+    # Kept current by the MemberRank/Rank/RankSettings and User signals; see backfill_display_names.
+    display_name = models.CharField(max_length=255, blank=True, default='', db_index=True)
+    # Normalized directory search terms; indexed per backend by Members.search (see rebuild_member_search).
+    search_document = models.TextField(blank=True, default='', editable=False)
+    # expiration_date a renewal reminder was last queued for (see expire_memberships --remind-days)
+    renewal_reminder_sent_for = models.DateTimeField(null=True, blank=True, editable=False)
+    # Blank required profile fields as a Members.profile bitmask; profile_complete is profile_missing == 0.
+    # Written on save and by the Address/User signals (see member_profile_required).
+    profile_missing = models.PositiveIntegerField(default=0, editable=False)
+    profile_complete = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        indexes = [
+            # expire_memberships sweep and status/expiry filters
+            models.Index(fields=['status', 'expiration_date'], name='member_status_expiry_idx'),
+        ]
 
     def __str__(self):
-        return self.get_full_name_with_rank()
+        return self.display_name or self.get_full_name_with_rank()
+
+    def save(self, *args, **kwargs):
+        if not self.display_name and self.user_id:
+            self.display_name = self.build_display_name()
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'display_name'}
+        if self.user_id:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or {'phone_number', 'membership_id', 'user'} & set(update_fields):
+                self.search_document = self.build_search_document()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'search_document'}
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or {'phone_number', 'address', 'user'} & set(update_fields):
+                self.refresh_profile_missing()
+                if update_fields is not None:
+                    kwargs['update_fields'] = {*update_fields, 'profile_missing', 'profile_complete'}
+        super().save(*args, **kwargs)
+
+    def build_search_document(self):
+        """Compute the terms stored in search_document"""
+        from .search import build_search_document
+        return build_search_document(
+            self.user.first_name, self.user.last_name, self.user.email,
+            self.phone_number, self.membership_id,
+        )
+
+    def refresh_profile_missing(self):
+        """Recompute profile_missing/profile_complete from the phone, user and address"""
+        from .profile import compute_profile_missing
+        self.profile_missing = compute_profile_missing(self.phone_number, self.user, self.address)
+        self.profile_complete = self.profile_missing == 0
+
+    def build_display_name(self):
+        """Compute the ranked name stored in display_name (assigned or default rank)"""
+        rank = self.get_rank()
+        prefix = rank.short_name if rank else ''
+        name = f"{self.user.first_name} {self.user.last_name}"
+        return f"{prefix} {name}" if prefix else name
 
     def get_rank(self):
         """Get the member's assigned rank or default rank if none is assigned"""
@@ -82,32 +141,24 @@ class Member(models.Model):
         except:
             # If no rank is assigned, use the default rank from settings
             from rank.models import RankSettings
-            settings = RankSettings.objects.first()
+            settings = RankSettings.get_cached()
             if settings and settings.default_paygrade:
                 return settings.default_paygrade
             return None
 
     def get_rank_image(self):
-        """Get the rank image URL for the member based on their rank and the default theme"""
-        from rank.models import RankSettings, RankImage
-
-        # Get the member's rank (either assigned or default)
-        rank = self.get_rank()
-        if not rank:
-            return None
-
-        # Get the default theme from settings
-        settings = RankSettings.get_settings()
-        theme = settings.default_theme
-        if not theme:
-            return None
-
-        # Try to get the rank image for this rank and theme
-        try:
-            rank_image = RankImage.objects.get(rank=rank, theme=theme)
-            return rank_image.image.url
-        except RankImage.DoesNotExist:
-            return None
+        """Get the rank image URL for the member based on their rank and preferred (or default) theme"""
+        if not hasattr(self, 'rank_image_url'):
+            from rank.utils import RankResolver
+            RankResolver().resolve([self])
+        return self.rank_image_url
+
+    def get_rank_insignia(self):
+        """Like get_rank_image() but returns the rank.insignia.Insignia with the resized variants"""
+        if not hasattr(self, 'rank_insignia'):
+            from rank.utils import RankResolver
+            RankResolver().resolve([self])
+        return self.rank_insignia
 
     def get_full_name(self):
         """Get the member's full name without rank"""
@@ -116,13 +167,18 @@ class Member(models.Model):
 
     def get_ranked_name(self):
         """Return member name with rank prefix"""
+        if hasattr(self, 'ranked_name'):
+            # Already resolved in bulk by rank.utils.RankResolver
+            return self.ranked_name
+        if self.display_name:
+            return self.display_name
         try:
             # Try to get member's assigned rank
             rank = self.rank_association.rank.short_name
         except:
             # If no rank assigned, use default from settings
             from rank.models import RankSettings
-            settings = RankSettings.get_settings()
+            settings = RankSettings.get_cached()
             rank = settings.default_paygrade.short_name if settings and settings.default_paygrade else ''
 
         if rank:
@@ -137,15 +193,22 @@ class Member(models.Model):
             return f"{rank.short_name} {self.user.first_name} {self.user.last_name}"
         return self.get_full_name()
 
+    def compute_expiration_date(self, start=None):
+        """Expiration date for a membership period starting at ``start`` (default: now)"""
+        start = start or timezone.now()
+        frequency = self.membership_type.billing_frequency if self.membership_type else None
+        if frequency == 'lifetime':
+            return None
+        elif frequency == 'free':
+            return start + timedelta(days=365)  # 1 year free
+        elif frequency == 'monthly':
+            return start + timedelta(days=30)  # 30 days
+        elif frequency == 'yearly':
+            return start + timedelta(days=365)  # 1 year
+        return self.expiration_date
+
     def set_expiration_date(self):
-        if self.membership_type.billing_frequency == 'lifetime':
-            self.expiration_date = None
-        elif self.membership_type.billing_frequency == 'free':
-            self.expiration_date = timezone.now() + timedelta(days=365)  # 1 year free
-        elif self.membership_type.billing_frequency == 'monthly':
-            self.expiration_date = timezone.now() + timedelta(days=30)  # 30 days
-        elif self.membership_type.billing_frequency == 'yearly':
-            self.expiration_date = timezone.now() + timedelta(days=365)  # 1 year
+        self.expiration_date = self.compute_expiration_date()
         self.save()
 
     def is_active(self):
@@ -158,38 +221,15 @@ class Member(models.Model):
         return timezone.now() < self.expiration_date
 
     def approve(self, approver):
-        self.status = 'active'
-        self.approval_date = timezone.now()
-        self.approved_by = approver
-        self.set_expiration_date()
-        self.save()
-
-        # Assign default rank from settings
-        # Import here to avoid circular imports
-        from rank.models import RankSettings, MemberRank
-
-        # Check if member already has a rank assignment
-        try:
-            # This will raise MemberRank.DoesNotExist if no rank exists
-            self.rank_association
-            has_rank = True
-        except:
-            has_rank = False
-
-        # Only assign default rank if member doesn't already have one
-        if not has_rank:
-            settings = RankSettings.objects.first()
-            if settings and settings.default_paygrade:
-                MemberRank.objects.create(
-                    member=self,
-                    rank=settings.default_paygrade,
-                    assigned_by=approver,
-                    notes="Automatically assigned default rank upon membership approval."
-                )
-
-        # Import here to avoid circular import
-        from .utils import send_approval_email
-        send_approval_email(self)
+        """Approve this member; see Members.utils.approve_members"""
+        from .utils import approve_members
+        for approved in approve_members(Member.objects.filter(pk=self.pk), approver):
+            self.status = approved.status
+            self.approval_date = approved.approval_date
+            self.approved_by = approved.approved_by
+            self.expiration_date = approved.expiration_date
+        # A default rank may have been assigned
+        self._state.fields_cache.pop('rank_association', None)
 
     def reject(self):
         self.status = 'rejected'
@@ -210,9 +250,11 @@ class Child(models.Model):
         upload_to='child_profile_images/', 
         null=True, 
         blank=True,
-        validators=[validate_image_extension, validate_image_size],
+        validators=[validate_image_extension, validate_image_size, validate_image_content],
         help_text='Upload a profile image (JPG, PNG, or GIF, max 5MB)'
     )
+    # Resized copies of profile_image, built by the build_image_variants worker (see MCARS.images)
+    profile_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='active')
     child_id = models.CharField(max_length=50, unique=True, default=uuid.uuid4)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -227,6 +269,9 @@ class Child(models.Model):
 
     def get_ranked_name(self):
         """Return child name with rank prefix"""
+        if hasattr(self, 'ranked_name'):
+            # Already resolved in bulk by rank.utils.RankResolver
+            return self.ranked_name
         try:
             # Try to get child's assigned rank
             rank = self.child_rank_association.rank.short_name
@@ -242,35 +287,31 @@ class Child(models.Model):
         except:
             # If no rank is assigned, use the default rank from settings
             from rank.models import RankSettings
-            settings = RankSettings.objects.first()
+            settings = RankSettings.get_cached()
             if settings and settings.default_paygrade:
                 return settings.default_paygrade
             return None
 
     def get_rank_image(self):
-        """Get the rank image URL for the child based on their rank and the default theme"""
-        from rank.models import RankSettings, RankImage
-
-        # Get the child's rank (either assigned or default)
-        rank = self.get_rank()
-        if not rank:
-            return None
-
-        # Get the default theme from settings
-        settings = RankSettings.get_settings()
-        theme = settings.default_theme
-        if not theme:
-            return None
-
-        # Try to get the rank image for this rank and theme
-        try:
-            rank_image = RankImage.objects.get(rank=rank, theme=theme)
-            return rank_image.image.url
-        except RankImage.DoesNotExist:
-            return None
+        """Get the rank image URL for the child based on their rank and preferred (or default) theme"""
+        if not hasattr(self, 'rank_image_url'):
+            from rank.utils import RankResolver
+            RankResolver().resolve([self])
+        return self.rank_image_url
+
+    def get_rank_insignia(self):
+        """Like get_rank_image() but returns the rank.insignia.Insignia with the resized variants"""
+        if not hasattr(self, 'rank_insignia'):
+            from rank.utils import RankResolver
+            RankResolver().resolve([self])
+        return self.rank_insignia
 
     class Meta:
         verbose_name_plural = "Children"
+        indexes = [
+            # Keyset ordering of the people listing (rank.utils.people_page)
+            models.Index(fields=['last_name', 'first_name', 'id'], name='child_name_sort_idx'),
+        ]
 
 class Payment(models.Model):
     PAYMENT_STATUS_CHOICES = [
@@ -288,6 +329,12 @@ class Payment(models.Model):
     payment_method = models.CharField(max_length=50, blank=True)
     notes = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a member's payment history (newest first)
+            models.Index(fields=['member', '-payment_date', '-id'], name='payment_member_date_idx'),
+        ]
+
     def __str__(self):
         return f"Payment of ${self.amount} by {self.member} on {self.payment_date.strftime('%Y-%m-%d')}"
 
@@ -331,3 +378,105 @@ class FAQ(models.Model):
 
     def __str__(self):
         return self.question
+
+
+class OutboundEmail(models.Model):
+    """An email waiting to be delivered by the send_queued_emails worker."""
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Earliest time the worker may (re)try; also the lease expiry while sending
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbound_email_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class MemberImport(models.Model):
+    """A roster file loaded by Members.importer; resumes after rows_processed."""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_COMPLETED = 'completed'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ]
+
+    file = models.FileField(upload_to='member_imports/')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    # Status given to rows without a status column
+    default_status = models.CharField(max_length=20, choices=Member.STATUS_CHOICES, default='active')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    # Data rows (1-based, header excluded) already committed; the resume point
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='member_imports')
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{os.path.basename(self.file.name)} ({self.status})"
+
+
+class MemberImportError(models.Model):
+    """A roster row that was not imported, with the reason"""
+    REASON_INVALID = 'invalid'
+    REASON_CONFLICT = 'conflict'
+
+    REASON_CHOICES = [
+        (REASON_INVALID, 'Invalid'),
+        (REASON_CONFLICT, 'Already exists'),
+    ]
+
+    member_import = models.ForeignKey(MemberImport, on_delete=models.CASCADE, related_name='row_errors')
+    row = models.PositiveIntegerField()
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    # {field: [messages]}
+    errors = models.JSONField(default=dict)
+
+    class Meta:
+        ordering = ['member_import', 'row']
+
+    def __str__(self):
+        return f"Row {self.row}: {self.get_reason_display()}"
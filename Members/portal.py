@@ -0,0 +1,90 @@
+"""Member portal dashboard loader.
+
+The member row itself (status, dates, membership type, display_name) is read
+fresh on every request by member_profile_required with the joins in
+DASHBOARD_SELECT_RELATED.  The related data the dashboard shows (recent
+payments, children, rank insignia) is built once into a compact dict of plain
+values and cached per member for MEMBER_DASHBOARD_CACHE_TTL.
+
+The Payment/Child/MemberRank signals in Members.signals drop one member's entry;
+rank, theme and insignia changes bump a shared version that retires them all.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+
+DASHBOARD_SELECT_RELATED = (
+    'user', 'address', 'membership_type', 'rank_association__rank', 'rank_association__preferred_theme',
+)
+RECENT_PAYMENTS = 5
+CHILDREN_SHOWN = 3
+
+VERSION_KEY = 'members:dashboard:version'
+
+
+def _cache_key(member_id, version):
+    return f"members:dashboard:{version}:{member_id}"
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def build_member_dashboard(member):
+    """Recent payments, children and rank insignia for ``member`` as plain values"""
+    from rank.utils import RankResolver
+    from .models import Child, Payment
+
+    prefetch_related_objects(
+        [member],
+        Prefetch('children', queryset=Child.objects.order_by('id').only('id', 'parent_id', 'first_name', 'last_name', 'birthdate'),
+                 to_attr='dashboard_children'),
+        Prefetch('payments', queryset=Payment.objects.order_by('-payment_date', '-id')[:RECENT_PAYMENTS],
+                 to_attr='dashboard_payments'),
+    )
+    RankResolver().resolve([member])
+
+    return {
+        'rank_image_url': member.rank_image_url,
+        'rank_insignia': member.rank_insignia,
+        'child_count': len(member.dashboard_children),
+        'children': [
+            {'first_name': child.first_name, 'last_name': child.last_name, 'birthdate': child.birthdate}
+            for child in member.dashboard_children[:CHILDREN_SHOWN]
+        ],
+        'recent_payments': [
+            {
+                'payment_date': payment.payment_date,
+                'amount': payment.amount,
+                'status': payment.status,
+                'payment_method': payment.payment_method,
+            }
+            for payment in member.dashboard_payments
+        ],
+    }
+
+
+def load_member_dashboard(member):
+    """Return the cached dashboard data for ``member``, building it on a miss"""
+    key = _cache_key(member.pk, _version())
+    dashboard = cache.get(key)
+    if dashboard is None:
+        dashboard = build_member_dashboard(member)
+        cache.set(key, dashboard, settings.MEMBER_DASHBOARD_CACHE_TTL)
+    return dashboard
+
+
+def invalidate_member_dashboards(member_ids):
+    version = _version()
+    cache.delete_many([_cache_key(member_id, version) for member_id in member_ids])
+
+
+def invalidate_all_member_dashboards():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
@@ -0,0 +1,117 @@
+"""Member profile completeness.
+
+Member.profile_missing is a bitmask of the required profile fields that are
+blank and Member.profile_complete is ``profile_missing == 0``.  Both are written
+when the member is saved and by the Address/User signals in Members.signals, so
+portal views check a column instead of re-inspecting the user and address.
+"""
+from functools import wraps
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import redirect
+
+MISSING_PHONE = 1 << 0
+MISSING_STREET = 1 << 1
+MISSING_CITY = 1 << 2
+MISSING_STATE = 1 << 3
+MISSING_ZIP_CODE = 1 << 4
+MISSING_FIRST_NAME = 1 << 5
+MISSING_LAST_NAME = 1 << 6
+MISSING_EMAIL = 1 << 7
+
+MISSING_FIELD_LABELS = [
+    (MISSING_PHONE, 'phone number'),
+    (MISSING_STREET, 'street'),
+    (MISSING_CITY, 'city'),
+    (MISSING_STATE, 'state'),
+    (MISSING_ZIP_CODE, 'ZIP code'),
+    (MISSING_FIRST_NAME, 'first name'),
+    (MISSING_LAST_NAME, 'last name'),
+    (MISSING_EMAIL, 'email'),
+]
+
+
+def compute_profile_missing(phone_number, user, address):
+    """Bitmask of the blank required fields (0 means the profile is complete)"""
+    values = [
+        (MISSING_PHONE, phone_number),
+        (MISSING_STREET, address.street if address else ''),
+        (MISSING_CITY, address.city if address else ''),
+        (MISSING_STATE, address.state if address else ''),
+        (MISSING_ZIP_CODE, address.zip_code if address else ''),
+        (MISSING_FIRST_NAME, user.first_name),
+        (MISSING_LAST_NAME, user.last_name),
+        (MISSING_EMAIL, user.email),
+    ]
+    return sum(bit for bit, value in values if not (value or '').strip())
+
+
+def describe_missing(mask):
+    return [label for bit, label in MISSING_FIELD_LABELS if mask & bit]
+
+
+def refresh_profile_flags(queryset=None, batch_size=500):
+    """Recompute profile_missing/profile_complete in batches; returns the number of members changed"""
+    from .models import Member
+
+    if queryset is None:
+        queryset = Member.objects.all()
+    queryset = queryset.select_related('user', 'address').order_by('pk')
+
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        changed = []
+        for member in batch:
+            missing = compute_profile_missing(member.phone_number, member.user, member.address)
+            if member.profile_missing != missing or member.profile_complete != (missing == 0):
+                member.profile_missing = missing
+                member.profile_complete = missing == 0
+                changed.append(member)
+        Member.objects.bulk_update(changed, ['profile_missing', 'profile_complete'])
+        updated += len(changed)
+    return updated
+
+
+PORTAL_SELECT_RELATED = ('user', 'address', 'membership_type')
+
+
+def member_profile_required(view_func=None, *, select_related=PORTAL_SELECT_RELATED):
+    """Require a logged-in user with a complete member profile, available as ``request.member``.
+
+    The member is loaded with ``select_related`` (user, address and membership type
+    by default) in one joined query.  Users without a Member get a blank one and,
+    like members with an incomplete profile, are sent to edit_profile.
+    Use as ``@member_profile_required`` or ``@member_profile_required(select_related=...)``.
+    """
+    if view_func is None:
+        return lambda func: member_profile_required(func, select_related=select_related)
+
+    @wraps(view_func)
+    @login_required
+    def wrapper(request, *args, **kwargs):
+        from .models import Member
+        from .utils import create_member_if_needed
+
+        member = Member.objects.select_related(*select_related).filter(user_id=request.user.pk).first()
+        if member is None:
+            create_member_if_needed(request.user)
+            messages.info(request, "Welcome! Please complete your profile information to activate your membership.")
+            return redirect('members:edit_profile')
+        if not member.profile_complete:
+            missing = ', '.join(describe_missing(member.profile_missing))
+            messages.info(
+                request,
+                "Please complete your profile information to ensure you have full access to all member features"
+                + (f" (missing: {missing})." if missing else "."),
+            )
+            return redirect('members:edit_profile')
+
+        request.member = member
+        return view_func(request, *args, **kwargs)
+    return wrapper
@@ -13,7 +13,7 @@ from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.exceptions import ValidationError
-from .validators import validate_image_extension, validate_image_size
+from .validators import validate_image_content, validate_image_extension, validate_image_size
 
 @login_required
 def update_profile_image(request):
@@ -26,13 +26,14 @@ def update_profile_image(request):
             # Validate the file before saving
             validate_image_extension(uploaded_file)
             validate_image_size(uploaded_file)
+            validate_image_content(uploaded_file)
 
             # Delete old image file if it exists
             if member.profile_image:
                 if os.path.isfile(member.profile_image.path):
                     os.remove(member.profile_image.path)
 
-            # Save new image
+            # Save new image (EXIF is stripped and variants queued on save, see MCARS.images)
             member.profile_image = uploaded_file
             member.save()
 
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import cache
+
+# Group names behind each role helper (legacy spellings included)
+MEMBER_MANAGER_GROUPS = {'Rank Manager', 'rank_manager'}
+MEMBER_MANAGER_DISPLAY_GROUPS = {'member_manager', 'Member Manager'}
+RANK_MANAGER_GROUPS = {'rank_manager'}
+UNIT_MANAGER_GROUPS = {'unit_manager'}
+EVENTS_MANAGER_GROUPS = {'Events Manager'}
+
+
+def _cache_key(user_id):
+    return f"members:roles:{user_id}"
+
+
+class UserRoles:
+    """A user's group names plus staff/superuser flags.
+
+    Supports ``'unit_manager' in roles`` (also from templates via request.roles).
+    """
+
+    def __init__(self, groups=(), is_staff=False, is_superuser=False):
+        self.groups = frozenset(groups)
+        self.is_staff = is_staff
+        self.is_superuser = is_superuser
+
+    def __contains__(self, group_name):
+        return group_name in self.groups
+
+    def __iter__(self):
+        return iter(sorted(self.groups))
+
+    def has_any(self, group_names):
+        return not self.groups.isdisjoint(group_names)
+
+    @property
+    def is_member_manager(self):
+        return self.is_staff or self.has_any(MEMBER_MANAGER_GROUPS)
+
+    @property
+    def is_rank_manager(self):
+        return self.is_staff or self.has_any(RANK_MANAGER_GROUPS)
+
+    @property
+    def is_unit_manager(self):
+        return self.is_staff or self.has_any(UNIT_MANAGER_GROUPS)
+
+    @property
+    def is_events_manager(self):
+        return self.is_superuser or self.has_any(EVENTS_MANAGER_GROUPS)
+
+
+def get_roles(user):
+    """Return the UserRoles for ``user``, loaded at most once per user object.
+
+    Group names are cached per user (ROLE_CACHE_TTL) and dropped by the
+    m2m_changed/Group signals in Members.signals; staff/superuser flags are read
+    from the user object itself.
+    """
+    if user is None or not user.is_authenticated:
+        return UserRoles()
+    roles = getattr(user, '_roles', None)
+    if roles is None:
+        key = _cache_key(user.pk)
+        groups = cache.get(key)
+        if groups is None:
+            groups = list(user.groups.values_list('name', flat=True))
+            cache.set(key, groups, settings.ROLE_CACHE_TTL)
+        roles = UserRoles(groups, user.is_staff, user.is_superuser)
+        user._roles = roles
+    return roles
+
+
+def invalidate_roles(user_ids):
+    cache.delete_many([_cache_key(user_id) for user_id in user_ids])
@@ -0,0 +1,211 @@
+"""Member directory search.
+
+Every Member carries a normalized ``search_document`` (names, email, phone and
+membership ID).  PostgreSQL searches it through a ``to_tsvector`` GIN index with a
+pg_trgm index for substring/fuzzy matches; SQLite through an FTS5 external-content
+table kept in sync by triggers.  Other backends fall back to ``icontains``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+TOKEN_RE = re.compile(r'\w+')
+
+FTS_TABLE = 'members_member_fts'
+TSVECTOR_INDEX = 'members_member_search_tsv_idx'
+TRIGRAM_INDEX = 'members_member_search_trgm_idx'
+
+
+def tokenize(text):
+    return TOKEN_RE.findall((text or '').lower())
+
+
+def build_search_document(first_name='', last_name='', email='', phone_number='', membership_id=''):
+    """Lowercased, whitespace-separated terms stored in Member.search_document"""
+    terms = tokenize(f"{first_name} {last_name} {email}")
+    if email:
+        terms.append(email.lower())
+    digits = re.sub(r'\D', '', phone_number or '')
+    if digits:
+        terms.append(digits)
+    terms.extend(tokenize(phone_number))
+    terms.extend(tokenize(str(membership_id or '')))
+    return ' '.join(dict.fromkeys(terms))
+
+
+def _member_table():
+    from .models import Member
+    return Member._meta.db_table
+
+
+def _fts_available(conn):
+    return FTS_TABLE in conn.introspection.table_names()
+
+
+def search_members(queryset, query, name_and_email_only=False):
+    """Filter a Member queryset by ``query``, annotated with ``search_rank`` (higher is better).
+
+    ``name_and_email_only`` limits matches to names and email addresses: the
+    member directory is open to every member, who must not be able to look
+    people up by phone number or membership ID.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+    if name_and_email_only:
+        for token in tokens:
+            queryset = queryset.filter(
+                Q(user__first_name__icontains=token)
+                | Q(user__last_name__icontains=token)
+                | Q(user__email__icontains=token)
+            )
+
+    qn = connection.ops.quote_name
+    document = f"{qn(_member_table())}.{qn('search_document')}"
+
+    if connection.vendor == 'postgresql':
+        tsquery = ' & '.join(f"{token}:*" for token in tokens)
+        pattern = '%' + re.sub(r'([\\%_])', r'\\\1', query.strip().lower()) + '%'
+        return queryset.annotate(
+            search_rank=RawSQL(
+                f"ts_rank(to_tsvector('simple', {document}), to_tsquery('simple', %s))"
+                f" + similarity({document}, %s)",
+                (tsquery, query.strip().lower()),
+                output_field=FloatField(),
+            ),
+        ).filter(
+            pk__in=RawSQL(
+                f"SELECT id FROM {qn(_member_table())} WHERE"
+                f" to_tsvector('simple', search_document) @@ to_tsquery('simple', %s)"
+                f" OR search_document ILIKE %s",
+                (tsquery, pattern),
+            ),
+        )
+
+    if connection.vendor == 'sqlite' and _fts_available(connection):
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,)),
+        ).annotate(
+            # bm25() is lower-is-better; negate so every backend sorts on -search_rank
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}) FROM {FTS_TABLE}"
+                f" WHERE {FTS_TABLE} MATCH %s AND rowid = {qn(_member_table())}.{qn('id')})",
+                (match,),
+                output_field=FloatField(),
+            ),
+        )
+
+    for token in tokens:
+        queryset = queryset.filter(search_document__icontains=token)
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+def create_sqlite_triggers(cursor, table):
+    """Triggers keeping the FTS5 table in step with Member.search_document.
+
+    The only definition of this SQL: migrations 0011 and 0017 call it too.
+    """
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN"
+        f" INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document);"
+        f" END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN"
+        f" INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document)"
+        f" VALUES ('delete', old.id, old.search_document);"
+        f" END"
+    )
+    cursor.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF search_document ON {table} BEGIN"
+        f" INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document)"
+        f" VALUES ('delete', old.id, old.search_document);"
+        f" INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document);"
+        f" END"
+    )
+
+
+SQLITE_TRIGGERS = tuple(f"{FTS_TABLE}_{suffix}" for suffix in ('ai', 'ad', 'au'))
+
+
+def ensure_search_triggers(conn):
+    """Recreate the SQLite FTS triggers if a table rebuild dropped them; returns True if it did.
+
+    SQLite migrations that alter Members_member copy it into a new table, which
+    drops its triggers, so this runs after every migrate (see Members.signals).
+    The index is rebuilt because it missed any writes made in between.
+    """
+    if conn.vendor != 'sqlite' or not _fts_available(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)", SQLITE_TRIGGERS
+        )
+        if len(cursor.fetchall()) == len(SQLITE_TRIGGERS):
+            return False
+        create_sqlite_triggers(cursor, conn.ops.quote_name(_member_table()))
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return True
+
+
+def create_search_index(conn):
+    """Create the backend-specific search index for Member.search_document"""
+    table = conn.ops.quote_name(_member_table())
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TSVECTOR_INDEX} ON {table}"
+                f" USING GIN (to_tsvector('simple', search_document))"
+            )
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON {table}"
+                f" USING GIN (search_document gin_trgm_ops)"
+            )
+        elif conn.vendor == 'sqlite':
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}"
+                f" USING fts5(search_document, content={table}, content_rowid='id')"
+            )
+            create_sqlite_triggers(cursor, table)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def drop_search_index(conn):
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {TSVECTOR_INDEX}")
+            cursor.execute(f"DROP INDEX IF EXISTS {TRIGRAM_INDEX}")
+        elif conn.vendor == 'sqlite':
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            cursor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def refresh_search_documents(queryset=None, batch_size=500):
+    """Recompute Member.search_document in pk batches; returns the number of rows changed"""
+    from .models import Member
+
+    if queryset is None:
+        queryset = Member.objects.all()
+    queryset = queryset.select_related('user').order_by('pk')
+
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        changed = []
+        for member in batch:
+            document = member.build_search_document()
+            if member.search_document != document:
+                member.search_document = document
+                changed.append(member)
+        Member.objects.bulk_update(changed, ['search_document'])
+        updated += len(changed)
+    return updated
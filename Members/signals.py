@@ -0,0 +1,132 @@
+from django.contrib.auth.models import Group, User
+from django.db import connections, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from MCARS.images import track_image_variants
+from .models import Child, Member
+from .roles import invalidate_roles
+
+# Strip EXIF from profile pictures and queue their resized variants
+track_image_variants(Member, 'profile_image', 'profile_image_variants')
+track_image_variants(Child, 'profile_image', 'profile_image_variants')
+
+
+@receiver(post_save, sender=User)
+def refresh_display_name_on_user_change(sender, instance, update_fields=None, **kwargs):
+    """Keep Member.display_name, search_document and profile flags in step with the user's name and email"""
+    if update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields):
+        return
+
+    def refresh():
+        from .profile import refresh_profile_flags
+        from .search import refresh_search_documents
+        from .utils import refresh_display_names
+        members = Member.objects.filter(user_id=instance.pk)
+        refresh_display_names(members)
+        refresh_search_documents(members)
+        refresh_profile_flags(members)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender='Members.Address')
+def refresh_profile_flags_on_address_change(sender, instance, created=False, **kwargs):
+    """An edited address can complete (or un-complete) its member's profile"""
+    if created:
+        return
+    from .profile import refresh_profile_flags
+    refresh_profile_flags(Member.objects.filter(address_id=instance.pk))
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """Drop cached roles for users whose group membership changed"""
+    if reverse:
+        # group.user_set.add/remove/clear(); a clear needs its users before they are gone
+        if action == 'pre_clear':
+            instance._cleared_user_ids = list(instance.user_set.values_list('pk', flat=True))
+            return
+        if action == 'post_clear':
+            user_ids = getattr(instance, '_cleared_user_ids', [])
+        elif action in ('post_add', 'post_remove'):
+            user_ids = pk_set or []
+        else:
+            return
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        user_ids = [instance.pk]
+    else:
+        return
+    user_ids = list(user_ids)
+    invalidate_roles(user_ids)
+    # Again after commit, so a concurrent request cannot re-cache the old groups
+    transaction.on_commit(lambda: invalidate_roles(user_ids))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_roles_on_group_rename(sender, instance, **kwargs):
+    """Group names are cached, so renaming or deleting a group drops its members' roles"""
+    if instance.pk:
+        user_ids = list(instance.user_set.values_list('pk', flat=True))
+        invalidate_roles(user_ids)
+        transaction.on_commit(lambda: invalidate_roles(user_ids))
+
+
+@receiver(post_save, sender=Member)
+@receiver(post_delete, sender=Member)
+@receiver(post_save, sender='Members.Child')
+@receiver(post_delete, sender='Members.Child')
+@receiver(post_save, sender='rank.MemberRank')
+@receiver(post_delete, sender='rank.MemberRank')
+@receiver(post_save, sender='rank.ChildRank')
+@receiver(post_delete, sender='rank.ChildRank')
+@receiver(post_save, sender='rank.Rank')
+@receiver(post_delete, sender='rank.Rank')
+@receiver(post_save, sender='rank.RankImage')
+@receiver(post_delete, sender='rank.RankImage')
+@receiver(post_save, sender='rank.Theme')
+@receiver(post_delete, sender='rank.Theme')
+@receiver(post_save, sender='rank.Branch')
+@receiver(post_delete, sender='rank.Branch')
+@receiver(post_save, sender='rank.Genre')
+@receiver(post_delete, sender='rank.Genre')
+def invalidate_dashboard_stats_on_change(sender, **kwargs):
+    """Drop the cached dashboard counters once the change is committed"""
+    from .stats import invalidate_dashboard_stats
+    transaction.on_commit(invalidate_dashboard_stats)
+
+
+@receiver(post_save, sender='Members.Payment')
+@receiver(post_delete, sender='Members.Payment')
+@receiver(post_save, sender='Members.Child')
+@receiver(post_delete, sender='Members.Child')
+@receiver(post_save, sender='rank.MemberRank')
+@receiver(post_delete, sender='rank.MemberRank')
+def invalidate_member_dashboard_on_change(sender, instance, **kwargs):
+    """Drop the owning member's cached portal dashboard once the change is committed"""
+    from .portal import invalidate_member_dashboards
+    member_id = getattr(instance, 'member_id', None) or getattr(instance, 'parent_id', None)
+    if member_id:
+        transaction.on_commit(lambda: invalidate_member_dashboards([member_id]))
+
+
+@receiver(post_save, sender='rank.Rank')
+@receiver(post_delete, sender='rank.Rank')
+@receiver(post_save, sender='rank.RankImage')
+@receiver(post_delete, sender='rank.RankImage')
+@receiver(post_save, sender='rank.Theme')
+@receiver(post_delete, sender='rank.Theme')
+@receiver(post_save, sender='rank.RankSettings')
+def invalidate_member_dashboards_on_rank_change(sender, **kwargs):
+    """Insignia URLs in every cached portal dashboard may have changed"""
+    from .portal import invalidate_all_member_dashboards
+    transaction.on_commit(invalidate_all_member_dashboards)
+
+
+@receiver(post_migrate)
+def restore_search_triggers(sender, using='default', **kwargs):
+    """SQLite table rebuilds in later migrations drop the member search triggers"""
+    if sender.name == 'Members':
+        from .search import ensure_search_triggers
+        ensure_search_triggers(connections[using])
@@ -0,0 +1,61 @@
+"""Dashboard counters for the member and rank manager dashboards.
+
+Each table is read with a single aggregate query using conditional Count(filter=...).
+The result is cached for DASHBOARD_STATS_CACHE_TTL and dropped by the model signals
+in Members.signals (and explicitly by bulk writers that bypass signals).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+STATS_CACHE_KEY = 'dashboard:stats'
+
+
+def _member_stats():
+    from .models import Child, Member
+    members = Member.objects.aggregate(
+        total=Count('pk'),
+        pending=Count('pk', filter=Q(status='pending')),
+        active=Count('pk', filter=Q(status='active')),
+        expired=Count('pk', filter=Q(status='expired')),
+        with_ranks=Count('rank_association'),
+    )
+    children = Child.objects.aggregate(
+        total=Count('pk'),
+        with_ranks=Count('child_rank_association'),
+    )
+    return members, children
+
+
+def _rank_stats():
+    from rank.models import Branch, Genre, Rank, Theme
+
+    rank_total = Rank.objects.count()
+    themes = list(
+        Theme.objects.order_by('name')
+        .annotate(rank_count=Count('rank_images__rank', distinct=True))
+        .values('id', 'name', 'is_active', 'genre__name', 'branch__name', 'rank_count')
+    )
+    for theme in themes:
+        theme['coverage'] = round(100 * theme['rank_count'] / rank_total) if rank_total else 0
+    return {
+        'ranks': rank_total,
+        'themes': len(themes),
+        'branches': Branch.objects.count(),
+        'genres': Genre.objects.count(),
+        'theme_coverage': themes,
+    }
+
+
+def dashboard_stats():
+    """Return the cached dashboard counters, computing them on a miss"""
+    stats = cache.get(STATS_CACHE_KEY)
+    if stats is None:
+        members, children = _member_stats()
+        stats = {'members': members, 'children': children, 'ranks': _rank_stats()}
+        cache.set(STATS_CACHE_KEY, stats, settings.DASHBOARD_STATS_CACHE_TTL)
+    return stats
+
+
+def invalidate_dashboard_stats():
+    cache.delete(STATS_CACHE_KEY)
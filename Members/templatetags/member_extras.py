@@ -1,4 +1,5 @@
 from django import template
+from django.utils.html import format_html
 from django.utils.safestring import mark_safe
 from django.template.defaultfilters import stringfilter
 
@@ -18,30 +19,62 @@ def get_rank_image(member):
     """
     Returns the member's rank image URL (if applicable)
     """
-    if hasattr(member, 'rank_association') and member.rank_association and member.rank_association.preferred_theme:
-        # Try to get the image for the preferred theme
-        rank = member.rank_association.rank
-        theme = member.rank_association.preferred_theme
-        try:
-            from rank.models import RankImage
-            rank_image = RankImage.objects.filter(rank=rank, theme=theme).first()
-            if rank_image and rank_image.image:
-                return rank_image.image.url
-        except:
-            pass
+    if hasattr(member, 'rank_association') and member.rank_association and member.rank_association.preferred_theme_id:
+        # Image for the preferred theme, from the in-memory insignia table
+        from rank.insignia import get_insignia
+        association = member.rank_association
+        insignia = get_insignia(association.rank_id, association.preferred_theme_id)
+        if insignia:
+            return insignia.url
     return None
 
-    @register.filter
-    def is_manager(user):
-        """Check if user has manager privileges"""
-        return user.groups.filter(name__in=['member_manager', 'Member Manager']).exists() or user.is_staff
+@register.simple_tag
+def rank_insignia(person, width, alt='', css_class='', style=''):
+    """
+    Render a rank insignia as <picture> with WebP/PNG srcsets for a ``width`` px slot.
+    ``person`` is a Member/Child or a rank.insignia.Insignia.
+    """
+    insignia = person.get_rank_insignia() if hasattr(person, 'get_rank_insignia') else person
+    if not insignia:
+        return ''
+    if not insignia.variants:
+        return format_html('<img src="{}" alt="{}" class="{}" style="{}">', insignia.url, alt, css_class, style)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}px">'
+        '<img src="{}" srcset="{}" sizes="{}px" alt="{}" class="{}" style="{}"></picture>',
+        insignia.srcset('webp'), width, insignia.src(width), insignia.srcset('png'), width, alt, css_class, style,
+    )
+
+@register.simple_tag
+def image_variant(field_file, size, alt='', css_class='', style=''):
+    """
+    Render an uploaded image at a named variant size ('small', 'medium' or 'large')
+    as <picture> with a WebP source, or the original until its variants are built.
+    """
+    from MCARS.images import variant_urls
+    if not field_file:
+        return ''
+    urls = variant_urls(field_file, size)
+    if urls is None:
+        return format_html('<img src="{}" alt="{}" class="{}" style="{}">', field_file.url, alt, css_class, style)
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}"><img src="{}" alt="{}" class="{}" style="{}"></picture>',
+        urls[0], urls[1], alt, css_class, style,
+    )
+
+@register.filter
+def is_manager(user):
+    """Check if user has manager privileges"""
+    from Members.roles import MEMBER_MANAGER_DISPLAY_GROUPS, get_roles
+    roles = get_roles(user)
+    return roles.is_staff or roles.has_any(MEMBER_MANAGER_DISPLAY_GROUPS)
 
-    @register.simple_tag
-    def parent_link(parent, user):
-        """Generate parent name as link if user has manager privileges, otherwise plain text"""
-        if user.groups.filter(name__in=['member_manager', 'Member Manager']).exists() or user.is_staff:
-            from django.urls import reverse
-            url = reverse('members:member_detail', args=[parent.id])
-            return format_html('<a href="{}" class="text-decoration-none">{}</a>', url, parent.get_ranked_name())
-        else:
-            return parent.get_ranked_name()
+@register.simple_tag
+def parent_link(parent, user):
+    """Generate parent name as link if user has manager privileges, otherwise plain text"""
+    if is_manager(user):
+        from django.urls import reverse
+        url = reverse('members:member_detail', args=[parent.id])
+        return format_html('<a href="{}" class="text-decoration-none">{}</a>', url, parent.get_ranked_name())
+    else:
+        return parent.get_ranked_name()
@@ -1,3 +1,566 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import Group, User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from rank.models import MemberRank, MemberRankHistory, Rank, RankSettings
+
+from . import importer
+from .importer import run_import, run_pending_imports
+from .models import Member, MemberImport, MemberImportError, MembershipType, OutboundEmail
+from .roles import get_roles
+from .search import FTS_TABLE, SQLITE_TRIGGERS, ensure_search_triggers, search_members
+from .utils import (
+    DEFAULT_RANK_APPROVAL_NOTE, _claim_queued_emails, approve_members, expire_memberships, queue_email,
+    queue_renewal_reminders, send_queued_emails,
+)
+
+
+def make_member(username, first_name='Test', last_name='Member', **kwargs):
+    user = User.objects.create_user(
+        username, email=f'{username}@example.com', first_name=first_name, last_name=last_name,
+    )
+    kwargs.setdefault('phone_number', '555-0100')
+    return Member.objects.create(user=user, **kwargs)
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_QUEUE_BATCH_SIZE=50,
+    EMAIL_QUEUE_MAX_ATTEMPTS=3,
+    EMAIL_QUEUE_RETRY_BACKOFF=60,
+    EMAIL_QUEUE_LEASE_SECONDS=300,
+)
+class SendQueuedEmailsTests(TestCase):
+    def test_sends_queued_email_once(self):
+        email = queue_email('Hello', 'Body', ['a@example.com'], html_message='<p>Body</p>')
+
+        self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['a@example.com'])
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual(email.attempts, 1)
+        self.assertIsNotNone(email.sent_at)
+
+    def test_leased_email_is_skipped_until_the_lease_expires(self):
+        email = queue_email('Hello', 'Body', ['a@example.com'])
+        self.assertEqual([e.pk for e in _claim_queued_emails(10)], [email.pk])
+
+        # Another worker sees nothing while the lease holds
+        self.assertEqual(send_queued_emails(), (0, 0))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_SENDING)
+        self.assertGreater(email.next_attempt_at, timezone.now() + timedelta(seconds=290))
+
+        # A worker that died mid-batch leaves the lease to expire; the email is retried
+        OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(send_queued_emails(), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_failures_back_off_exponentially_then_give_up(self):
+        email = queue_email('Hello', 'Body', ['a@example.com'])
+        failing = mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP down'),
+        )
+
+        with failing, self.assertLogs('Members.utils', 'WARNING'):
+            for attempt, delay in ((1, 60), (2, 120)):
+                before = timezone.now()
+                self.assertEqual(send_queued_emails(), (0, 1))
+                email.refresh_from_db()
+                self.assertEqual(email.status, OutboundEmail.STATUS_PENDING)
+                self.assertEqual(email.attempts, attempt)
+                self.assertEqual(email.last_error, 'SMTP down')
+                self.assertGreaterEqual(email.next_attempt_at, before + timedelta(seconds=delay))
+                self.assertLessEqual(email.next_attempt_at, timezone.now() + timedelta(seconds=delay))
+
+                # Not due yet
+                self.assertEqual(send_queued_emails(), (0, 0))
+                OutboundEmail.objects.filter(pk=email.pk).update(next_attempt_at=timezone.now())
+
+            self.assertEqual(send_queued_emails(), (0, 1))
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.STATUS_FAILED)
+        self.assertEqual(email.attempts, 3)
+        self.assertEqual(send_queued_emails(), (0, 0))
+        self.assertEqual(mail.outbox, [])
+
+    def test_one_failure_does_not_stop_the_batch(self):
+        first = queue_email('First', 'Body', ['a@example.com'])
+        second = queue_email('Second', 'Body', ['b@example.com'])
+        real_send = mail.get_connection().__class__.send_messages
+
+        def flaky(backend, messages):
+            if messages[0].subject == 'First':
+                raise OSError('rejected')
+            return real_send(backend, messages)
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', flaky), \
+                self.assertLogs('Members.utils', 'WARNING'):
+            self.assertEqual(send_queued_emails(), (1, 1))
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, OutboundEmail.STATUS_PENDING)
+        self.assertEqual(second.status, OutboundEmail.STATUS_SENT)
+        self.assertEqual([m.subject for m in mail.outbox], ['Second'])
+
+
+class MemberSearchViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.target = Member.objects.create(
+            user=User.objects.create_user('jdoe', email='quartermaster@example.com', first_name='Jane', last_name='Doe'),
+            phone_number='555-0100', membership_id='ZX-1701',
+        )
+        cls.member = User.objects.create_user('crew')
+        cls.manager = User.objects.create_user('boss', is_staff=True)
+
+    def search(self, user, q):
+        self.client.force_login(user)
+        response = self.client.get(reverse('members:member_search'), {'q': q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results']
+
+    def test_everyone_signed_in_matches_names(self):
+        for user in (self.member, self.manager):
+            with self.subTest(user=user.username):
+                self.assertEqual([r['id'] for r in self.search(user, 'jane d')], [self.target.pk])
+
+    def test_managers_match_and_see_email_and_membership_id(self):
+        for q in ('quarterm', 'zx-17'):
+            with self.subTest(q=q):
+                results = self.search(self.manager, q)
+                self.assertEqual([r['id'] for r in results], [self.target.pk])
+                self.assertEqual(results[0]['email'], 'quartermaster@example.com')
+                self.assertEqual(results[0]['membership_id'], 'ZX-1701')
+
+    def test_other_members_cannot_match_or_see_email_and_membership_id(self):
+        self.assertEqual(self.search(self.member, 'quarterm'), [])
+        self.assertEqual(self.search(self.member, 'zx-17'), [])
+        self.assertEqual(self.search(self.member, 'doe'), [{'id': self.target.pk, 'text': str(self.target)}])
+
+
+class MemberSearchIndexTests(TestCase):
+    """The test database is built by running every migration, table rebuilds included"""
+
+    def trigger_names(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            return {name for name, in cursor.fetchall()}
+
+    def search(self, query):
+        return list(search_members(Member.objects.all(), query).values_list('user__username', flat=True))
+
+    def test_sqlite_triggers_survive_migrations(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite FTS5 index')
+        self.assertIn(FTS_TABLE, connection.introspection.table_names())
+        self.assertLessEqual(set(SQLITE_TRIGGERS), self.trigger_names())
+        self.assertFalse(ensure_search_triggers(connection))
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        # Usernames differ from the names because the email address is indexed too
+        member = make_member('jl', first_name='Jean', last_name='Picard')
+        make_member('riker', first_name='William', last_name='Riker')
+
+        self.assertEqual(self.search('pic'), ['jl'])
+
+        member.user.last_name = 'Locutus'
+        member.user.save()
+        member.save()
+        self.assertEqual(self.search('locu'), ['jl'])
+        self.assertEqual(self.search('picard'), [])
+
+        member.delete()
+        self.assertEqual(self.search('locu'), [])
+        self.assertEqual(self.search('riker'), ['riker'])
+
+    def test_dropped_triggers_are_recreated_and_the_index_rebuilt(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite FTS5 index')
+        with connection.cursor() as cursor:
+            for trigger in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER {trigger}")
+        # Written while the triggers were missing, as during a table rebuild
+        make_member('data', first_name='Noonian', last_name='Soong')
+
+        self.assertTrue(ensure_search_triggers(connection))
+
+        self.assertLessEqual(set(SQLITE_TRIGGERS), self.trigger_names())
+        self.assertEqual(self.search('noonian'), ['data'])
+
+    def test_directory_search_ignores_phone_numbers_and_membership_ids(self):
+        make_member('jl', first_name='Jean', last_name='Picard', phone_number='555-1701', membership_id='NCC-1701')
+
+        for query in ('555', '5551701', 'ncc', '1701'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search(query), ['jl'])
+                directory = search_members(Member.objects.all(), query, name_and_email_only=True)
+                self.assertFalse(directory.exists())
+        for query in ('jean', 'pica', 'jl@example'):
+            with self.subTest(query=query):
+                directory = search_members(Member.objects.all(), query, name_and_email_only=True)
+                self.assertEqual(list(directory.values_list('user__username', flat=True)), ['jl'])
+
+    def test_directory_view_does_not_find_members_by_phone_number(self):
+        make_member('jl', first_name='Jean', last_name='Picard', phone_number='555-1701')
+        self.client.force_login(User.objects.create_user('crew'))
+
+        found = self.client.get(reverse('members:public_member_list'), {'q': 'picard'})
+        not_found = self.client.get(reverse('members:public_member_list'), {'q': '5551701'})
+
+        self.assertEqual([m.user.username for m in found.context['page_obj']], ['jl'])
+        self.assertEqual(list(not_found.context['page_obj']), [])
+
+
+class RoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('ensign')
+        self.group, _ = Group.objects.get_or_create(name='Rank Manager')
+
+    def roles(self):
+        # A fresh user object, as on the next request, so only the shared cache carries over
+        return get_roles(User.objects.get(pk=self.user.pk))
+
+    def test_roles_are_cached_between_requests(self):
+        self.assertFalse(self.roles().is_member_manager)
+        with self.assertNumQueries(1):
+            self.assertFalse(self.roles().is_member_manager)
+
+    def test_adding_and_removing_a_group_invalidates_cached_roles(self):
+        for add, remove in (
+            (lambda: self.user.groups.add(self.group), lambda: self.user.groups.remove(self.group)),
+            (lambda: self.group.user_set.add(self.user), lambda: self.group.user_set.remove(self.user)),
+            (lambda: self.user.groups.add(self.group), lambda: self.user.groups.clear()),
+            (lambda: self.group.user_set.add(self.user), lambda: self.group.user_set.clear()),
+        ):
+            self.assertFalse(self.roles().is_member_manager)
+            with self.captureOnCommitCallbacks(execute=True):
+                add()
+            self.assertTrue(self.roles().is_member_manager)
+            with self.captureOnCommitCallbacks(execute=True):
+                remove()
+            self.assertFalse(self.roles().is_member_manager)
+
+    def test_renaming_or_deleting_a_group_invalidates_cached_roles(self):
+        events, _ = Group.objects.get_or_create(name='Events Manager')
+        self.user.groups.add(events)
+        self.assertTrue(self.roles().is_events_manager)
+
+        events.name = 'Former Events Manager'
+        events.save()
+        self.assertFalse(self.roles().is_events_manager)
+
+        self.user.groups.add(self.group)
+        self.assertTrue(self.roles().is_member_manager)
+        self.group.delete()
+        self.assertFalse(self.roles().is_member_manager)
+
+    @override_settings(ROLE_CACHE_TTL=10)
+    def test_cached_roles_expire_after_the_ttl(self):
+        with mock.patch('Members.roles.cache.set', wraps=cache.set) as cache_set:
+            self.roles()
+        self.assertEqual(cache_set.call_args.args[2], 10)
+
+
+class ApproveMembersTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.yearly = MembershipType.objects.create(
+            name='Annual', description='', price=10, duration_months=12, billing_frequency='yearly',
+        )
+        cls.ensign = Rank.objects.create(paygrade='O-1', short_name='ENS', long_name='Ensign', order=1)
+        cls.captain = Rank.objects.create(paygrade='O-6', short_name='CAPT', long_name='Captain', order=6)
+        cls.manager = User.objects.create_user('boss', is_staff=True)
+
+    def setUp(self):
+        RankSettings.objects.update_or_create(pk=1, defaults={'default_paygrade': self.ensign})
+        RankSettings.invalidate_cache()
+        # The cached copy outlives the test's rolled-back rows
+        self.addCleanup(RankSettings.invalidate_cache)
+
+    def pending(self, username, **kwargs):
+        return make_member(username, membership_type=self.yearly, **kwargs)
+
+    def test_sets_status_dates_and_approver_in_bulk(self):
+        members = [self.pending(f'm{i}') for i in range(3)]
+        before = timezone.now()
+
+        approved = approve_members(Member.objects.filter(pk__in=[m.pk for m in members]), self.manager)
+
+        self.assertEqual(sorted(m.pk for m in approved), sorted(m.pk for m in members))
+        for member in Member.objects.filter(pk__in=[m.pk for m in members]):
+            self.assertEqual(member.status, 'active')
+            self.assertEqual(member.approved_by, self.manager)
+            self.assertGreaterEqual(member.approval_date, before)
+            self.assertEqual(member.expiration_date, member.approval_date + timedelta(days=365))
+
+    def test_default_rank_only_goes_to_unranked_members(self):
+        unranked = self.pending('unranked')
+        ranked = self.pending('ranked')
+        MemberRank.objects.create(member=ranked, rank=self.captain)
+
+        approve_members(Member.objects.filter(pk__in=[unranked.pk, ranked.pk]), self.manager)
+
+        self.assertEqual(MemberRank.objects.get(member=unranked).rank, self.ensign)
+        self.assertEqual(MemberRank.objects.get(member=ranked).rank, self.captain)
+        history = MemberRankHistory.objects.get(member=unranked)
+        self.assertEqual(history.change_type, 'initial')
+        self.assertEqual(history.notes, DEFAULT_RANK_APPROVAL_NOTE)
+        self.assertFalse(MemberRankHistory.objects.filter(member=ranked, rank=self.ensign).exists())
+
+    def test_queues_one_email_per_member(self):
+        members = [self.pending(f'm{i}') for i in range(3)]
+
+        approve_members(Member.objects.filter(pk__in=[m.pk for m in members]), self.manager)
+
+        emails = OutboundEmail.objects.filter(subject='Your Membership Has Been Approved')
+        self.assertEqual(sorted(e.to[0] for e in emails), sorted(m.user.email for m in members))
+        self.assertEqual(mail.outbox, [])
+
+    def test_nothing_to_approve(self):
+        self.assertEqual(approve_members(Member.objects.none(), self.manager), [])
+        self.assertFalse(OutboundEmail.objects.exists())
+
+
+class BulkApproveMembersViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create_user('boss', is_staff=True)
+        cls.pending = [make_member(f'p{i}') for i in range(2)]
+        cls.already = make_member('already', status='active', approval_date=timezone.now() - timedelta(days=30))
+        cls.rejected = make_member('rejected', status='rejected')
+
+    def test_approves_only_pending_members(self):
+        self.client.force_login(self.manager)
+        ids = [m.pk for m in self.pending] + [self.already.pk, self.rejected.pk, 'junk', 999999]
+
+        response = self.client.post(reverse('members:bulk_approve_members'), {'member_ids': ids})
+
+        self.assertRedirects(response, reverse('members:pending_approvals'), fetch_redirect_response=False)
+        statuses = dict(Member.objects.values_list('user__username', 'status'))
+        self.assertEqual(statuses, {'p0': 'active', 'p1': 'active', 'already': 'active', 'rejected': 'rejected'})
+        self.already.refresh_from_db()
+        self.assertIsNone(self.already.approved_by)
+        self.assertEqual(
+            sorted(e.to[0] for e in OutboundEmail.objects.all()), ['p0@example.com', 'p1@example.com'],
+        )
+
+    def test_requires_a_member_manager(self):
+        self.client.force_login(User.objects.create_user('crew'))
+
+        self.client.post(reverse('members:bulk_approve_members'), {'member_ids': [m.pk for m in self.pending]})
+
+        self.assertFalse(Member.objects.filter(status='active', approved_by__isnull=False).exists())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+
+class MembershipExpiryTests(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def active(self, username, expires_in, **kwargs):
+        return make_member(username, status='active', expiration_date=self.now + expires_in, **kwargs)
+
+    def expire(self, chunk_size):
+        with CaptureQueriesContext(connection) as queries:
+            expired = expire_memberships(now=self.now, chunk_size=chunk_size)
+        updates = [q for q in queries.captured_queries if q['sql'].startswith('UPDATE')]
+        return expired, len(updates)
+
+    def test_expires_in_chunks_up_to_and_across_the_boundary(self):
+        for size in (3, 4):
+            with self.subTest(due=size):
+                Member.objects.all().delete()
+                due = [self.active(f'due{size}-{i}', -timedelta(days=i + 1)) for i in range(size)]
+                current = self.active(f'current{size}', timedelta(days=1))
+                at_now = self.active(f'now{size}', timedelta(0))
+                lifetime = make_member(f'life{size}', status='active')
+
+                # 3 due rows fill exactly one chunk; 4 spill into a second
+                self.assertEqual(self.expire(chunk_size=3), (size, 1 if size == 3 else 2))
+
+                self.assertEqual(
+                    set(Member.objects.filter(status='expired').values_list('pk', flat=True)), {m.pk for m in due},
+                )
+                for member in (current, at_now, lifetime):
+                    member.refresh_from_db()
+                    self.assertEqual(member.status, 'active')
+                self.assertEqual(self.expire(chunk_size=3), (0, 0))
+
+    def test_other_statuses_are_left_alone(self):
+        cancelled = make_member('cancelled', status='cancelled', expiration_date=self.now - timedelta(days=1))
+
+        self.assertEqual(self.expire(chunk_size=10), (0, 0))
+        cancelled.refresh_from_db()
+        self.assertEqual(cancelled.status, 'cancelled')
+
+    def test_reminders_are_off_by_default(self):
+        self.active('soon', timedelta(days=3))
+
+        self.assertEqual(queue_renewal_reminders(now=self.now), 0)
+        out = StringIO()
+        call_command('expire_memberships', stdout=out)
+        self.assertIn('queued 0 renewal reminder(s)', out.getvalue())
+        self.assertFalse(OutboundEmail.objects.exists())
+
+    def test_reminds_each_member_once_per_expiration_date(self):
+        soon = self.active('soon', timedelta(days=3))
+        self.active('later', timedelta(days=30))
+
+        self.assertEqual(queue_renewal_reminders(days=7, now=self.now), 1)
+        self.assertEqual(queue_renewal_reminders(days=7, now=self.now), 0)
+        soon.refresh_from_db()
+        self.assertEqual(soon.renewal_reminder_sent_for, soon.expiration_date)
+        self.assertEqual([e.to for e in OutboundEmail.objects.all()], [['soon@example.com']])
+
+        # A renewed membership that comes due again gets a fresh reminder
+        Member.objects.filter(pk=soon.pk).update(expiration_date=self.now + timedelta(days=5))
+        self.assertEqual(queue_renewal_reminders(days=7, now=self.now), 1)
+        self.assertEqual(OutboundEmail.objects.count(), 2)
+
+    def test_members_without_an_email_are_skipped(self):
+        no_email = self.active('noemail', timedelta(days=3))
+        User.objects.filter(pk=no_email.user_id).update(email='')
+        self.active('withemail', timedelta(days=3))
+
+        self.assertEqual(queue_renewal_reminders(days=7, now=self.now, batch_size=1), 1)
+
+        self.assertEqual([e.to for e in OutboundEmail.objects.all()], [['withemail@example.com']])
+        no_email.refresh_from_db()
+        self.assertIsNone(no_email.renewal_reminder_sent_for)
+
+    @override_settings(MEMBERSHIP_RENEWAL_REMINDER_DAYS=7)
+    def test_reminders_follow_the_setting(self):
+        self.active('soon', timedelta(days=3))
+
+        self.assertEqual(queue_renewal_reminders(now=self.now), 1)
+
+
+@override_settings(MEMBER_IMPORT_CHUNK_SIZE=2)
+class MemberImportTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def make_import(self, content, file_format='csv'):
+        job = MemberImport(format=file_format)
+        job.file.save(f'roster.{file_format}', ContentFile(content.encode()), save=False)
+        job.save()
+        return job
+
+    def test_imports_valid_rows_and_reports_conflicts_and_errors(self):
+        make_member('taken')
+        job = self.make_import(
+            'username,email,first_name,last_name,membership_id\n'
+            'jdoe,jdoe@example.com,Jane,Doe,M-1\n'
+            'taken,other@example.com,Tom,Taken,M-2\n'
+            'bad,not-an-email,Bad,Row,M-3\n'
+            'jdoe2,JDOE@example.com,Jane,Again,M-4\n'
+            'rsmith,rsmith@example.com,Rob,Smith,M-1\n'
+            'asmith,asmith@example.com,Ann,Smith,\n'
+        )
+
+        run_import(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, MemberImport.STATUS_COMPLETED)
+        self.assertEqual(job.rows_processed, 6)
+        self.assertEqual((job.created_count, job.skipped_count, job.error_count), (2, 3, 1))
+        self.assertQuerySetEqual(
+            Member.objects.filter(user__username__in=['jdoe', 'asmith']).order_by('user__username'),
+            ['asmith', 'jdoe'], transform=lambda m: m.user.username,
+        )
+        self.assertEqual(Member.objects.get(user__username='jdoe').membership_id, 'M-1')
+
+        errors = {e.row: e for e in job.row_errors.all()}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5])
+        self.assertEqual(errors[2].reason, MemberImportError.REASON_CONFLICT)
+        self.assertIn('username', errors[2].errors)
+        self.assertEqual(errors[3].reason, MemberImportError.REASON_INVALID)
+        self.assertIn('email', errors[3].errors)
+        # Conflicts with rows earlier in the same file
+        self.assertIn('email', errors[4].errors)
+        self.assertIn('membership_id', errors[5].errors)
+
+    def test_reimporting_a_finished_file_creates_nothing(self):
+        content = 'username,email,first_name,last_name\njdoe,jdoe@example.com,Jane,Doe\n'
+        run_import(self.make_import(content))
+
+        again = run_import(self.make_import(content))
+
+        self.assertEqual((again.created_count, again.skipped_count), (0, 1))
+        self.assertEqual(Member.objects.filter(user__username='jdoe').count(), 1)
+
+    def test_jsonl_lines_that_are_not_objects_are_reported(self):
+        job = run_import(self.make_import(
+            '{"username": "jdoe", "email": "jdoe@example.com", "first_name": "Jane", "last_name": "Doe"}\n'
+            '\n'
+            '[1, 2]\n',
+            file_format='jsonl',
+        ))
+
+        self.assertEqual((job.rows_processed, job.created_count, job.error_count), (2, 1, 1))
+        self.assertEqual(job.row_errors.get().row, 2)
+
+    def test_failed_import_resumes_after_the_last_committed_chunk(self):
+        job = self.make_import(
+            'username,email,first_name,last_name\n'
+            + ''.join(f'user{i},user{i}@example.com,User,Number{i}\n' for i in range(1, 6))
+        )
+        real_insert = importer._insert
+        calls = []
+
+        def insert_then_fail(rows, batch_size):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise RuntimeError('database went away')
+            return real_insert(rows, batch_size)
+
+        with mock.patch.object(importer, '_insert', insert_then_fail), self.assertLogs('Members.importer', 'ERROR'):
+            with self.assertRaises(RuntimeError):
+                run_import(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, MemberImport.STATUS_FAILED)
+        self.assertEqual(job.rows_processed, 2)
+        self.assertEqual(job.last_error, 'database went away')
+        self.assertEqual(Member.objects.count(), 2)
+
+        run_import(job)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, MemberImport.STATUS_COMPLETED)
+        self.assertEqual((job.rows_processed, job.created_count, job.skipped_count), (5, 5, 0))
+        self.assertEqual(Member.objects.count(), 5)
+
+    def test_worker_runs_pending_imports_once(self):
+        job = self.make_import('username,email,first_name,last_name\njdoe,jdoe@example.com,Jane,Doe\n')
+
+        self.assertEqual(run_pending_imports(), (1, 0))
+        self.assertEqual(run_pending_imports(), (0, 0))
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, MemberImport.STATUS_COMPLETED)
+        self.assertEqual(job.created_count, 1)
@@ -17,6 +17,7 @@ urlpatterns = [
 
     # Authenticated public directory
     path('directory/', views.public_member_list, name='public_member_list'),
+    path('members/search/', views.member_search, name='member_search'),
 
     # Authentication
     path('register/', views.register, name='register'),
@@ -46,8 +47,13 @@ urlpatterns = [
     path('manager/dashboard/', views.manager_dashboard, name='manager_dashboard'),
     path('manager/pending-approvals/', views.pending_approvals, name='pending_approvals'),
     path('manager/approve/<int:member_id>/', views.approve_member, name='approve_member'),
+    path('manager/approve/bulk/', views.bulk_approve_members, name='bulk_approve_members'),
+    path('manager/dashboard/stats/', views.dashboard_stats_json, name='dashboard_stats'),
     path('manager/reject/<int:member_id>/', views.reject_member, name='reject_member'),
     path('manager/members/', views.member_list, name='member_list'),
+    path('manager/members/import/', views.member_import, name='member_import'),
+    path('manager/members/import/<int:import_id>/', views.member_import_detail, name='member_import_detail'),
+    path('manager/export/<slug:dataset>/', views.export_data, name='export_data'),
     path('manager/member/<int:member_id>/', views.member_detail, name='member_detail'),
     path('manager/member/<int:member_id>/update-roles/', views.update_user_roles, name='update_user_roles'),
 
@@ -1,9 +1,122 @@
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from datetime import timedelta
+import logging
 import re
 
+from .stats import invalidate_dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+# Outbound email queue
+def queue_email(subject, message, recipient_list, from_email=None, html_message=None):
+    """Queue an email for the send_queued_emails worker instead of sending it inline.
+
+    Takes the same core arguments as django.core.mail.send_mail.
+    """
+    from .models import OutboundEmail
+    return OutboundEmail.objects.create(
+        subject=subject,
+        body=message,
+        html_body=html_message or '',
+        from_email=from_email or '',
+        to=list(recipient_list),
+    )
+
+
+def queue_individual_emails(subject, message, recipient_list, from_email=None, html_message=None):
+    """Queue one copy of an email per recipient (one INSERT), so recipients are not disclosed to each other"""
+    from .models import OutboundEmail
+    return OutboundEmail.objects.bulk_create([
+        OutboundEmail(
+            subject=subject,
+            body=message,
+            html_body=html_message or '',
+            from_email=from_email or '',
+            to=[recipient],
+        )
+        for recipient in dict.fromkeys(recipient_list)
+    ])
+
+
+def _claim_queued_emails(batch_size):
+    """Lease up to batch_size due emails so concurrent workers skip them"""
+    from .models import OutboundEmail
+    now = timezone.now()
+    with transaction.atomic():
+        due = (
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=[OutboundEmail.STATUS_PENDING, OutboundEmail.STATUS_SENDING], next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        emails = list(due)
+        lease_until = now + timedelta(seconds=settings.EMAIL_QUEUE_LEASE_SECONDS)
+        OutboundEmail.objects.filter(pk__in=[e.pk for e in emails]).update(
+            status=OutboundEmail.STATUS_SENDING, next_attempt_at=lease_until
+        )
+    return emails
+
+
+def send_queued_emails(batch_size=None, max_attempts=None):
+    """Deliver one batch of queued emails over a single backend connection.
+
+    Each message gets its own status: sent, or rescheduled with exponential
+    backoff until max_attempts, after which it is marked failed.
+    Returns a (sent, failed) tuple; failed counts retries as well.
+    """
+    from .models import OutboundEmail
+    batch_size = batch_size or settings.EMAIL_QUEUE_BATCH_SIZE
+    max_attempts = max_attempts or settings.EMAIL_QUEUE_MAX_ATTEMPTS
+
+    emails = _claim_queued_emails(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        for email in emails:
+            message = EmailMultiAlternatives(
+                email.subject,
+                email.body,
+                email.from_email or settings.DEFAULT_FROM_EMAIL,
+                email.to,
+                connection=connection,
+            )
+            if email.html_body:
+                message.attach_alternative(email.html_body, 'text/html')
+
+            email.attempts += 1
+            try:
+                connection.open()
+                connection.send_messages([message])
+            except Exception as exc:
+                logger.warning("Sending queued email %s failed (attempt %s): %s", email.pk, email.attempts, exc)
+                email.last_error = str(exc)
+                if email.attempts >= max_attempts:
+                    email.status = OutboundEmail.STATUS_FAILED
+                else:
+                    email.status = OutboundEmail.STATUS_PENDING
+                    delay = settings.EMAIL_QUEUE_RETRY_BACKOFF * (2 ** (email.attempts - 1))
+                    email.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+                failed += 1
+                # The connection may be unusable after an error; reopen on the next message
+                connection.close()
+            else:
+                email.status = OutboundEmail.STATUS_SENT
+                email.sent_at = timezone.now()
+                email.last_error = ''
+                sent += 1
+            email.save(update_fields=['status', 'attempts', 'last_error', 'next_attempt_at', 'sent_at'])
+    finally:
+        connection.close()
+    return sent, failed
+
 # Email functions
 def send_registration_email(member):
     """Send email to new member when they register"""
@@ -15,14 +128,7 @@ def send_registration_email(member):
     html_message = render_to_string('emails/registration_email.html', context)
     plain_message = render_to_string('emails/registration_email_plain.txt', context)
 
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [member.user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    queue_email(subject, plain_message, [member.user.email], html_message=html_message)
 
 def send_approval_email(member):
     """Send email to member when their membership is approved"""
@@ -34,14 +140,7 @@ def send_approval_email(member):
     html_message = render_to_string('emails/approval_email.html', context)
     plain_message = render_to_string('emails/approval_email_plain.txt', context)
 
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [member.user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    queue_email(subject, plain_message, [member.user.email], html_message=html_message)
 
 # Security functions
 def is_email_blocked(email):
@@ -63,7 +162,6 @@ def is_email_blocked(email):
         # Add to cache
         cache.set(cache_key, True, settings.BLOCKED_EMAILS_CACHE_TTL)
         return True
-from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.core.cache import cache
@@ -80,14 +178,7 @@ def send_registration_email(member):
     html_message = render_to_string('emails/registration_email.html', context)
     plain_message = render_to_string('emails/registration_email_plain.txt', context)
 
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [member.user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    queue_email(subject, plain_message, [member.user.email], html_message=html_message)
 
 def send_approval_email(member):
     """Send email to member when their membership is approved"""
@@ -99,14 +190,7 @@ def send_approval_email(member):
     html_message = render_to_string('emails/approval_email.html', context)
     plain_message = render_to_string('emails/approval_email_plain.txt', context)
 
-    send_mail(
-        subject,
-        plain_message,
-        settings.DEFAULT_FROM_EMAIL,
-        [member.user.email],
-        html_message=html_message,
-        fail_silently=False,
-    )
+    queue_email(subject, plain_message, [member.user.email], html_message=html_message)
 
 # Security functions
 def is_email_blocked(email):
@@ -190,6 +274,18 @@ def increment_failed_attempts(ip_address):
         block_ip(ip_address)
 
     return attempts
+
+
+# Session key holding the logged-in member's site theme (see ThemeMiddleware)
+THEME_SESSION_KEY = 'member_theme'
+
+
+def remember_theme_preference(request, theme):
+    """Write-through for the theme ThemeMiddleware caches in the session"""
+    request.session[THEME_SESSION_KEY] = theme
+    request.theme = theme
+
+
 def create_member_if_needed(user):
     """
     Create a Member profile for a user if one doesn't exist yet
@@ -231,3 +327,165 @@ def reset_failed_attempts(ip_address):
     """Reset failed attempts counter"""
     cache_key = f"failed_attempts:{ip_address}"
     cache.delete(cache_key)
+
+
+def refresh_display_names(queryset=None, batch_size=500):
+    """Recompute Member.display_name for the given members in batches.
+
+    Ranked names are resolved in bulk and only changed rows are written.
+    Returns the number of members updated.
+    """
+    from .models import Member
+    from rank.utils import RankResolver
+
+    if queryset is None:
+        queryset = Member.objects.all()
+    queryset = queryset.select_related('user').order_by('pk')
+    resolver = RankResolver()
+
+    updated = 0
+    last_pk = 0
+    while True:
+        batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        resolver.resolve(batch)
+        changed = [m for m in batch if m.display_name != m.ranked_name]
+        for member in changed:
+            member.display_name = member.ranked_name
+        Member.objects.bulk_update(changed, ['display_name'])
+        updated += len(changed)
+    return updated
+
+
+# Member approval
+
+DEFAULT_RANK_APPROVAL_NOTE = "Automatically assigned default rank upon membership approval."
+
+
+def approve_members(members, approver, batch_size=500):
+    """Approve every member in the ``members`` queryset in one transaction.
+
+    Status/dates are written with bulk_update, default ranks (and their
+    'initial' history rows) through rank.utils.bulk_assign_ranks, and approval
+    emails are queued.
+    Returns the approved Member instances.
+    """
+    from .models import Member, OutboundEmail
+    from rank.models import MemberRank, RankSettings
+    from rank.utils import bulk_assign_ranks
+
+    now = timezone.now()
+    with transaction.atomic():
+        approved = list(
+            members.select_for_update(of=('self',))
+            .select_related('user', 'membership_type')
+            .order_by('pk')
+        )
+        if not approved:
+            return []
+
+        for member in approved:
+            member.status = 'active'
+            member.approval_date = now
+            member.approved_by = approver
+            member.expiration_date = member.compute_expiration_date(now)
+        Member.objects.bulk_update(
+            approved, ['status', 'approval_date', 'approved_by', 'expiration_date'], batch_size=batch_size,
+        )
+
+        # Default rank for members that don't already hold one
+        rank_settings = RankSettings.get_cached()
+        default_rank = rank_settings.default_paygrade if rank_settings else None
+        if default_rank is not None:
+            ranked = set(
+                MemberRank.objects.filter(member__in=[m.pk for m in approved]).values_list('member_id', flat=True)
+            )
+            unranked = [m for m in approved if m.pk not in ranked]
+            bulk_assign_ranks(unranked, default_rank, None, approver, notes=DEFAULT_RANK_APPROVAL_NOTE, batch_size=batch_size)
+
+        emails = []
+        for member in approved:
+            context = {'member': member, 'user': member.user}
+            emails.append(OutboundEmail(
+                subject='Your Membership Has Been Approved',
+                body=render_to_string('emails/approval_email_plain.txt', context),
+                html_body=render_to_string('emails/approval_email.html', context),
+                to=[member.user.email],
+            ))
+        OutboundEmail.objects.bulk_create(emails, batch_size=batch_size)
+        transaction.on_commit(invalidate_dashboard_stats)
+    return approved
+
+
+# Membership expiry
+
+def expire_memberships(now=None, chunk_size=None):
+    """Move active members whose expiration_date has passed to 'expired'.
+
+    Runs as chunked UPDATEs over the (status, expiration_date) index so locks
+    stay short; safe to re-run. Returns the number of members expired.
+    """
+    from .models import Member
+
+    now = now or timezone.now()
+    chunk_size = chunk_size or settings.MEMBERSHIP_EXPIRY_CHUNK_SIZE
+    due = Member.objects.filter(status='active', expiration_date__lt=now)
+
+    expired = 0
+    while True:
+        with transaction.atomic():
+            ids = list(due.order_by('expiration_date', 'pk').values_list('pk', flat=True)[:chunk_size])
+            if not ids:
+                break
+            expired += Member.objects.filter(pk__in=ids, status='active', expiration_date__lt=now).update(status='expired')
+    if expired:
+        invalidate_dashboard_stats()
+    return expired
+
+
+def queue_renewal_reminders(days=None, now=None, batch_size=500):
+    """Queue one renewal reminder per active member with an email address expiring within ``days``.
+
+    Off by default (MEMBERSHIP_RENEWAL_REMINDER_DAYS is 0). Each member is reminded once per expiration_date (renewal_reminder_sent_for),
+    so repeated runs do not resend. Returns the number of reminders queued.
+    """
+    from django.db.models import F, Q
+    from .models import Member, OutboundEmail
+
+    days = settings.MEMBERSHIP_RENEWAL_REMINDER_DAYS if days is None else days
+    if days <= 0:
+        return 0
+    now = now or timezone.now()
+    due = (
+        Member.objects
+        .filter(status='active', expiration_date__gte=now, expiration_date__lt=now + timedelta(days=days))
+        .filter(Q(renewal_reminder_sent_for__isnull=True) | Q(renewal_reminder_sent_for__lt=F('expiration_date')))
+        .exclude(user__email='')
+        .select_related('user', 'membership_type')
+        .order_by('pk')
+    )
+
+    queued = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(due.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            emails = []
+            for member in batch:
+                context = {'member': member, 'user': member.user}
+                emails.append(OutboundEmail(
+                    subject='Your Membership Is Expiring Soon',
+                    body=render_to_string('emails/renewal_reminder_email_plain.txt', context),
+                    html_body=render_to_string('emails/renewal_reminder_email.html', context),
+                    to=[member.user.email],
+                ))
+                member.renewal_reminder_sent_for = member.expiration_date
+            OutboundEmail.objects.bulk_create(emails)
+            Member.objects.bulk_update(batch, ['renewal_reminder_sent_for'])
+            queued += len(batch)
+    return queued
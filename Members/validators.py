@@ -22,3 +22,25 @@ def validate_image_size(value):
     limit = 5 * 1024 * 1024  # 5MB
     if value.size > limit:
         raise ValidationError('Image size should not exceed 5MB.')
+
+def validate_image_content(value):
+    """
+    Validate that the upload actually decodes as a JPEG, PNG, GIF or WebP image
+    """
+    from PIL import Image
+
+    if getattr(value, '_committed', False):
+        # Already in storage; it was checked when it was uploaded
+        return
+    try:
+        value.seek(0)
+        with Image.open(value) as image:
+            image_format = image.format
+            image.load()
+    except (OSError, SyntaxError, ValueError, Image.DecompressionBombError):
+        raise ValidationError('The uploaded file is not a readable image.')
+    finally:
+        value.seek(0)
+    # MPO is the multi-picture JPEG many phone cameras write
+    if image_format not in ('JPEG', 'MPO', 'PNG', 'GIF', 'WEBP'):
+        raise ValidationError(f'Unsupported image format "{image_format}".')
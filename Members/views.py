@@ -8,21 +8,29 @@ from django.contrib import messages
 from django.contrib.auth import logout
 from django.utils import timezone
 from django.urls import reverse
-from django.http import HttpResponseRedirect, JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseRedirect, JsonResponse
 from django.db.models import Q, Prefetch
 from datetime import timedelta
+import csv
 import uuid
 
-from django.core.paginator import Paginator
-
-from .forms import CustomUserCreationForm, MemberRegistrationForm, AddressForm, ChildForm, ProfileForm, ThemePreferenceForm, ContactForm, FAQCategoryForm, FAQForm, ConvertChildToMemberForm
+from .forms import CustomUserCreationForm, MemberRegistrationForm, AddressForm, ChildForm, ProfileForm, ThemePreferenceForm, ContactForm, FAQCategoryForm, FAQForm, ConvertChildToMemberForm, MemberImportUploadForm
 from django import forms
-from .models import Member, MembershipType, Address, Child, Payment, FAQCategory, FAQ
-from .utils import is_email_blocked, increment_failed_attempts, block_email, send_registration_email, reset_failed_attempts
+from .models import Member, MembershipType, Address, Child, Payment, FAQCategory, FAQ, MemberImport
+from .utils import is_email_blocked, increment_failed_attempts, block_email, send_registration_email, reset_failed_attempts, approve_members, create_member_if_needed, remember_theme_preference
+from .roles import get_roles
+from .search import search_members
+from .profile import member_profile_required
+from .portal import DASHBOARD_SELECT_RELATED, load_member_dashboard
+from .stats import dashboard_stats
+from .exports import EXPORT_DATASETS, EXPORT_LABELS
+from rank.utils import RankResolver
+from MCARS.pagination import CursorPaginator
+from MCARS.exports import EXPORT_FORMATS, export_response
 
 # Helper functions
 def is_member_manager(user):
-    return user.groups.filter(name__in=['Rank Manager', 'rank_manager']).exists() or user.is_staff
+    return get_roles(user).is_member_manager
 
 # Public views
 
@@ -58,10 +66,10 @@ def contact(request):
             from_email = email
             recipient_list = ['admin@yourorganization.com']  # Change this to your email address
 
-            # Send email
-            from django.core.mail import send_mail
+            # Queue the email for the send_queued_emails worker
+            from .utils import queue_email
             try:
-                send_mail(email_subject, email_message, from_email, recipient_list)
+                queue_email(email_subject, email_message, recipient_list, from_email=from_email)
                 messages.success(request, "Your message has been sent. We'll get back to you soon!")
                 return redirect('members:contact')  # Redirect to fresh form
             except Exception as e:
@@ -190,198 +198,35 @@ def logout_user(request):
 
 @login_required
 def toggle_theme(request):
-    from django.http import JsonResponse
-    import json
-
-    if request.method == 'POST' and request.user.is_authenticated:
-        try:
-            # Get the current user's member profile
-            member = request.user.member
-
-            # Toggle between 'light' and 'dark' theme
-            if member.theme_preference == 'light':
-                member.theme_preference = 'dark'
-            else:
-                member.theme_preference = 'light'
-
-            # Save the updated preference
-            member.save()
-
-            # Return success response
-            return JsonResponse({'success': True, 'theme': member.theme_preference})
-
-        except Exception as e:
-            # Return error response if something went wrong
-            return JsonResponse({'success': False, 'error': str(e)})
-
-    # Return error for non-POST requests or unauthenticated users
-    return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
-    """
-    Toggle between light and dark theme preference for the user
-    """
     if request.method == 'POST':
-        try:
-            member = request.user.member
-            # Toggle theme preference
-            if member.theme_preference == 'light':
-                member.theme_preference = 'dark'
-            else:
-                member.theme_preference = 'light'
-            member.save()
-            return JsonResponse({'success': True, 'theme': member.theme_preference})
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': str(e)})
-    return JsonResponse({'success': False, 'error': 'Invalid request method'})
+        # Flip what the user currently sees; request.theme comes from the session cache
+        theme = 'dark' if request.theme == 'light' else 'light'
+        if not Member.objects.filter(user_id=request.user.pk).update(theme_preference=theme):
+            return JsonResponse({'success': False, 'error': 'No member profile'})
+        remember_theme_preference(request, theme)
+        return JsonResponse({'success': True, 'theme': theme})
+
+    # Return error for non-POST requests
+    return JsonResponse({'success': False, 'error': 'Invalid request'}, status=400)
+
 # Member portal views
-@login_required
+@member_profile_required(select_related=DASHBOARD_SELECT_RELATED)
 def member_dashboard(request):
-    from .models import Member, Address, MembershipType, Child, Payment
-
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
-        # Create a default address
-        address = Address.objects.create(
-            street='',
-            city='',
-            state='',
-            zip_code='',
-            country='USA'
-        )
-
-        # Get the default/free membership type
-        try:
-            membership_type = MembershipType.objects.filter(billing_frequency='free').first()
-            if not membership_type:
-                membership_type = MembershipType.objects.first()
-        except:
-            membership_type = None
-
-        # Create a new member profile
-        member = Member.objects.create(
-            user=request.user,
-            phone_number='',
-            address=address,
-            status='pending',
-            membership_type=membership_type,
-            membership_id=str(uuid.uuid4())[:8].upper()
-        )
-
-        # Redirect to edit profile immediately
-        messages.info(request, "Welcome! Please complete your profile information to activate your membership.")
-        return redirect('members:edit_profile')
-
-    # Check if profile is incomplete
-    profile_incomplete = False
-
-    # Check required fields
-    if not member.phone_number or member.phone_number.strip() == '':
-        profile_incomplete = True
-
-    # Check if address is missing or incomplete
-    if not member.address or not all([
-        member.address.street, 
-        member.address.city, 
-        member.address.state, 
-        member.address.zip_code
-    ]):
-        profile_incomplete = True
-
-    # Check if user profile is incomplete
-    if not all([
-        member.user.first_name,
-        member.user.last_name,
-        member.user.email
-    ]):
-        profile_incomplete = True
-
-    if profile_incomplete:
-        messages.info(request, "Please complete your profile information to ensure you have full access to all member features.")
-        return redirect('members:edit_profile')
-
-    children = Child.objects.filter(parent=member)
-    recent_payments = Payment.objects.filter(member=member).order_by('-payment_date')[:5]
+    member = request.member
 
     return render(request, 'members/dashboard.html', {
         'member': member,
-        'children': children,
-        'recent_payments': recent_payments
+        'dashboard': load_member_dashboard(member),
     })
 
-@login_required
+@member_profile_required
 def member_profile(request):
-    # Get or create a member profile for the logged in user
-    from .models import Member, Address, MembershipType
-
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
-        # Create a default address
-        address = Address.objects.create(
-            street='',
-            city='',
-            state='',
-            zip_code='',
-            country='USA'
-        )
-
-        # Get the default/free membership type
-        try:
-            membership_type = MembershipType.objects.filter(billing_frequency='free').first()
-            if not membership_type:
-                membership_type = MembershipType.objects.first()
-        except:
-            membership_type = None
-
-        # Create a new member profile
-        member = Member.objects.create(
-            user=request.user,
-            phone_number='',
-            address=address,
-            status='pending',
-            membership_type=membership_type,
-            membership_id=str(uuid.uuid4())[:8].upper()
-        )
-
-        # Redirect to edit profile immediately
-        messages.info(request, "Welcome! Please complete your profile information to activate your membership.")
-        return redirect('members:edit_profile')
-
-    # Check if profile is incomplete
-    profile_incomplete = False
-
-    # Check required fields
-    if not member.phone_number or member.phone_number.strip() == '':
-        profile_incomplete = True
-
-    # Check if address is missing or incomplete
-    if not member.address or not all([
-        member.address.street, 
-        member.address.city, 
-        member.address.state, 
-        member.address.zip_code
-    ]):
-        profile_incomplete = True
-
-    # Check if user profile is incomplete
-    if not all([
-        member.user.first_name,
-        member.user.last_name,
-        member.user.email
-    ]):
-        profile_incomplete = True
-
-    if profile_incomplete:
-        messages.info(request, "Please complete your profile information to ensure you have full access to all member features.")
-        return redirect('members:edit_profile')
+    member = request.member
 
     return render(request, 'members/profile.html', {'member': member})
 
 @login_required
 def edit_profile(request):
-    # Always check if we need to create a member profile
-    from .models import Member, Address, MembershipType
-
     # Get member id from URL if present (for admin users only)
     member_id = request.GET.get('member_id')
 
@@ -395,34 +240,9 @@ def edit_profile(request):
     else:
         # Regular users can only edit their own profile
         try:
-            member = request.user.member
+            member = Member.objects.select_related('user', 'address').get(user_id=request.user.pk)
         except Member.DoesNotExist:
-            # Create a default address
-            address = Address.objects.create(
-                street='',
-                city='',
-                state='',
-                zip_code='',
-                country='USA'
-            )
-
-            # Get the default/free membership type
-            try:
-                membership_type = MembershipType.objects.filter(billing_frequency='free').first()
-                if not membership_type:
-                    membership_type = MembershipType.objects.first()
-            except:
-                membership_type = None
-
-            # Create a new member profile
-            member = Member.objects.create(
-                user=request.user,
-                phone_number='',
-                address=address,
-                status='pending',
-                membership_type=membership_type,
-                membership_id=str(uuid.uuid4())[:8].upper()
-            )
+            member = create_member_if_needed(request.user)
             messages.info(request, "Welcome! Please complete your profile information to activate your membership.")
 
     if request.method == 'POST':
@@ -437,10 +257,13 @@ def edit_profile(request):
 
         if profile_form.is_valid() and address_form.is_valid() and theme_form.is_valid():
             profile_form.save()
-            address_form.save()
+            # Imported members may not have an address yet
+            member.address = address_form.save()
             theme_form.save()
             member.phone_number = request.POST.get('phone_number')
             member.save()
+            if member.user_id == request.user.pk:
+                remember_theme_preference(request, member.theme_preference)
 
             messages.success(request, "Profile has been updated successfully.")
 
@@ -462,43 +285,9 @@ def edit_profile(request):
         'member': member
     })
 
-@login_required
+@member_profile_required
 def family_management(request):
-    from .models import Member, Address, MembershipType, Child
-
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
-        # Redirect to member_profile which will handle profile creation
-        return redirect('members:member_profile')
-
-    # Check if profile is incomplete
-    profile_incomplete = False
-
-    # Check required fields
-    if not member.phone_number or member.phone_number.strip() == '':
-        profile_incomplete = True
-
-    # Check if address is missing or incomplete
-    if not member.address or not all([
-        member.address.street, 
-        member.address.city, 
-        member.address.state, 
-        member.address.zip_code
-    ]):
-        profile_incomplete = True
-
-    # Check if user profile is incomplete
-    if not all([
-        member.user.first_name,
-        member.user.last_name,
-        member.user.email
-    ]):
-        profile_incomplete = True
-
-    if profile_incomplete:
-        messages.info(request, "Please complete your profile information to ensure you have full access to all member features.")
-        return redirect('members:edit_profile')
+    member = request.member
 
     children = Child.objects.filter(parent=member)
 
@@ -748,47 +537,23 @@ def convert_child_to_member(request, child_id):
         'form': form,
     })
 
-@login_required
+@member_profile_required
 def payment_history(request):
-    # Redirect to member_profile which will handle profile creation
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
-        return redirect('members:member_profile')
-
-    # Check if profile is incomplete and redirect to edit profile
-    profile_incomplete = not member.phone_number or not member.address or not all([
-        member.address.street, member.address.city, member.address.state, member.address.zip_code
-    ]) or not all([member.user.first_name, member.user.last_name, member.user.email])
-
-    if profile_incomplete:
-        messages.info(request, "Please complete your profile information to ensure you have full access to all member features.")
-        return redirect('members:edit_profile')
+    member = request.member
 
     from .models import Payment
-    payments = Payment.objects.filter(member=member).order_by('-payment_date')
+    payments = CursorPaginator(
+        Payment.objects.filter(member=member), ('-payment_date', '-id'), per_page=25,
+    ).page(after=request.GET.get('after'), before=request.GET.get('before'))
 
     return render(request, 'members/payment_history.html', {
         'member': member,
         'payments': payments
     })
 
-@login_required
+@member_profile_required
 def subscription_management(request):
-    # Redirect to member_profile which will handle profile creation
-    try:
-        member = request.user.member
-    except Member.DoesNotExist:
-        return redirect('members:member_profile')
-
-    # Check if profile is incomplete and redirect to edit profile
-    profile_incomplete = not member.phone_number or not member.address or not all([
-        member.address.street, member.address.city, member.address.state, member.address.zip_code
-    ]) or not all([member.user.first_name, member.user.last_name, member.user.email])
-
-    if profile_incomplete:
-        messages.info(request, "Please complete your profile information to ensure you have full access to all member features.")
-        return redirect('members:edit_profile')
+    member = request.member
 
     from .models import MembershipType
     membership_types = MembershipType.objects.all()
@@ -801,21 +566,28 @@ def subscription_management(request):
 # Member Manager views
 @user_passes_test(is_member_manager)
 def manager_dashboard(request):
-    pending_count = Member.objects.filter(status='pending').count()
-    active_count = Member.objects.filter(status='active').count()
-    expired_count = Member.objects.filter(status='expired').count()
-    recent_members = Member.objects.order_by('-member_since')[:5]
+    stats = dashboard_stats()['members']
+    recent_members = Member.objects.select_related('user').order_by('-member_since')[:5]
 
     return render(request, 'members/manager/dashboard.html', {
-        'pending_count': pending_count,
-        'active_count': active_count,
-        'expired_count': expired_count,
-        'recent_members': recent_members
+        'pending_count': stats['pending'],
+        'active_count': stats['active'],
+        'expired_count': stats['expired'],
+        'recent_members': recent_members,
+        'export_datasets': EXPORT_LABELS,
     })
 
+@login_required
+def dashboard_stats_json(request):
+    """Dashboard counters for auto-refreshing widgets (member and rank managers)"""
+    roles = get_roles(request.user)
+    if not (roles.is_member_manager or roles.is_rank_manager):
+        return JsonResponse({'error': 'forbidden'}, status=403)
+    return JsonResponse(dashboard_stats())
+
 @user_passes_test(is_member_manager)
 def pending_approvals(request):
-    pending_members = Member.objects.filter(status='pending').order_by('member_since')
+    pending_members = Member.objects.filter(status='pending').select_related('user', 'address', 'membership_type').order_by('member_since')
 
     return render(request, 'members/manager/pending_approvals.html', {
         'pending_members': pending_members
@@ -834,6 +606,82 @@ def approve_member(request, member_id):
         'member': member
     })
 
+@user_passes_test(is_member_manager)
+def bulk_approve_members(request):
+    """Approve the pending members ticked on the pending approvals page"""
+    if request.method != 'POST':
+        return redirect('members:pending_approvals')
+
+    member_ids = [pk for pk in request.POST.getlist('member_ids') if pk.isdigit()]
+    if not member_ids:
+        messages.warning(request, "No members were selected.")
+        return redirect('members:pending_approvals')
+
+    approved = approve_members(Member.objects.filter(pk__in=member_ids, status='pending'), request.user)
+    messages.success(request, f"Approved {len(approved)} member(s).")
+    return redirect('members:pending_approvals')
+
+@user_passes_test(is_member_manager)
+def member_import(request):
+    """Upload a CSV/JSONL roster and queue it for the process_member_imports worker; lists earlier imports"""
+    if request.method == 'POST':
+        form = MemberImportUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            job = form.save(commit=False)
+            job.created_by = request.user
+            job.save()
+            messages.success(request, "The roster was uploaded and will be imported shortly.")
+            return redirect('members:member_import_detail', import_id=job.pk)
+    else:
+        form = MemberImportUploadForm()
+
+    return render(request, 'members/manager/member_import.html', {
+        'form': form,
+        'imports': MemberImport.objects.select_related('created_by')[:20],
+    })
+
+@user_passes_test(is_member_manager)
+def member_import_detail(request, import_id):
+    """Progress and row report for one import; POST queues a failed import again, ?format=csv downloads the report"""
+    job = get_object_or_404(MemberImport, id=import_id)
+
+    if request.method == 'POST':
+        # The worker resumes it after the last committed row
+        if MemberImport.objects.filter(pk=job.pk, status=MemberImport.STATUS_FAILED).update(
+            status=MemberImport.STATUS_PENDING
+        ):
+            messages.success(request, f"The import will resume after row {job.rows_processed}.")
+        return redirect('members:member_import_detail', import_id=job.pk)
+
+    if request.GET.get('format') == 'csv':
+        response = HttpResponse(content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="member-import-{job.pk}-errors.csv"'
+        writer = csv.writer(response)
+        writer.writerow(['row', 'reason', 'errors'])
+        for error in job.row_errors.iterator():
+            writer.writerow([error.row, error.reason, '; '.join(
+                f"{field}: {' '.join(field_errors)}" for field, field_errors in error.errors.items()
+            )])
+        return response
+
+    return render(request, 'members/manager/member_import_detail.html', {
+        'job': job,
+        'in_progress': job.status in (MemberImport.STATUS_PENDING, MemberImport.STATUS_RUNNING),
+        'row_errors': job.row_errors.all()[:500],
+    })
+
+@user_passes_test(is_member_manager)
+def export_data(request, dataset):
+    """Stream a roster dataset as CSV (default), JSONL or XLSX"""
+    if dataset not in EXPORT_DATASETS:
+        raise Http404("Unknown export")
+    file_format = request.GET.get('format', 'csv')
+    if file_format not in EXPORT_FORMATS:
+        file_format = 'csv'
+    columns, rows = EXPORT_DATASETS[dataset]()
+    filename = f"{dataset}-{timezone.localdate():%Y%m%d}"
+    return export_response(file_format, columns, rows, filename)
+
 @user_passes_test(is_member_manager)
 def reject_member(request, member_id):
     member = get_object_or_404(Member, id=member_id)
@@ -1132,14 +980,12 @@ def delete_faq(request, faq_id):
         'cancel_url': 'members:faq_management'
     })
 
-from django.core.paginator import Paginator
-
 @login_required
 def public_member_list(request):
     """Authenticated member directory with sorting/filtering.
     Shows: name, rank, units, member since, email.
     """
-    from units.models import Unit
+    from units.models import Unit, UnitMembership
     from .models import Address
     q = request.GET.get('q', '').strip()
     state = request.GET.get('state', '').strip()
@@ -1151,27 +997,25 @@ def public_member_list(request):
         .prefetch_related('unit_memberships__unit', 'rank_association__rank')
     )
 
+    ordering = ['user__last_name', 'user__first_name', 'id']
     if q:
-        members_qs = members_qs.filter(
-            Q(user__first_name__icontains=q)
-            | Q(user__last_name__icontains=q)
-            | Q(user__email__icontains=q)
-        )
+        members_qs = search_members(members_qs, q, name_and_email_only=True)
+        ordering.insert(0, '-search_rank')
     if state:
         members_qs = members_qs.filter(address__state__iexact=state)
     if unit_id:
         try:
             unit_id_int = int(unit_id)
-            members_qs = members_qs.filter(unit_memberships__unit_id=unit_id_int, unit_memberships__is_active=True)
+            # Subquery rather than a join so no DISTINCT is needed
+            members_qs = members_qs.filter(pk__in=UnitMembership.objects.filter(
+                unit_id=unit_id_int, is_active=True,
+            ).values('member_id'))
         except ValueError:
             pass
 
-    members_qs = members_qs.distinct().order_by('user__last_name', 'user__first_name')
-
-    # Simple pagination (server-side); client-side sorting will re-order current page
-    paginator = Paginator(members_qs, 50)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Keyset pagination (server-side); client-side sorting will re-order current page
+    paginator = CursorPaginator(members_qs, ordering, per_page=50)
+    page_obj = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
 
     # Filters data
     states = (
@@ -1185,6 +1029,7 @@ def public_member_list(request):
     return render(request, 'members/public_member_list.html', {
         'title': 'Member Directory',
         'page_obj': page_obj,
+        'member_count': paginator.approximate_count(),
         'query': q,
         'state_filter': state,
         'unit_filter': unit_id,
@@ -1193,6 +1038,52 @@ def public_member_list(request):
     })
 
 
+@login_required
+def member_search(request):
+    """AJAX typeahead for member picker widgets (Members.widgets).
+    Prefix-matches ?q= against name, and for member managers also email and
+    membership ID (which only they get back); ?page= pages through results.
+    """
+    query = request.GET.get('q', '').strip()
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    per_page = 20
+
+    # Unit COs and event delegates also use the pickers; they search by name only
+    is_manager = get_roles(request.user).is_member_manager
+
+    members = Member.objects.select_related('user').order_by('user__last_name', 'user__first_name', 'id')
+    if query:
+        match = (
+            Q(display_name__istartswith=query)
+            | Q(user__first_name__istartswith=query)
+            | Q(user__last_name__istartswith=query)
+        )
+        if is_manager:
+            match |= Q(user__email__istartswith=query) | Q(membership_id__istartswith=query)
+        parts = query.split()
+        if len(parts) > 1:
+            # "jane do" -> first name "jane*", last name "do*"
+            match |= Q(user__first_name__istartswith=parts[0], user__last_name__istartswith=parts[-1])
+        members = members.filter(match)
+
+    offset = (page - 1) * per_page
+    rows = list(members[offset:offset + per_page + 1])
+    results = []
+    for m in rows[:per_page]:
+        result = {'id': m.id, 'text': str(m)}
+        if is_manager:
+            result.update(email=m.user.email, membership_id=m.membership_id)
+        results.append(result)
+    return JsonResponse({
+        'results': results,
+        'page': page,
+        'has_more': len(rows) > per_page,
+    })
+
+
 @login_required
 def member_settings(request):
     """
@@ -1254,6 +1145,7 @@ def member_settings(request):
             # Update site theme preference on Member
             member.theme_preference = form.cleaned_data['site_theme']
             member.save(update_fields=['theme_preference'])
+            remember_theme_preference(request, member.theme_preference)
 
             # Update preferred rank theme if applicable
             if 'mr' in locals() and mr is not None and 'preferred_theme' in form.fields:
@@ -1308,27 +1200,21 @@ def member_list(request):
     status_filter = request.GET.get('status', '')
     query = request.GET.get('q', '')
 
-    members = Member.objects.all().select_related('user')
+    members = Member.objects.all().select_related('user', 'membership_type')
+    ordering = ['user__last_name', 'user__first_name', 'id']
 
     if status_filter:
         members = members.filter(status=status_filter)
 
     if query:
-        members = members.filter(
-            Q(user__first_name__icontains=query) | 
-            Q(user__last_name__icontains=query) | 
-            Q(user__email__icontains=query) | 
-            Q(phone_number__icontains=query) |
-            Q(membership_id__icontains=query)
-        )
+        members = search_members(members, query)
+        ordering.insert(0, '-search_rank')
 
-    # Add pagination
-    paginator = Paginator(members, 20)  # Show 20 members per page
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    paginator = CursorPaginator(members, ordering, per_page=20)
+    page_obj = paginator.page(after=request.GET.get('after'), before=request.GET.get('before'))
+    page_obj.object_list = RankResolver().resolve(page_obj.object_list)
 
     return render(request, 'members/manager/member_list.html', {
-        'members': members,
         'page_obj': page_obj,
         'status_filter': status_filter,
         'query': query,
@@ -1339,14 +1225,17 @@ def member_list(request):
 def member_detail(request, member_id):
     member = get_object_or_404(Member, id=member_id)
     children = Child.objects.filter(parent=member)
-    payments = Payment.objects.filter(member=member).order_by('-payment_date')
+    payments = CursorPaginator(
+        Payment.objects.filter(member=member), ('-payment_date', '-id'), per_page=25,
+    ).page(after=request.GET.get('payments_after'), before=request.GET.get('payments_before'))
 
     # Get rank history from the rank app
     from rank.models import MemberRankHistory
     rank_history = MemberRankHistory.objects.filter(member=member).order_by('-effective_date', '-created_at')
 
     # Check if the user is a manager
-    is_manager = member.user.groups.filter(name='Member Manager').exists()
+    member_roles = get_roles(member.user)
+    is_manager = 'Member Manager' in member_roles
 
     # Create an edit profile URL with the member_id parameter
     edit_profile_url = f"{reverse('members:edit_profile')}?member_id={member.id}"
@@ -1357,6 +1246,7 @@ def member_detail(request, member_id):
         'payments': payments,
         'rank_history': rank_history,
         'is_manager': is_manager,
+        'member_roles': member_roles,
         'edit_profile_url': edit_profile_url
     })
 
@@ -0,0 +1,47 @@
+from django import forms
+from django.urls import reverse_lazy
+
+
+class MemberSearchMixin:
+    """Render only the selected member(s); static/js/member-search.js loads the rest on demand.
+
+    The field keeps its full queryset, so submitted primary keys are still
+    validated server-side by ModelChoiceField/ModelMultipleChoiceField.
+    """
+    search_url = reverse_lazy('members:member_search')
+
+    def __init__(self, attrs=None):
+        attrs = {'class': 'form-select', **(attrs or {})}
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        attrs = {**(attrs or {}), 'data-member-search': str(self.search_url)}
+        return super().get_context(name, value, attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if v not in (None, '')]
+        options = []
+        index = 0
+        field = getattr(self.choices, 'field', None)
+        if not self.allow_multiple_selected and field is not None and field.empty_label is not None:
+            options.append(self.create_option(name, '', field.empty_label, not selected, index, attrs=attrs))
+            index += 1
+
+        queryset = getattr(self.choices, 'queryset', None)
+        if queryset is not None and selected:
+            try:
+                members = list(queryset.filter(pk__in=selected))
+            except (ValueError, TypeError):
+                members = []
+            for member in members:
+                options.append(self.create_option(name, member.pk, str(member), True, index, attrs=attrs))
+                index += 1
+        return [(None, options, 0)]
+
+
+class MemberSearchSelect(MemberSearchMixin, forms.Select):
+    """Typeahead replacement for a single member <select>."""
+
+
+class MemberSearchSelectMultiple(MemberSearchMixin, forms.SelectMultiple):
+    """Typeahead replacement for a multiple member <select>."""
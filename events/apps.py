@@ -5,3 +5,7 @@ class EventsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'events'
     verbose_name = 'Events'
+
+    def ready(self):
+        # Image upload handling for Event.image
+        from . import signals  # noqa: F401
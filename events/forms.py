@@ -1,15 +1,16 @@
 from django import forms
 from django.core.exceptions import ValidationError
 from Members.models import Member
+from Members.widgets import MemberSearchSelect, MemberSearchSelectMultiple
 from units.models import Unit
 from .models import Event, EventAttendee
 
 
 class EventForm(forms.ModelForm):
     attendees = forms.ModelMultipleChoiceField(
-        queryset=Member.objects.select_related('user').all(),
+        queryset=Member.objects.all(),
         required=False,
-        widget=forms.SelectMultiple(attrs={'class': 'form-select'})
+        widget=MemberSearchSelectMultiple()
     )
 
     include_subordinates = forms.BooleanField(
@@ -30,7 +31,7 @@ class EventForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
             'unit': forms.Select(attrs={'class': 'form-select'}),
             'visibility_scope': forms.Select(attrs={'class': 'form-select'}),
-            'host': forms.Select(attrs={'class': 'form-select'}),
+            'host': MemberSearchSelect(),
             'start_datetime': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}),
             'end_datetime': forms.DateTimeInput(attrs={'type': 'datetime-local', 'class': 'form-control'}),
             'location': forms.TextInput(attrs={'class': 'form-control'}),
@@ -2,6 +2,8 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 
+from Members.validators import validate_image_content, validate_image_size
+
 
 class Event(models.Model):
     """Calendar event visible across the organization and filterable by unit hierarchy."""
@@ -25,7 +27,10 @@ class Event(models.Model):
 
     location = models.CharField(max_length=255, blank=True)
     meeting_url = models.URLField(blank=True)
-    image = models.ImageField(upload_to='event_images/', null=True, blank=True)
+    image = models.ImageField(upload_to='event_images/', null=True, blank=True,
+                              validators=[validate_image_size, validate_image_content])
+    # Resized copies of image, built by the build_image_variants worker (see MCARS.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     # owning/hosting unit for filtering and permissions
     unit = models.ForeignKey('units.Unit', on_delete=models.CASCADE, related_name='events')
@@ -52,8 +57,8 @@ class Event(models.Model):
             raise ValidationError({'end_datetime': 'End time must be after start time.'})
 
     def notify_attendees(self, action: str):
-        """Email attendees about create/update/delete actions."""
-        from django.core.mail import send_mail
+        """Queue an email to each attendee about create/update/delete actions."""
+        from Members.utils import queue_individual_emails
         subject = f"Event {action}: {self.title}"
         lines = [
             f"Title: {self.title}",
@@ -73,11 +78,7 @@ class Event(models.Model):
         recipients = [a.member.user.email for a in self.attendees.select_related('member__user').all() if a.member and a.member.user and a.member.user.email]
         if not recipients:
             return
-        try:
-            send_mail(subject, body, None, recipients, fail_silently=True)
-        except Exception:
-            # Avoid breaking core flow due to email issues
-            pass
+        queue_individual_emails(subject, body, recipients)
 
 
 class EventAttendee(models.Model):
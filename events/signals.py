@@ -0,0 +1,5 @@
+from MCARS.images import track_image_variants
+from .models import Event
+
+# Strip EXIF from event images and queue their resized variants
+track_image_variants(Event, 'image', 'image_variants')
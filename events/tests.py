@@ -0,0 +1,167 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import AnonymousUser, Group, User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from Members.models import Member
+from units.models import Unit, UnitMembership
+
+from .models import Event
+from .utils import EventVisibility, event_audience_root, user_can_view_event
+
+
+def legacy_descendant_ids(unit):
+    """The unit and its descendants, walked through parent pointers as before EventVisibility"""
+    ids = {unit.id}
+    stack = [unit]
+    while stack:
+        for child in stack.pop().children.all():
+            ids.add(child.id)
+            stack.append(child)
+    return ids
+
+
+def legacy_can_view(user, event):
+    """The per-event check EventVisibility replaced, kept as the reference answer"""
+    scope = event.visibility_scope
+    if not user.is_authenticated:
+        return scope == 'fleet'
+    if user.is_superuser or user.groups.filter(name='Events Manager').exists():
+        return True
+    try:
+        member = user.member
+    except Member.DoesNotExist:
+        return scope == 'fleet'
+    if scope == 'fleet':
+        return True
+    root = event_audience_root(event)
+    if not root:
+        return True
+    return member.unit_memberships.filter(unit_id__in=legacy_descendant_ids(root), is_active=True).exists()
+
+
+class EventVisibilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def unit(name, unit_type, parent=None):
+            return Unit.objects.create(name=name, type=unit_type, parent=parent)
+
+        cls.fleet = unit('Fleet', Unit.TYPE_FLEET_COMMANDER)
+        cls.quadrant_a = unit('Alpha', Unit.TYPE_QUADRANT, cls.fleet)
+        cls.quadrant_b = unit('Beta', Unit.TYPE_QUADRANT, cls.fleet)
+        cls.sector_a = unit('Sector A1', Unit.TYPE_SECTOR, cls.quadrant_a)
+        cls.sector_b = unit('Sector B1', Unit.TYPE_SECTOR, cls.quadrant_b)
+        cls.ship_a = unit('Ship A1a', Unit.TYPE_SHIP, cls.sector_a)
+        cls.ship_a2 = unit('Ship A1b', Unit.TYPE_SHIP, cls.sector_a)
+        cls.shuttle = unit('Shuttle', Unit.TYPE_SHUTTLE, cls.ship_a)
+        cls.ship_b = unit('Ship B1a', Unit.TYPE_SHIP, cls.sector_b)
+        # No quadrant or sector above it: those scopes fall back to everyone
+        cls.loose_ship = unit('Independent', Unit.TYPE_SHIP)
+        cls.units = list(Unit.objects.order_by('pk'))
+
+        start = timezone.now()
+        for u in cls.units:
+            for scope, _ in Event.SCOPE_CHOICES:
+                Event.objects.create(
+                    title=f'{u.name} {scope}', unit=u, visibility_scope=scope,
+                    start_datetime=start, end_datetime=start + timedelta(hours=1),
+                )
+        cls.events = list(Event.objects.select_related('unit').order_by('pk'))
+
+        def member(username, *units, inactive=()):
+            m = Member.objects.create(user=User.objects.create_user(username), phone_number='555-0100')
+            for u in units:
+                UnitMembership.objects.create(member=m, unit=u)
+            for u in inactive:
+                UnitMembership.objects.create(member=m, unit=u, is_active=False)
+            return m.user
+
+        cls.users = {
+            'anonymous': AnonymousUser(),
+            'not a member': User.objects.create_user('visitor'),
+            'member without units': member('drifter'),
+            'ship member': member('ensign', cls.ship_a),
+            'shuttle member': member('pilot', cls.shuttle),
+            'sector member': member('commodore', cls.sector_a, inactive=[cls.ship_b]),
+            'two quadrants': member('envoy', cls.quadrant_b, cls.loose_ship),
+            'superuser': User.objects.create_superuser('root', 'root@example.com', 'pw'),
+        }
+        manager = member('planner')
+        manager.groups.add(Group.objects.get_or_create(name='Events Manager')[0])
+        cls.users['events manager'] = manager
+
+    def setUp(self):
+        cache.clear()
+
+    def visible_titles(self, user):
+        return set(EventVisibility(user).filter_queryset(Event.objects.all()).values_list('title', flat=True))
+
+    def test_matches_the_legacy_per_event_check(self):
+        for label, user in self.users.items():
+            visibility = EventVisibility(user)
+            for event in self.events:
+                with self.subTest(user=label, event=event.title):
+                    expected = legacy_can_view(user, event)
+                    self.assertEqual(visibility.can_view(event), expected)
+                    self.assertEqual(user_can_view_event(user, event), expected)
+
+    def test_filter_queryset_agrees_with_can_view(self):
+        for label, user in self.users.items():
+            with self.subTest(user=label):
+                visibility = EventVisibility(user)
+                expected = {e.title for e in self.events if visibility.can_view(e)}
+                self.assertEqual(self.visible_titles(user), expected)
+                self.assertEqual({e.title for e in visibility.filter(self.events)}, expected)
+
+    def test_anonymous_and_non_members_see_fleet_events_only(self):
+        fleet_wide = {e.title for e in self.events if e.visibility_scope == 'fleet'}
+        for label in ('anonymous', 'not a member'):
+            with self.subTest(user=label):
+                self.assertEqual(self.visible_titles(self.users[label]), fleet_wide)
+
+    def test_members_of_descendant_units_see_ancestor_unit_events(self):
+        titles = self.visible_titles(self.users['shuttle member'])
+
+        self.assertIn('Sector A1 unit', titles)
+        self.assertIn('Ship A1a unit', titles)
+        self.assertIn('Shuttle unit', titles)
+        self.assertIn('Ship A1b sector', titles)
+        self.assertIn('Ship B1a fleet', titles)
+        self.assertNotIn('Ship A1b unit', titles)
+        self.assertNotIn('Ship B1a quadrant', titles)
+
+    def test_members_do_not_see_events_of_units_below_them(self):
+        titles = self.visible_titles(self.users['sector member'])
+
+        self.assertIn('Sector A1 unit', titles)
+        self.assertIn('Alpha unit', titles)
+        self.assertNotIn('Ship A1a unit', titles)
+        # Inactive memberships do not count
+        self.assertNotIn('Ship B1a unit', titles)
+
+    def test_managers_see_everything(self):
+        every_title = {e.title for e in self.events}
+        for label in ('events manager', 'superuser'):
+            with self.subTest(user=label):
+                visibility = EventVisibility(self.users[label])
+                self.assertEqual(self.visible_titles(self.users[label]), every_title)
+                self.assertTrue(all(visibility.can_view(e) for e in self.events))
+
+    def test_descendant_ids_match_a_parent_pointer_walk(self):
+        visibility = EventVisibility(self.users['ship member'])
+        for u in self.units:
+            with self.subTest(unit=u.name):
+                self.assertEqual(visibility.descendant_ids(u), legacy_descendant_ids(u))
+
+    def test_for_request_reuses_one_instance_per_user(self):
+        request = RequestFactory().get('/')
+        request.user = self.users['ship member']
+
+        first = EventVisibility.for_request(request)
+        self.assertIs(EventVisibility.for_request(request), first)
+
+        request.user = self.users['sector member']
+        self.assertIsNot(EventVisibility.for_request(request), first)
+        self.assertIs(EventVisibility.for_request(request).user, request.user)
@@ -1,27 +1,21 @@
-from typing import Iterable, Set
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Set, Tuple
+import calendar as _cal
 from django.contrib.auth.models import Group
+from django.db.models import Q
+from django.utils import timezone
 from Members.models import Member
+from Members.roles import get_roles
 from units.models import Unit, UnitMembership
 
 
-# Canonical Events Manager group name
-EVENTS_MANAGER_GROUPS = {'Events Manager'}
-
-
 def user_is_events_manager(user) -> bool:
-    return user.is_superuser or user.groups.filter(name__in=EVENTS_MANAGER_GROUPS).exists()
+    return get_roles(user).is_events_manager
 
 
 def unit_descendant_ids(unit: Unit) -> Set[int]:
     """Return all descendant unit IDs including the unit itself."""
-    ids = {unit.id}
-    stack = [unit]
-    while stack:
-        u = stack.pop()
-        for child in u.children.all():
-            ids.add(child.id)
-            stack.append(child)
-    return ids
+    return set(unit.descendants(include_self=True).values_list('id', flat=True))
 
 
 def can_manage_events(user, unit: Unit) -> bool:
@@ -54,13 +48,8 @@ def can_manage_events(user, unit: Unit) -> bool:
 # ---------------- Visibility Helpers ----------------
 
 def _ancestor_of_type(unit: Unit, type_const: str) -> Unit | None:
-    """Walk up the parent chain to find the first ancestor of a given type (including the unit itself)."""
-    u = unit
-    while u is not None:
-        if u.type == type_const:
-            return u
-        u = u.parent
-    return None
+    """Find the first ancestor of a given type (including the unit itself)."""
+    return unit.ancestor_of_type(type_const)
 
 
 def event_audience_root(event) -> Unit | None:
@@ -81,29 +70,161 @@ def event_audience_root(event) -> Unit | None:
     return unit
 
 
+class EventVisibility:
+    """Answer event visibility for one user without per-event queries.
+
+    The user's groups, member profile, active unit IDs and the whole unit tree
+    (id, parent, type) are loaded once; every check after that is in memory.
+    Use EventVisibility.for_request(request) to share one instance per request.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self.authenticated = getattr(user, 'is_authenticated', False)
+        self.is_manager = self.authenticated and user_is_events_manager(user)
+        self.member = None
+        if self.authenticated and not self.is_manager:
+            try:
+                self.member = user.member
+            except Member.DoesNotExist:
+                self.member = None
+
+        self._parents = None
+        self._reachable = set()
+        if self.member is not None:
+            self._load_tree()
+            active_ids = UnitMembership.objects.filter(
+                member=self.member, is_active=True
+            ).values_list('unit_id', flat=True)
+            # An audience root is visible if it is an active unit or one of its ancestors
+            for uid in active_ids:
+                self._reachable.update(self._ancestor_ids(uid))
+
+    @classmethod
+    def for_request(cls, request):
+        """Return the visibility context cached on the request"""
+        ctx = getattr(request, '_event_visibility', None)
+        if ctx is None or ctx.user is not request.user:
+            ctx = cls(request.user)
+            request._event_visibility = ctx
+        return ctx
+
+    def _load_tree(self):
+        if self._parents is not None:
+            return
+        self._parents, self._types, self._children = {}, {}, {}
+        for uid, parent_id, utype in Unit.objects.values_list('id', 'parent_id', 'type'):
+            self._parents[uid] = parent_id
+            self._types[uid] = utype
+            self._children.setdefault(parent_id, []).append(uid)
+
+    def _ancestor_ids(self, unit_id):
+        """The unit and its ancestors, guarding against cycles in bad data"""
+        chain = []
+        while unit_id is not None and unit_id not in chain:
+            chain.append(unit_id)
+            unit_id = self._parents.get(unit_id)
+        return chain
+
+    def _root_id(self, unit_id, scope):
+        """In-memory equivalent of event_audience_root() returning an id (None = everyone)"""
+        if scope == 'fleet':
+            return None
+        if scope in ('quadrant', 'sector'):
+            wanted = Unit.TYPE_QUADRANT if scope == 'quadrant' else Unit.TYPE_SECTOR
+            for uid in self._ancestor_ids(unit_id):
+                if self._types.get(uid) == wanted:
+                    return uid
+            return None
+        return unit_id
+
+    def can_view(self, event) -> bool:
+        scope = getattr(event, 'visibility_scope', 'unit')
+        if not self.authenticated:
+            return scope == 'fleet'
+        if self.is_manager:
+            return True
+        if scope == 'fleet':
+            return True
+        if self.member is None:
+            # Non-member authenticated users: fleet only
+            return False
+        return self._audience_includes_member(event.unit_id, scope)
+
+    def _audience_includes_member(self, unit_id, scope) -> bool:
+        root_id = self._root_id(unit_id, scope)
+        return root_id is None or root_id in self._reachable
+
+    def filter(self, events):
+        """Return the visible events from an iterable, preserving order"""
+        return [e for e in events if self.can_view(e)]
+
+    def filter_queryset(self, queryset):
+        """Restrict an Event queryset to visible events with a single SQL filter"""
+        if self.is_manager:
+            return queryset
+        visible = Q(visibility_scope='fleet')
+        if self.member is not None:
+            for scope in ('unit', 'sector', 'quadrant'):
+                unit_ids = [uid for uid in self._parents if self._audience_includes_member(uid, scope)]
+                visible |= Q(visibility_scope=scope, unit_id__in=unit_ids)
+        return queryset.filter(visible)
+
+    def descendant_ids(self, unit: Unit) -> Set[int]:
+        """Like unit_descendant_ids(), but walks the in-memory tree."""
+        self._load_tree()
+        ids = {unit.id}
+        stack = [unit.id]
+        while stack:
+            for child_id in self._children.get(stack.pop(), ()):
+                if child_id not in ids:
+                    ids.add(child_id)
+                    stack.append(child_id)
+        return ids
+
+
 def user_can_view_event(user, event) -> bool:
     """Determine if a user is eligible to view an event.
     - Anonymous users: only fleet-wide events are visible.
     - Authenticated: Events Managers/superusers always see; otherwise must belong to the audience subtree.
+    For many events, build one EventVisibility and reuse it instead.
     """
-    scope = getattr(event, 'visibility_scope', 'unit')
-    if not getattr(user, 'is_authenticated', False):
-        return scope == 'fleet'
-    # privileged users
-    if user_is_events_manager(user):
-        return True
-    # members with units
-    try:
-        member = user.member
-    except Member.DoesNotExist:
-        # Non-member authenticated users: show fleet only
-        return scope == 'fleet'
+    return EventVisibility(user).can_view(event)
 
-    if scope == 'fleet':
-        return True
 
-    root = event_audience_root(event)
-    if not root:
-        return True
-    audience_ids = unit_descendant_ids(root)
-    return member.unit_memberships.filter(unit_id__in=audience_ids, is_active=True).exists()
+# ---------------- Calendar Helpers ----------------
+
+def day_bounds(d: date) -> Tuple[datetime, datetime]:
+    """Return timezone-aware start/end datetimes of a local calendar day."""
+    tz = timezone.get_current_timezone()
+    return (timezone.make_aware(datetime.combine(d, time.min), tz),
+            timezone.make_aware(datetime.combine(d, time.max), tz))
+
+
+def month_window(year: int, month: int) -> Tuple[datetime, datetime]:
+    """Return the aware datetime window covering every day of the given month."""
+    last_day = _cal.monthrange(year, month)[1]
+    return day_bounds(date(year, month, 1))[0], day_bounds(date(year, month, last_day))[1]
+
+
+def bucket_events_by_day(events: Iterable, start: date, end: date) -> Dict[date, List]:
+    """Group events into the local days they overlap, from start to end inclusive.
+
+    Events are sorted by start once and swept day by day, keeping only those still
+    running as "active", so multi-day events land in every day they span. Each day's
+    list is ordered by start time. Shared by the calendar grid and exports.
+    """
+    pending = sorted(events, key=lambda e: e.start_datetime)
+    buckets: Dict[date, List] = {}
+    active: List = []
+    i = 0
+    d = start
+    while d <= end:
+        ds, de = day_bounds(d)
+        while i < len(pending) and pending[i].start_datetime <= de:
+            active.append(pending[i])
+            i += 1
+        active = [e for e in active if e.end_datetime >= ds]
+        buckets[d] = list(active)
+        d += timedelta(days=1)
+    return buckets
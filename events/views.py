@@ -10,7 +10,7 @@ from units.models import Unit
 from Members.models import Member
 from .models import Event, EventAttendee
 from .forms import EventForm
-from .utils import can_manage_events, unit_descendant_ids, user_is_events_manager, user_can_view_event, event_audience_root
+from .utils import can_manage_events, user_is_events_manager, EventVisibility, month_window, bucket_events_by_day
 
 
 def calendar(request):
@@ -19,7 +19,7 @@ def calendar(request):
       - scope: fleet|quadrant|sector|unit (default fleet)
       - unit: unit id for filtering (optional)
       - include_sub: 1/0 include subordinate units (default 1)
-      - from/to: ISO date (YYYY-MM-DD) or datetime for range filtering (optional)
+      - from/to: ISO date (YYYY-MM-DD) or datetime for range filtering (optional; defaults to the displayed month)
       - y/m: year and month for calendar grid navigation (defaults to today if absent)
     """
     from datetime import date as _date, time as _time
@@ -54,6 +54,7 @@ def calendar(request):
     unit_id = request.GET.get('unit')
     include_sub = request.GET.get('include_sub', '1') == '1'
 
+    visibility = EventVisibility.for_request(request)
     events = Event.objects.select_related('unit', 'host__user').all()
 
     selected_unit = None
@@ -66,26 +67,10 @@ def calendar(request):
     if scope in {'unit', 'sector', 'quadrant'} and selected_unit:
         ids = {selected_unit.id}
         if include_sub:
-            ids = unit_descendant_ids(selected_unit)
+            ids = visibility.descendant_ids(selected_unit)
         events = events.filter(unit_id__in=ids)
     # fleet scope shows all
 
-    # Date range
-    frm_raw = request.GET.get('from')
-    to_raw = request.GET.get('to')
-    frm_dt = _parse_dt(frm_raw, is_end=False)
-    to_dt = _parse_dt(to_raw, is_end=True)
-
-    if frm_dt:
-        events = events.filter(end_datetime__gte=frm_dt)
-    if to_dt:
-        events = events.filter(start_datetime__lte=to_dt)
-
-    events = events.order_by('start_datetime')
-
-    # Eligibility filter
-    visible_events = [e for e in events if user_can_view_event(request.user, e)]
-
     # ---------------- Month grid computation ----------------
     # Determine which month to display
     now_local = _tz.localtime(_tz.now())
@@ -103,18 +88,28 @@ def calendar(request):
     if m > 12:
         m = 12
 
+    # Date range; without an explicit range only the displayed month is loaded
+    frm_raw = request.GET.get('from')
+    to_raw = request.GET.get('to')
+    frm_dt = _parse_dt(frm_raw, is_end=False)
+    to_dt = _parse_dt(to_raw, is_end=True)
+    if not frm_dt and not to_dt:
+        frm_dt, to_dt = month_window(y, m)
+
+    if frm_dt:
+        events = events.filter(end_datetime__gte=frm_dt)
+    if to_dt:
+        events = events.filter(start_datetime__lte=to_dt)
+
+    events = events.order_by('start_datetime')
+
+    # Eligibility filter, applied in SQL from the per-request visibility context
+    visible_events = list(visibility.filter_queryset(events))
+
     # Build a matrix of weeks (each week is 7 day dicts with date and events)
     month_cal = _cal.Calendar(firstweekday=_cal.SUNDAY).monthdayscalendar(y, m)
-
-    # Helper to get start/end of a given date in tz-aware datetimes
-    def _day_bounds(d: _date):
-        start = datetime.combine(d, _time.min)
-        end = datetime.combine(d, _time.max)
-        if _tz.is_naive(start):
-            start = _tz.make_aware(start, _tz.get_current_timezone())
-        if _tz.is_naive(end):
-            end = _tz.make_aware(end, _tz.get_current_timezone())
-        return start, end
+    last_day = _cal.monthrange(y, m)[1]
+    day_events = bucket_events_by_day(visible_events, _date(y, m, 1), _date(y, m, last_day))
 
     weeks = []
     for week in month_cal:
@@ -124,13 +119,10 @@ def calendar(request):
                 week_cells.append({'date': None, 'events': []})
                 continue
             d = _date(y, m, day_num)
-            ds, de = _day_bounds(d)
-            day_events = [e for e in visible_events if e.start_datetime <= de and e.end_datetime >= ds]
-            week_cells.append({'date': d, 'events': day_events})
+            week_cells.append({'date': d, 'events': day_events[d]})
         weeks.append(week_cells)
 
     # Month navigation (prev/next)
-    import math as _math
     if m == 1:
         prev_y, prev_m = y - 1, 12
     else:
@@ -165,7 +157,7 @@ def calendar(request):
 
 def event_detail(request, event_id):
     event = get_object_or_404(Event.objects.select_related('unit', 'host__user'), pk=event_id)
-    if not user_can_view_event(request.user, event):
+    if not EventVisibility.for_request(request).can_view(event):
         return HttpResponseForbidden('You are not eligible to view this event.')
     attendees = event.attendees.select_related('member__user').all()
     my_attendance = None
@@ -188,7 +180,7 @@ def request_attendance(request, event_id):
     Creates or updates an EventAttendee record with status 'maybe'.
     """
     event = get_object_or_404(Event, pk=event_id)
-    if not user_can_view_event(request.user, event):
+    if not EventVisibility.for_request(request).can_view(event):
         return HttpResponseForbidden('You are not eligible to request attendance for this event.')
     try:
         member = request.user.member
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Genre, Branch, Rank, Theme, RankImage, MemberRank, MemberRankHistory, RankSettings
+from .forms import RankImageAdminForm
 
 
 @admin.register(Genre)
@@ -24,6 +25,7 @@ class RankAdmin(admin.ModelAdmin):
 
 class RankImageInline(admin.TabularInline):
     model = RankImage
+    form = RankImageAdminForm
     extra = 1
 
 
@@ -37,6 +39,7 @@ class ThemeAdmin(admin.ModelAdmin):
 
 @admin.register(RankImage)
 class RankImageAdmin(admin.ModelAdmin):
+    form = RankImageAdminForm
     list_display = ('rank', 'theme')
     list_filter = ('theme', 'rank')
     search_fields = ('rank__short_name', 'theme__name')
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RankConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rank'
+
+    def ready(self):
+        # Register cache invalidation signals
+        from . import signals  # noqa: F401
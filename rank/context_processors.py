@@ -1,13 +1,12 @@
+from django.utils.functional import SimpleLazyObject
+
 from .models import RankSettings
 
 def rank_defaults(request):
     """
     Add rank default settings to the template context
     """
-    from .models import RankSettings
-
-    settings = RankSettings.get_settings()
-
+    # Resolved from the cache only when a template actually uses it
     return {
-        'rank_settings': settings
+        'rank_settings': SimpleLazyObject(RankSettings.get_cached)
     }
@@ -1,6 +1,7 @@
 from django import forms
 from .models import Rank, Theme, RankImage, Genre, Branch, RankSettings
 from rank.models import MemberRank, ChildRank
+from .insignia import generate_rank_image_variants
 import datetime
 
 
@@ -28,7 +29,31 @@ class ThemeForm(forms.ModelForm):
         }
 
 
-class RankImageForm(forms.ModelForm):
+class RankImageVariantsMixin:
+    """Regenerate the resized insignia variants after a new image is saved.
+
+    With commit=False (as the admin does) they are built by save_m2m(), once
+    the caller has saved the instance.
+    """
+
+    def save(self, commit=True):
+        instance = super().save(commit=commit)
+        if 'image' not in self.changed_data:
+            return instance
+        if commit:
+            generate_rank_image_variants(instance)
+        else:
+            save_m2m = self.save_m2m
+
+            def save_m2m_and_variants():
+                save_m2m()
+                generate_rank_image_variants(instance)
+
+            self.save_m2m = save_m2m_and_variants
+        return instance
+
+
+class RankImageForm(RankImageVariantsMixin, forms.ModelForm):
     class Meta:
         model = RankImage
         fields = ['rank', 'image']
@@ -38,6 +63,12 @@ class RankImageForm(forms.ModelForm):
         }
 
 
+class RankImageAdminForm(RankImageVariantsMixin, forms.ModelForm):
+    class Meta:
+        model = RankImage
+        fields = '__all__'
+
+
 class GenreForm(forms.ModelForm):
     class Meta:
         model = Genre
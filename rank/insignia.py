@@ -0,0 +1,110 @@
+"""Rank insignia lookup table and image variants.
+
+Every RankImage is loaded once per process into a ``(rank_id, theme_id) ->
+Insignia`` map, so resolving an insignia never queries the database.  The map
+is tagged with a version kept in the cache; the RankImage signals in
+rank.signals bump it, and each process reloads its copy when it sees a newer
+version.
+
+Uploads through RankImageForm also get resized WebP/PNG variants (see
+MCARS.images) so templates can serve a ``srcset`` instead of the original file.
+"""
+import threading
+
+from django.core.cache import cache
+
+from MCARS.images import build_variants, delete_variants
+
+# (name, bounding box in pixels); 'thumb' covers lists, 'card' profile pages
+RANK_IMAGE_SIZES = (('thumb', 64), ('card', 160), ('full', 480))
+
+VERSION_KEY = 'rank:insignia:version'
+
+_lock = threading.Lock()
+_table = {'version': None, 'images': {}}
+
+
+class Insignia:
+    """URLs of one rank image and its variants"""
+
+    __slots__ = ('url', 'width', 'variants')
+
+    def __init__(self, url, variants=(), width=None):
+        self.url = url
+        self.width = width
+        # (width, webp url, png url), smallest first
+        self.variants = sorted(variants)
+
+    def _candidates(self):
+        """Variants plus the original when it is wider than all of them, smallest first"""
+        candidates = list(self.variants)
+        if self.width and (not candidates or self.width > candidates[-1][0]):
+            candidates.append((self.width, self.url, self.url))
+        return candidates
+
+    def src(self, width):
+        """PNG URL of the smallest variant at least ``width`` pixels wide, else of the widest image"""
+        candidates = self._candidates()
+        for candidate_width, _, png_url in candidates:
+            if candidate_width >= width:
+                return png_url
+        return candidates[-1][2] if candidates else self.url
+
+    def srcset(self, ext='png'):
+        column = 1 if ext == 'webp' else 2
+        return ', '.join(f"{candidate[column]} {candidate[0]}w" for candidate in self._candidates())
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, None)
+    return version
+
+
+def _load():
+    from .models import RankImage
+
+    storage = RankImage._meta.get_field('image').storage
+    images = {}
+    rows = RankImage.objects.values_list('rank_id', 'theme_id', 'image', 'variants', 'width')
+    for rank_id, theme_id, name, variants, width in rows:
+        if not name:
+            continue
+        images[rank_id, theme_id] = Insignia(storage.url(name), [
+            (variant['width'], storage.url(variant['webp']), storage.url(variant['png']))
+            for variant in (variants or {}).values()
+        ], width)
+    return images
+
+
+def insignia_table():
+    """The (rank_id, theme_id) -> Insignia map, reloaded when a RankImage has changed"""
+    version = _version()
+    if _table['version'] != version:
+        with _lock:
+            if _table['version'] != version:
+                _table['images'] = _load()
+                _table['version'] = version
+    return _table['images']
+
+
+def get_insignia(rank_id, theme_id):
+    return insignia_table().get((rank_id, theme_id))
+
+
+def invalidate_insignia_table():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, None)
+
+
+def generate_rank_image_variants(rank_image):
+    """(Re)write the resized variants of ``rank_image`` and record them on the row"""
+    storage = rank_image.image.storage
+    delete_variants(storage, rank_image.variants)
+    rank_image.variants = build_variants(storage, rank_image.image.name, RANK_IMAGE_SIZES) if rank_image.image else {}
+    rank_image.width = rank_image.image.width if rank_image.image else None
+    rank_image.save(update_fields=['variants', 'width'])
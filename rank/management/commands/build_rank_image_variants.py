@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from rank.insignia import generate_rank_image_variants
+from rank.models import RankImage
+
+
+class Command(BaseCommand):
+    help = 'Write the resized WebP/PNG variants of rank images (by default only those that have none yet)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild the variants of every rank image')
+
+    def handle(self, *args, **options):
+        images = RankImage.objects.exclude(image='').order_by('pk')
+        if not options['all']:
+            images = images.filter(Q(variants={}) | Q(width__isnull=True))
+
+        built = failed = 0
+        for rank_image in images.iterator():
+            try:
+                generate_rank_image_variants(rank_image)
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"{rank_image} ({rank_image.image.name}): {exc}")
+            else:
+                built += 1
+        self.stdout.write(self.style.SUCCESS(f"Built variants for {built} rank image(s); {failed} failed."))
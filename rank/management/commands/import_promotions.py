@@ -0,0 +1,104 @@
+import csv
+import datetime
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from Members.models import Child, Member
+from rank.models import Rank, Theme
+from rank.utils import bulk_assign_ranks
+
+
+class Command(BaseCommand):
+    help = (
+        'Apply a promotion board CSV. Columns: membership_id or child_id, paygrade, '
+        'and optionally theme (id, or name plus genre/branch names when the name is shared), '
+        'effective_date (YYYY-MM-DD) and notes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_file', help='Path to the promotion board CSV')
+        parser.add_argument('--assigned-by', help='Username recorded as the assigner')
+        parser.add_argument('--dry-run', action='store_true', help='Validate and report without writing')
+
+    @staticmethod
+    def resolve_theme(row, value, themes_by_id, themes_by_name):
+        """Return (theme, error) for a theme id or a name narrowed by the row's genre/branch"""
+        if value.isdigit() and int(value) in themes_by_id:
+            return themes_by_id[int(value)], None
+        genre = (row.get('genre') or '').strip()
+        branch = (row.get('branch') or '').strip()
+        matches = [
+            t for t in themes_by_name.get(value, [])
+            if (not genre or t.genre.name == genre) and (not branch or t.branch.name == branch)
+        ]
+        if not matches:
+            return None, f"unknown theme {value!r}"
+        if len(matches) > 1:
+            return None, (f"theme {value!r} is ambiguous ({len(matches)} matches); "
+                          f"add genre/branch columns or use the theme id")
+        return matches[0], None
+
+    def handle(self, *args, **options):
+        assigned_by = None
+        if options['assigned_by']:
+            assigned_by = User.objects.filter(username=options['assigned_by']).first()
+            if assigned_by is None:
+                raise CommandError(f"No user named {options['assigned_by']!r}")
+
+        with open(options['csv_file'], newline='', encoding='utf-8-sig') as handle:
+            rows = list(csv.DictReader(handle))
+
+        members = Member.objects.in_bulk(
+            [r['membership_id'] for r in rows if r.get('membership_id')], field_name='membership_id')
+        children = Child.objects.in_bulk(
+            [r['child_id'] for r in rows if r.get('child_id')], field_name='child_id')
+        ranks = Rank.objects.in_bulk([r.get('paygrade', '') for r in rows], field_name='paygrade')
+        theme_values = {(r.get('theme') or '').strip() for r in rows} - {''}
+        themes_by_id = Theme.objects.in_bulk([v for v in theme_values if v.isdigit()])
+        themes_by_name = defaultdict(list)
+        for theme in Theme.objects.filter(name__in=theme_values).select_related('genre', 'branch'):
+            themes_by_name[theme.name].append(theme)
+
+        groups = defaultdict(list)
+        errors = []
+        for line, row in enumerate(rows, start=2):
+            person = members.get(row.get('membership_id')) or children.get(row.get('child_id'))
+            rank = ranks.get(row.get('paygrade', ''))
+            theme_name = (row.get('theme') or '').strip()
+            theme, theme_error = None, None
+            if theme_name:
+                theme, theme_error = self.resolve_theme(row, theme_name, themes_by_id, themes_by_name)
+            try:
+                effective_date = datetime.date.fromisoformat(row['effective_date']) if row.get('effective_date') else None
+            except ValueError:
+                effective_date = False
+            if person is None:
+                errors.append(f"line {line}: unknown membership_id/child_id")
+            elif rank is None:
+                errors.append(f"line {line}: unknown paygrade {row.get('paygrade')!r}")
+            elif theme_error:
+                errors.append(f"line {line}: {theme_error}")
+            elif effective_date is False:
+                errors.append(f"line {line}: bad effective_date {row['effective_date']!r}")
+            else:
+                groups[(rank, theme, effective_date, (row.get('notes') or '').strip())].append(person)
+
+        if errors:
+            raise CommandError('Nothing imported:\n' + '\n'.join(errors))
+
+        people = sum(len(group) for group in groups.values())
+        if options['dry_run']:
+            self.stdout.write(f"Dry run: {people} assignment(s) in {len(groups)} group(s) are valid.")
+            return
+
+        changes = 0
+        with transaction.atomic():
+            for (rank, theme, effective_date, notes), group in groups.items():
+                # Rows without a theme/notes column value leave the current ones alone
+                changes += bulk_assign_ranks(group, rank, theme, assigned_by,
+                                             effective_date=effective_date, notes=notes or None,
+                                             keep_theme=theme is None)
+        self.stdout.write(self.style.SUCCESS(f"Applied {people} assignment(s); {changes} rank change(s) recorded."))
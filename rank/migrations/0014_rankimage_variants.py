@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rank', '0013_childrank_childrankhistory'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankimage',
+            name='variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rank', '0014_rankimage_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rankimage',
+            name='width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
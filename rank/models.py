@@ -1,4 +1,6 @@
 from django.db import models
+from django.conf import settings as django_settings
+from django.core.cache import cache
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 import os
@@ -6,6 +8,9 @@ import uuid
 import datetime
 
 
+RANK_SETTINGS_CACHE_KEY = 'rank:settings'
+
+
 class Genre(models.Model):
     """Genre model to categorize different types of rank systems"""
     name = models.CharField(max_length=100, unique=True)
@@ -69,6 +74,10 @@ class RankImage(models.Model):
     rank = models.ForeignKey(Rank, on_delete=models.CASCADE, related_name='images')
     theme = models.ForeignKey(Theme, on_delete=models.CASCADE, related_name='rank_images')
     image = models.ImageField(upload_to='rank_images/')
+    # Resized WebP/PNG copies written by rank.insignia.generate_rank_image_variants
+    variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Pixel width of the original, recorded with its variants
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -111,8 +120,90 @@ class RankSettings(models.Model):
         settings, created = cls.objects.get_or_create(pk=1)
         return settings
 
+    @classmethod
+    def get_cached(cls):
+        """Get settings with default_paygrade/default_theme preloaded, served from the cache.
+
+        Read-only callers should use this instead of get_settings(); the cached copy
+        is invalidated whenever RankSettings, Rank or Theme rows change.
+        """
+        settings = cache.get(RANK_SETTINGS_CACHE_KEY)
+        if settings is None:
+            settings, created = cls.objects.select_related('default_paygrade', 'default_theme').get_or_create(pk=1)
+            cache.set(RANK_SETTINGS_CACHE_KEY, settings, django_settings.RANK_SETTINGS_CACHE_TTL)
+        return settings
+
+    @classmethod
+    def invalidate_cache(cls):
+        """Drop the cached settings so the next get_cached() reloads them"""
+        cache.delete(RANK_SETTINGS_CACHE_KEY)
+
+
+class RankAssignmentHistoryMixin:
+    """History tracking shared by MemberRank and ChildRank.
+
+    The rank/theme an assignment was loaded with is remembered in from_db(), so
+    save() (and rank.utils.bulk_assign_ranks) can tell what changed and write
+    the history row without re-fetching the old instance.
+    """
+    owner_field = None  # 'member' or 'child'
 
-class MemberRank(models.Model):
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_assignment()
+        return instance
+
+    def _remember_loaded_assignment(self):
+        self._loaded_assignment = (self.__dict__.get('rank_id'), self.__dict__.get('preferred_theme_id'))
+
+    def rank_change(self):
+        """Return (change_type, previous_rank_id, previous_theme_id), or None if nothing to record"""
+        if self._state.adding:
+            return 'initial', None, None
+        old_rank_id, old_theme_id = getattr(self, '_loaded_assignment', (None, None))
+        if old_rank_id is None:
+            # Loaded with rank deferred (or built by hand): fall back to the stored row
+            old_rank_id, old_theme_id = (
+                type(self).objects.filter(pk=self.pk).values_list('rank_id', 'preferred_theme_id').first()
+                or (None, None)
+            )
+        rank_changed = old_rank_id != self.rank_id
+        theme_changed = old_theme_id != self.preferred_theme_id
+        if not (rank_changed or theme_changed):
+            return None
+        if rank_changed and theme_changed:
+            change_type = 'both'
+        elif rank_changed:
+            change_type = 'rank'
+        else:
+            change_type = 'theme'
+        return change_type, old_rank_id if rank_changed else None, old_theme_id if theme_changed else None
+
+    def build_history(self, change):
+        """Unsaved history row for a change returned by rank_change()"""
+        change_type, previous_rank_id, previous_theme_id = change
+        return self.history_model()(**{
+            f'{self.owner_field}_id': getattr(self, f'{self.owner_field}_id'),
+            'rank_id': self.rank_id,
+            'previous_rank_id': previous_rank_id,
+            'theme_id': self.preferred_theme_id,
+            'previous_theme_id': previous_theme_id,
+            'change_type': change_type,
+            'effective_date': self.effective_date,
+            'notes': self.notes,
+            'assigned_by_id': self.assigned_by_id,
+        })
+
+    def save(self, *args, **kwargs):
+        change = self.rank_change()
+        super().save(*args, **kwargs)
+        if change:
+            self.build_history(change).save()
+        self._remember_loaded_assignment()
+
+
+class MemberRank(RankAssignmentHistoryMixin, models.Model):
     """Bridge model to associate members with ranks"""
     member = models.OneToOneField('Members.Member', on_delete=models.CASCADE, related_name='rank_association')
     rank = models.ForeignKey(Rank, on_delete=models.CASCADE, related_name='member_associations')
@@ -128,63 +219,14 @@ class MemberRank(models.Model):
         verbose_name_plural = 'Member Ranks'
         ordering = ['-effective_date']
 
-    def __str__(self):
-        return f"{self.member.get_ranked_name()} - {self.rank}"
+    owner_field = 'member'
 
-    def save(self, *args, **kwargs):
-        # Check if this is an update to an existing rank
-        is_update = self.pk is not None
-
-        # If it's an update, get the old rank and theme before saving
-        if is_update:
-            try:
-                old_instance = MemberRank.objects.get(pk=self.pk)
-                old_rank = old_instance.rank
-                old_theme = old_instance.preferred_theme
-
-                # Determine what's changing
-                rank_changed = old_rank != self.rank
-                theme_changed = old_theme != self.preferred_theme
-
-            except MemberRank.DoesNotExist:
-                old_rank = None
-                old_theme = None
-                rank_changed = True
-                theme_changed = True
-                is_update = False
-        else:
-            old_rank = None
-            old_theme = None
-            rank_changed = True
-            theme_changed = True
-
-        # Save the instance
-        super().save(*args, **kwargs)
+    @staticmethod
+    def history_model():
+        return MemberRankHistory
 
-        # If there's any change that needs to be tracked
-        if not is_update or rank_changed or theme_changed:
-            # Determine the change type
-            if not is_update:
-                change_type = 'initial'
-            elif rank_changed and theme_changed:
-                change_type = 'both'
-            elif rank_changed:
-                change_type = 'rank'
-            else:  # theme_changed only
-                change_type = 'theme'
-
-            # Create history entry
-            MemberRankHistory.objects.create(
-                member=self.member,
-                rank=self.rank,
-                previous_rank=old_rank if (is_update and rank_changed) else None,
-                theme=self.preferred_theme,
-                previous_theme=old_theme if (is_update and theme_changed) else None,
-                change_type=change_type,
-                effective_date=self.effective_date,
-                notes=self.notes,
-                assigned_by=self.assigned_by
-            )
+    def __str__(self):
+        return f"{self.member.get_ranked_name()} - {self.rank}"
 
 
 class MemberRankHistory(models.Model):
@@ -217,7 +259,7 @@ class MemberRankHistory(models.Model):
             return f"{self.member.get_full_name()} - {self.rank} (from {self.previous_rank or 'None'})"
 
 
-class ChildRank(models.Model):
+class ChildRank(RankAssignmentHistoryMixin, models.Model):
     """Bridge model to associate children with ranks"""
     child = models.OneToOneField('Members.Child', on_delete=models.CASCADE, related_name='child_rank_association')
     rank = models.ForeignKey(Rank, on_delete=models.CASCADE, related_name='child_associations')
@@ -233,63 +275,14 @@ class ChildRank(models.Model):
         verbose_name_plural = 'Child Ranks'
         ordering = ['-effective_date']
 
-    def __str__(self):
-        return f"{self.child.get_ranked_name()} - {self.rank}"
-
-    def save(self, *args, **kwargs):
-        # Check if this is an update to an existing rank
-        is_update = self.pk is not None
-
-        # If it's an update, get the old rank and theme before saving
-        if is_update:
-            try:
-                old_instance = ChildRank.objects.get(pk=self.pk)
-                old_rank = old_instance.rank
-                old_theme = old_instance.preferred_theme
-
-                # Determine what's changing
-                rank_changed = old_rank != self.rank
-                theme_changed = old_theme != self.preferred_theme
-
-            except ChildRank.DoesNotExist:
-                old_rank = None
-                old_theme = None
-                rank_changed = True
-                theme_changed = True
-                is_update = False
-        else:
-            old_rank = None
-            old_theme = None
-            rank_changed = True
-            theme_changed = True
+    owner_field = 'child'
 
-        # Save the instance
-        super().save(*args, **kwargs)
+    @staticmethod
+    def history_model():
+        return ChildRankHistory
 
-        # If there's any change that needs to be tracked
-        if not is_update or rank_changed or theme_changed:
-            # Determine the change type
-            if not is_update:
-                change_type = 'initial'
-            elif rank_changed and theme_changed:
-                change_type = 'both'
-            elif rank_changed:
-                change_type = 'rank'
-            else:  # theme_changed only
-                change_type = 'theme'
-
-            # Create history entry
-            ChildRankHistory.objects.create(
-                child=self.child,
-                rank=self.rank,
-                previous_rank=old_rank if (is_update and rank_changed) else None,
-                theme=self.preferred_theme,
-                previous_theme=old_theme if (is_update and theme_changed) else None,
-                change_type=change_type,
-                effective_date=self.effective_date,
-                notes=self.notes,
-                assigned_by=self.assigned_by
-            )
+    def __str__(self):
+        return f"{self.child.get_ranked_name()} - {self.rank}"
 
 
 class ChildRankHistory(models.Model):
@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from Members.models import Member
+from .insignia import invalidate_insignia_table
+from .models import Rank, Theme, RankImage, RankSettings, MemberRank
+
+
+@receiver(post_save, sender=RankSettings)
+@receiver(post_delete, sender=RankSettings)
+@receiver(post_save, sender=Rank)
+@receiver(post_delete, sender=Rank)
+@receiver(post_save, sender=Theme)
+@receiver(post_delete, sender=Theme)
+def invalidate_rank_settings_cache(sender, **kwargs):
+    """Drop the cached RankSettings once the change is committed"""
+    transaction.on_commit(RankSettings.invalidate_cache)
+
+
+@receiver(post_save, sender=RankImage)
+@receiver(post_delete, sender=RankImage)
+def invalidate_insignia(sender, **kwargs):
+    """Have every process reload the insignia table once the change is committed"""
+    transaction.on_commit(invalidate_insignia_table)
+
+
+@receiver(post_delete, sender=RankImage)
+def delete_rank_image_variants(sender, instance, **kwargs):
+    from MCARS.images import delete_variants
+    storage = instance.image.storage
+    variants = instance.variants
+    transaction.on_commit(lambda: delete_variants(storage, variants))
+
+
+# ---------------- Member.display_name maintenance ----------------
+
+def _refresh_display_names_on_commit(queryset):
+    from Members.utils import refresh_display_names
+    transaction.on_commit(lambda: refresh_display_names(queryset))
+
+
+@receiver(post_save, sender=MemberRank)
+@receiver(post_delete, sender=MemberRank)
+def refresh_member_display_name(sender, instance, **kwargs):
+    """A member's rank changed (or was removed, falling back to the default rank)"""
+    _refresh_display_names_on_commit(Member.objects.filter(pk=instance.member_id))
+
+
+@receiver(post_save, sender=Rank)
+def refresh_rank_holder_display_names(sender, instance, **kwargs):
+    """A rank's short name may have changed; refresh everyone shown with it"""
+    holders = Q(rank_association__rank_id=instance.pk)
+    default_paygrade_id = RankSettings.objects.filter(pk=1).values_list('default_paygrade_id', flat=True).first()
+    if default_paygrade_id == instance.pk:
+        holders |= Q(rank_association__isnull=True)
+    _refresh_display_names_on_commit(Member.objects.filter(holders))
+
+
+@receiver(post_save, sender=RankSettings)
+def refresh_default_rank_display_names(sender, instance, **kwargs):
+    """Members without an assigned rank are shown with the default paygrade"""
+    _refresh_display_names_on_commit(Member.objects.filter(rank_association__isnull=True))
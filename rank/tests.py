@@ -0,0 +1,191 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from Members.models import Child, Member
+
+from .models import Branch, Genre, MemberRank, MemberRankHistory, Rank, Theme
+from .utils import bulk_assign_ranks, people_page
+
+
+def make_member(username, first_name='Test', last_name='Member'):
+    user = User.objects.create_user(
+        username, email=f'{username}@example.com', first_name=first_name, last_name=last_name,
+    )
+    return Member.objects.create(user=user, phone_number='555-0100')
+
+
+class PeoplePageTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Members and children share last names, and some share first names too, so
+        # page boundaries fall inside ties broken by person type and then id
+        parents = [make_member(f'parent{i}', first_name=f'Pat{i % 3}', last_name=f'Family{i % 4}') for i in range(9)]
+        for i, parent in enumerate(parents):
+            Child.objects.create(parent=parent, first_name=f'Pat{i % 3}', last_name=parent.user.last_name)
+            Child.objects.create(parent=parent, first_name='Kid', last_name=f'Family{(i + 1) % 4}')
+        members = [(m.user.last_name, m.user.first_name, 'member', m.pk)
+                   for m in Member.objects.select_related('user')]
+        children = [(c.last_name, c.first_name, 'child', c.pk) for c in Child.objects.all()]
+        cls.expected = [(kind, pk) for *_, kind, pk in sorted(members + children)]
+
+    def keys(self, page):
+        return [(person.person_type, person.pk) for person in page]
+
+    def walk(self, per_page, **filters):
+        pages = [people_page(per_page=per_page, **filters)]
+        while pages[-1].has_next:
+            pages.append(people_page(after=pages[-1].next_cursor, per_page=per_page, **filters))
+        return pages
+
+    def test_forward_walk_covers_every_person_once_in_order(self):
+        for per_page in (1, 4, 7, 100):
+            with self.subTest(per_page=per_page):
+                pages = self.walk(per_page)
+                self.assertEqual([key for page in pages for key in self.keys(page)], self.expected)
+                self.assertFalse(pages[0].has_previous)
+                self.assertEqual(pages[-1].has_previous, len(pages) > 1)
+
+    def test_backward_walk_returns_the_same_pages(self):
+        for per_page in (1, 4, 7):
+            with self.subTest(per_page=per_page):
+                pages = self.walk(per_page)
+                backwards = [pages[-1]]
+                while backwards[-1].has_previous:
+                    backwards.append(people_page(before=backwards[-1].previous_cursor, per_page=per_page))
+                self.assertEqual(
+                    [self.keys(page) for page in reversed(backwards)],
+                    [self.keys(page) for page in pages],
+                )
+                self.assertTrue(all(page.has_next for page in backwards[1:]))
+
+    def test_person_type_filter(self):
+        members = [key for page in self.walk(5, person_type='members') for key in self.keys(page)]
+        children = [key for page in self.walk(5, person_type='children') for key in self.keys(page)]
+
+        self.assertEqual(members, [key for key in self.expected if key[0] == 'member'])
+        self.assertEqual(children, [key for key in self.expected if key[0] == 'child'])
+
+    def test_invalid_cursor_starts_at_the_first_page(self):
+        first = self.keys(people_page(per_page=5))
+
+        for token in ('garbage', 'WyJhIl0'):
+            page = people_page(after=token, per_page=5)
+            self.assertEqual(self.keys(page), first)
+            self.assertFalse(page.has_previous)
+
+
+class BulkAssignRanksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        genre = Genre.objects.create(name='Sci-Fi')
+        branch = Branch.objects.create(name='Navy')
+        cls.theme = Theme.objects.create(name='Classic', genre=genre, branch=branch)
+        cls.other_theme = Theme.objects.create(name='Modern', genre=genre, branch=branch)
+        cls.ensign = Rank.objects.create(paygrade='O-1', short_name='ENS', long_name='Ensign', order=1)
+        cls.lieutenant = Rank.objects.create(paygrade='O-2', short_name='LTJG', long_name='Lieutenant JG', order=2)
+        cls.admin = User.objects.create_user('admin')
+
+    def test_new_assignments_get_an_initial_history_row(self):
+        members = [make_member(f'm{i}') for i in range(3)]
+
+        written = bulk_assign_ranks(members, self.ensign, theme=self.theme, assigned_by=self.admin, notes='Batch')
+
+        self.assertEqual(written, 3)
+        self.assertEqual(MemberRank.objects.filter(rank=self.ensign, preferred_theme=self.theme).count(), 3)
+        history = MemberRankHistory.objects.filter(member__in=members)
+        self.assertEqual(history.count(), 3)
+        self.assertEqual(set(history.values_list('change_type', flat=True)), {'initial'})
+        self.assertEqual(set(history.values_list('notes', flat=True)), {'Batch'})
+
+    def test_keep_theme_keeps_existing_theme_and_notes(self):
+        member = make_member('kept')
+        MemberRank.objects.create(member=member, rank=self.ensign, preferred_theme=self.theme, notes='Original')
+        newcomer = make_member('newcomer')
+
+        written = bulk_assign_ranks(
+            [member, newcomer], self.lieutenant, theme=None, assigned_by=self.admin, notes=None, keep_theme=True,
+        )
+
+        self.assertEqual(written, 2)
+        assignment = MemberRank.objects.get(member=member)
+        self.assertEqual(assignment.rank, self.lieutenant)
+        self.assertEqual(assignment.preferred_theme, self.theme)
+        self.assertEqual(assignment.notes, 'Original')
+        latest = MemberRankHistory.objects.filter(member=member).latest('id')
+        self.assertEqual(latest.change_type, 'rank')
+        self.assertEqual(latest.previous_rank, self.ensign)
+        self.assertEqual(latest.theme, self.theme)
+        self.assertIsNone(MemberRank.objects.get(member=newcomer).preferred_theme)
+
+    def test_theme_change_is_recorded_and_unchanged_rows_are_not(self):
+        changed, unchanged = make_member('changed'), make_member('unchanged')
+        MemberRank.objects.create(member=changed, rank=self.ensign, preferred_theme=self.theme)
+        MemberRank.objects.create(member=unchanged, rank=self.lieutenant, preferred_theme=self.other_theme)
+        before = MemberRankHistory.objects.count()
+
+        written = bulk_assign_ranks([changed, unchanged], self.lieutenant, theme=self.other_theme)
+
+        self.assertEqual(written, 1)
+        self.assertEqual(MemberRankHistory.objects.count(), before + 1)
+        latest = MemberRankHistory.objects.filter(member=changed).latest('id')
+        self.assertEqual(latest.change_type, 'both')
+        self.assertEqual(latest.previous_theme, self.theme)
+        self.assertEqual(MemberRank.objects.get(member=changed).preferred_theme, self.other_theme)
+
+
+class ImportPromotionsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        scifi, fantasy = Genre.objects.create(name='Sci-Fi'), Genre.objects.create(name='Fantasy')
+        navy, army = Branch.objects.create(name='Navy'), Branch.objects.create(name='Army')
+        # Theme names are only unique per genre and branch
+        cls.navy_classic = Theme.objects.create(name='Classic', genre=scifi, branch=navy)
+        cls.army_classic = Theme.objects.create(name='Classic', genre=scifi, branch=army)
+        cls.fantasy_classic = Theme.objects.create(name='Classic', genre=fantasy, branch=navy)
+        cls.modern = Theme.objects.create(name='Modern', genre=scifi, branch=navy)
+        cls.ensign = Rank.objects.create(paygrade='O-1', short_name='ENS', long_name='Ensign', order=1)
+        cls.member = make_member('promoted')
+
+    def run_import(self, *lines):
+        header = 'membership_id,paygrade,theme,genre,branch'
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('\n'.join((header,) + lines) + '\n')
+        self.addCleanup(os.unlink, handle.name)
+        call_command('import_promotions', handle.name, stdout=StringIO())
+
+    def theme(self):
+        return MemberRank.objects.get(member=self.member).preferred_theme
+
+    def test_unique_name_id_and_narrowed_name_resolve(self):
+        mid = self.member.membership_id
+        for line, expected in (
+            (f'{mid},O-1,Modern,,', self.modern),
+            (f'{mid},O-1,{self.army_classic.pk},,', self.army_classic),
+            (f'{mid},O-1,Classic,Fantasy,', self.fantasy_classic),
+            (f'{mid},O-1,Classic,Sci-Fi,Navy', self.navy_classic),
+        ):
+            with self.subTest(line=line):
+                self.run_import(line)
+                self.assertEqual(self.theme(), expected)
+
+    def test_ambiguous_theme_name_is_an_error(self):
+        mid = self.member.membership_id
+        for line in (f'{mid},O-1,Classic,,', f'{mid},O-1,Classic,Sci-Fi,'):
+            with self.subTest(line=line):
+                with self.assertRaisesMessage(CommandError, "theme 'Classic' is ambiguous"):
+                    self.run_import(line)
+        self.assertFalse(MemberRank.objects.exists())
+
+    def test_unknown_theme_is_an_error(self):
+        mid = self.member.membership_id
+        for line in (f'{mid},O-1,Retro,,', f'{mid},O-1,Classic,Fantasy,Army', f'{mid},O-1,999999,,'):
+            with self.subTest(line=line):
+                with self.assertRaisesMessage(CommandError, 'unknown theme'):
+                    self.run_import(line)
+        self.assertFalse(MemberRank.objects.exists())
+
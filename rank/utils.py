@@ -0,0 +1,343 @@
+from django.db import connection, transaction
+from django.db.models import CharField, F, Max, Prefetch, Q, Value, prefetch_related_objects
+
+from MCARS.pagination import CursorPage, decode_cursor, encode_cursor, keyset_q
+from Members.models import Member, Child
+from .insignia import insignia_table
+from .models import Rank, RankSettings, MemberRank, ChildRank
+
+
+class RankResolver:
+    """Resolve ranked names and insignia URLs for many members/children at once.
+
+    Usage::
+
+        page_obj.object_list = RankResolver().resolve(page_obj.object_list)
+
+    Every person gets ``ranked_name``, ``rank_image_url`` and ``rank_insignia``
+    (a rank.insignia.Insignia) attributes, and its rank association is cached, using
+    a constant number of queries however many people are passed in (insignia come
+    from the in-memory table in rank.insignia). Member.get_ranked_name()/get_rank_image()
+    (and the Child equivalents) return these values once they are set.
+    """
+
+    def __init__(self, settings=None):
+        self.settings = settings or RankSettings.get_cached()
+
+    def resolve(self, people):
+        """Annotate the given Member/Child instances in place and return them as a list"""
+        people = [p for p in people if p is not None]
+        members = [p for p in people if isinstance(p, Member)]
+        children = [p for p in people if isinstance(p, Child)]
+
+        # One query per relation; instances that already have it loaded are skipped
+        if members:
+            prefetch_related_objects(
+                members,
+                'user',
+                Prefetch('rank_association', queryset=MemberRank.objects.select_related('rank', 'preferred_theme')),
+            )
+        if children:
+            prefetch_related_objects(
+                children,
+                Prefetch('child_rank_association', queryset=ChildRank.objects.select_related('rank', 'preferred_theme')),
+            )
+
+        associations = [a for a in (self.association(p) for p in people) if a is not None]
+        # Associations prefetched elsewhere (e.g. 'rank_association__rank') may lack the theme
+        prefetch_related_objects(associations, 'rank', 'preferred_theme')
+
+        default_rank = self.settings.default_paygrade
+        default_theme = self.settings.default_theme
+
+        resolved = []
+        for person in people:
+            association = self.association(person)
+            rank = association.rank if association else default_rank
+            theme = association.preferred_theme if association and association.preferred_theme_id else default_theme
+            resolved.append((person, association, rank, theme))
+
+        insignia = insignia_table()
+
+        for person, association, rank, theme in resolved:
+            if isinstance(person, Member):
+                # Members fall back to the default rank for their name prefix
+                prefix = rank.short_name if rank else ''
+                first_name, last_name = person.user.first_name, person.user.last_name
+            else:
+                # Children only show a rank they have actually been assigned
+                prefix = association.rank.short_name if association else ''
+                first_name, last_name = person.first_name, person.last_name
+            person.ranked_name = f"{prefix} {first_name} {last_name}" if prefix else f"{first_name} {last_name}"
+
+            image = None
+            if rank:
+                if theme:
+                    image = insignia.get((rank.id, theme.id))
+                if image is None and default_theme:
+                    image = insignia.get((rank.id, default_theme.id))
+            person.rank_insignia = image
+            person.rank_image_url = image.url if image else None
+
+        return people
+
+    @staticmethod
+    def association(person):
+        """Return the person's rank association or None (uses the prefetched cache)"""
+        name = 'rank_association' if isinstance(person, Member) else 'child_rank_association'
+        return getattr(person, name, None)
+
+
+# ---------------- People listing (members ∪ children) ----------------
+
+PEOPLE_FIELDS = ('sort_last', 'sort_first', 'person_type', 'person_id', 'rank_name')
+PEOPLE_ORDERING = ('sort_last', 'sort_first', 'person_type', 'person_id')
+
+
+def encode_people_cursor(row):
+    """Encode the sort key of a people row as an opaque URL-safe token"""
+    return encode_cursor(row[f] for f in PEOPLE_ORDERING)
+
+
+def decode_people_cursor(token):
+    """Decode a token from encode_people_cursor(); returns None if it is malformed"""
+    key = decode_cursor(token, size=len(PEOPLE_ORDERING))
+    if key is None:
+        return None
+    try:
+        last, first, person_type, person_id = key
+        return str(last), str(first), str(person_type), int(person_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def people_querysets(query='', person_type='all'):
+    """Return the member and child halves of the people listing as aligned querysets.
+
+    Both halves expose the same annotations (see PEOPLE_FIELDS) so they can be
+    combined with union() and sorted/paginated by the database.
+    """
+    halves = []
+    if person_type in ('all', 'members'):
+        members = Member.objects.annotate(
+            sort_last=F('user__last_name'),
+            sort_first=F('user__first_name'),
+            person_type=Value('member', output_field=CharField()),
+            person_id=F('id'),
+            rank_name=F('rank_association__rank__short_name'),
+        )
+        if query:
+            members = members.filter(
+                Q(user__first_name__icontains=query) |
+                Q(user__last_name__icontains=query) |
+                Q(user__email__icontains=query) |
+                Q(user__username__icontains=query)
+            )
+        halves.append(('member', members))
+
+    if person_type in ('all', 'children'):
+        children = Child.objects.annotate(
+            sort_last=F('last_name'),
+            sort_first=F('first_name'),
+            person_type=Value('child', output_field=CharField()),
+            person_id=F('id'),
+            rank_name=F('child_rank_association__rank__short_name'),
+        )
+        if query:
+            children = children.filter(
+                Q(first_name__icontains=query) |
+                Q(last_name__icontains=query) |
+                Q(parent__user__first_name__icontains=query) |
+                Q(parent__user__last_name__icontains=query)
+            )
+        halves.append(('child', children))
+    return halves
+
+
+def people_page(query='', person_type='all', after=None, before=None, per_page=20):
+    """Return a CursorPage sorted by last name, first name, type and id.
+
+    ``after``/``before`` are tokens from a previous page. Sorting, filtering and
+    paging all happen in one UNION query, so a page costs the same however large
+    the roster is; only the rows on the page are then loaded and rank-resolved.
+    """
+    after, before = decode_people_cursor(after), decode_people_cursor(before)
+    backwards = before is not None and after is None
+    cursor = before if backwards else after
+    ordering = [f'-{f}' for f in PEOPLE_ORDERING] if backwards else list(PEOPLE_ORDERING)
+
+    parts = []
+    halves = people_querysets(query, person_type)
+    for _, qs in halves:
+        if cursor:
+            qs = qs.filter(keyset_q(PEOPLE_ORDERING, cursor, backwards))
+        qs = qs.values(*PEOPLE_FIELDS)
+        if len(halves) > 1 and connection.features.supports_slicing_ordering_in_compound:
+            # Let each half stop early instead of sorting its whole table
+            qs = qs.order_by(*ordering)[:per_page + 1]
+        parts.append(qs)
+
+    if not parts:
+        return CursorPage([], False, False, None, None)
+    combined = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+    rows = list(combined.order_by(*ordering)[:per_page + 1])
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, cursor is not None
+
+    # Hydrate just this page (one query per person type) for the template
+    members = Member.objects.select_related('user').in_bulk(
+        [r['person_id'] for r in rows if r['person_type'] == 'member'])
+    children = Child.objects.select_related('parent__user').in_bulk(
+        [r['person_id'] for r in rows if r['person_type'] == 'child'])
+    people = []
+    for row in rows:
+        person = (members if row['person_type'] == 'member' else children).get(row['person_id'])
+        if person is not None:
+            person.person_type = row['person_type']
+            people.append(person)
+    RankResolver().resolve(people)
+    for person in people:
+        person.current_rank = RankResolver.association(person)
+
+    return CursorPage(
+        people,
+        has_next=has_next and bool(rows),
+        has_previous=has_previous and bool(rows),
+        next_cursor=encode_people_cursor(rows[-1]) if rows else None,
+        previous_cursor=encode_people_cursor(rows[0]) if rows else None,
+    )
+
+
+# ---------------- Rank ordering ----------------
+
+def _lock_rank_ordering():
+    """Serialize writers of Rank.order by locking the RankSettings singleton row"""
+    RankSettings.get_settings()
+    RankSettings.objects.select_for_update().filter(pk=1).first()
+
+
+def create_rank(rank):
+    """Save a new rank at the end of the ordering; concurrent creates get distinct orders"""
+    with transaction.atomic():
+        _lock_rank_ordering()
+        highest_order = Rank.objects.aggregate(Max('order'))['order__max'] or 0
+        rank.order = highest_order + 1
+        rank.save()
+    return rank
+
+
+def reorder_ranks(rank_orders):
+    """Apply a complete new ordering in one transaction.
+
+    ``rank_orders`` is a list of ``{'id': ..., 'order': ...}`` covering every rank
+    exactly once with distinct positive orders; anything else raises ValueError
+    and nothing is written. Returns the number of ranks whose order changed.
+    """
+    try:
+        new_orders = {int(item['id']): int(item['order']) for item in rank_orders}
+    except (KeyError, TypeError, ValueError):
+        raise ValueError('Each entry needs an integer id and order.')
+    if len(new_orders) != len(rank_orders):
+        raise ValueError('A rank appears more than once.')
+    if len(set(new_orders.values())) != len(new_orders) or min(new_orders.values(), default=1) < 1:
+        raise ValueError('Orders must be distinct positive integers.')
+
+    with transaction.atomic():
+        _lock_rank_ordering()
+        ranks = Rank.objects.select_for_update().in_bulk()
+        if set(ranks) != set(new_orders):
+            raise ValueError('The new order must include every rank exactly once; reload and try again.')
+        changed = []
+        for pk, rank in ranks.items():
+            if rank.order != new_orders[pk]:
+                rank.order = new_orders[pk]
+                changed.append(rank)
+        Rank.objects.bulk_update(changed, ['order'])
+        if changed:
+            # bulk_update skips the post_save receivers in rank.signals
+            transaction.on_commit(RankSettings.invalidate_cache)
+    return len(changed)
+
+
+# ---------------- Bulk rank assignment ----------------
+
+def bulk_assign_ranks(people, rank, theme=None, assigned_by=None, effective_date=None, notes='', batch_size=500,
+                      keep_theme=False):
+    """Assign ``rank``/``theme`` to many members and/or children in one transaction.
+
+    Existing assignments are updated with bulk_update, new ones created with
+    bulk_create, and a history row is bulk-created for every real change. The
+    denormalized caches that MemberRank/ChildRank signals maintain are refreshed
+    on commit. With ``keep_theme`` existing assignments keep their preferred theme
+    (``theme`` only applies to new ones), and ``notes=None`` likewise keeps their
+    notes. Returns the number of history rows written.
+    """
+    from django.utils import timezone
+
+    effective_date = effective_date or timezone.localdate()
+    now = timezone.now()
+    groups = (
+        (MemberRank, 'member', [p for p in people if isinstance(p, Member)]),
+        (ChildRank, 'child', [p for p in people if isinstance(p, Child)]),
+    )
+
+    written = 0
+    with transaction.atomic():
+        for model, owner, owners in groups:
+            if not owners:
+                continue
+            owner_ids = list(dict.fromkeys(p.pk for p in owners))
+            existing = {
+                getattr(a, f'{owner}_id'): a
+                for a in model.objects.select_for_update().filter(**{f'{owner}_id__in': owner_ids})
+            }
+            created, updated, history = [], [], []
+            for owner_id in owner_ids:
+                assignment = existing.get(owner_id) or model(**{f'{owner}_id': owner_id})
+                adding = assignment._state.adding
+                assignment.rank = rank
+                if adding or not keep_theme:
+                    assignment.preferred_theme = theme
+                assignment.effective_date = effective_date
+                if adding or notes is not None:
+                    assignment.notes = notes or ''
+                assignment.assigned_by = assigned_by
+                change = assignment.rank_change()
+                if change:
+                    history.append(assignment.build_history(change))
+                if adding:
+                    created.append(assignment)
+                else:
+                    assignment.updated_at = now
+                    updated.append(assignment)
+            model.objects.bulk_create(created, batch_size=batch_size)
+            fields = ['rank', 'effective_date', 'assigned_by', 'updated_at']
+            if not keep_theme:
+                fields.append('preferred_theme')
+            if notes is not None:
+                fields.append('notes')
+            model.objects.bulk_update(updated, fields, batch_size=batch_size)
+            model.history_model().objects.bulk_create(history, batch_size=batch_size)
+            for assignment in created + updated:
+                assignment._remember_loaded_assignment()
+            written += len(history)
+
+        member_ids = [p.pk for p in groups[0][2]]
+        if member_ids:
+            # bulk writes skip the MemberRank receivers in rank/units/Members signals
+            from Members.portal import invalidate_member_dashboards
+            from Members.utils import refresh_display_names
+            from units.utils import bump_hierarchy_version
+            transaction.on_commit(lambda: refresh_display_names(Member.objects.filter(pk__in=member_ids)))
+            transaction.on_commit(lambda: invalidate_member_dashboards(member_ids))
+            transaction.on_commit(bump_hierarchy_version)
+        if any(owners for _, _, owners in groups):
+            from Members.stats import invalidate_dashboard_stats
+            transaction.on_commit(invalidate_dashboard_stats)
+    return written
@@ -1,59 +1,47 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
-from django.db.models import Count, Q
-from django.core.paginator import Paginator
+from django.db.models import Q
 from django.http import JsonResponse
 from django.urls import reverse
 from .models import Genre, Branch, Rank, Theme, RankImage, RankSettings, MemberRank, MemberRankHistory
 from .forms import RankForm, ThemeForm, RankImageForm, GenreForm, BranchForm, RankSettingsForm, MemberRankForm
+from .utils import bulk_assign_ranks, create_rank, people_page, reorder_ranks
 from Members.models import Member
+from Members.roles import get_roles
 
 
 
 def is_rank_manager(user):
     """Check if user is in rank_manager group"""
-    return user.groups.filter(name='rank_manager').exists() or user.is_staff
+    return get_roles(user).is_rank_manager
 
 
 @login_required
 @user_passes_test(is_rank_manager)
 def rank_dashboard(request):
     """Main dashboard for rank managers"""
-    from Members.models import Member, Child
+    from Members.stats import dashboard_stats
 
-    rank_count = Rank.objects.count()
-    theme_count = Theme.objects.count()
-    branch_count = Branch.objects.count()
-    genre_count = Genre.objects.count()
-
-    # Member and child counts
-    member_count = Member.objects.count()
-    child_count = Child.objects.count()
-
-    # Members and children with ranks
-    members_with_ranks = MemberRank.objects.count()
-    children_with_ranks = Child.objects.filter(child_rank_association__isnull=False).count()
-
-    # Get themes with rank coverage stats
-    themes_with_stats = Theme.objects.annotate(rank_count=Count('rank_images'))
+    stats = dashboard_stats()
+    rank_stats = stats['ranks']
 
     # Recent ranks (ordered by rank order rather than creation date)
     recent_ranks = Rank.objects.all().order_by('order')[:10]
 
     # Get current default settings
-    settings = RankSettings.get_settings()
+    settings = RankSettings.get_cached()
 
     context = {
-        'rank_count': rank_count,
-        'theme_count': theme_count,
-        'branch_count': branch_count,
-        'genre_count': genre_count,
-        'member_count': member_count,
-        'child_count': child_count,
-        'members_with_ranks': members_with_ranks,
-        'children_with_ranks': children_with_ranks,
-        'themes_with_stats': themes_with_stats,
+        'rank_count': rank_stats['ranks'],
+        'theme_count': rank_stats['themes'],
+        'branch_count': rank_stats['branches'],
+        'genre_count': rank_stats['genres'],
+        'member_count': stats['members']['total'],
+        'child_count': stats['children']['total'],
+        'members_with_ranks': stats['members']['with_ranks'],
+        'children_with_ranks': stats['children']['with_ranks'],
+        'themes_with_stats': rank_stats['theme_coverage'],
         'recent_ranks': recent_ranks,
         'active_menu': 'dashboard',
         'settings': settings,
@@ -77,11 +65,8 @@ def rank_create(request):
     if request.method == 'POST':
         form = RankForm(request.POST)
         if form.is_valid():
-            rank = form.save(commit=False)
-            # Get the highest order value and increment by 1
-            highest_order = Rank.objects.aggregate(models.Max('order'))['order__max'] or 0
-            rank.order = highest_order + 1
-            rank.save()
+            # Appended after the current highest order
+            create_rank(form.save(commit=False))
             messages.success(request, 'Rank created successfully.')
             return redirect('rank:rank_list')
     else:
@@ -97,21 +82,22 @@ def update_rank_order(request):
     if request.method == 'POST':
         try:
             import json
-            from django.http import JsonResponse
 
-            rank_orders = json.loads(request.POST.get('rank_orders'))
+            if request.content_type == 'application/json':
+                rank_orders = json.loads(request.body).get('rank_orders')
+            else:
+                rank_orders = json.loads(request.POST.get('rank_orders') or 'null')
+            if not isinstance(rank_orders, list):
+                raise ValueError('rank_orders must be a list.')
 
-            # Update each rank's order
-            for rank_data in rank_orders:
-                rank = Rank.objects.get(id=rank_data['id'])
-                rank.order = rank_data['order']
-                rank.save()
+            # Validated as a whole and applied in one transaction
+            reorder_ranks(rank_orders)
 
             return JsonResponse({
                 'status': 'success',
                 'message': 'Rank order updated successfully'
             })
-        except Exception as e:
+        except (ValueError, AttributeError) as e:
             return JsonResponse({
                 'status': 'error',
                 'message': f'Error updating rank order: {str(e)}'
@@ -240,9 +226,8 @@ def rank_image_create(request, theme_id):
         form.fields['rank'].queryset = Rank.objects.exclude(images__theme=theme)
 
         if form.is_valid():
-            rank_image = form.save(commit=False)
-            rank_image.theme = theme
-            rank_image.save()
+            form.instance.theme = theme
+            form.save()
             messages.success(request, 'Rank image added successfully.')
             return redirect('rank:theme_detail', pk=theme.id)
     else:
@@ -456,65 +441,17 @@ def get_themes_for_selection(request):
 @user_passes_test(is_rank_manager)
 def people_list(request):
     """Unified view to list both members and children for rank management"""
-    from Members.models import Child
-
     query = request.GET.get('q', '')
     person_type = request.GET.get('type', 'all')
 
-    people = []
-
-    # Get members
-    if person_type in ['all', 'members']:
-        if query:
-            members = Member.objects.filter(
-                Q(user__first_name__icontains=query) |
-                Q(user__last_name__icontains=query) |
-                Q(user__email__icontains=query) |
-                Q(user__username__icontains=query)
-            ).select_related('user')
-        else:
-            members = Member.objects.all().select_related('user')
-
-        for member in members:
-            try:
-                member.current_rank = member.rank_association
-            except:
-                member.current_rank = None
-            member.person_type = 'member'
-            member.display_name = member.get_ranked_name()
-            people.append(member)
-
-    # Get children
-    if person_type in ['all', 'children']:
-        if query:
-            children = Child.objects.filter(
-                Q(first_name__icontains=query) |
-                Q(last_name__icontains=query) |
-                Q(parent__user__first_name__icontains=query) |
-                Q(parent__user__last_name__icontains=query)
-            ).select_related('parent__user')
-        else:
-            children = Child.objects.all().select_related('parent__user')
-
-        for child in children:
-            try:
-                child.current_rank = child.child_rank_association
-            except:
-                child.current_rank = None
-            child.person_type = 'child'
-            child.display_name = child.get_ranked_name()
-            people.append(child)
-
-    # Sort by last name, then first name
-    people.sort(key=lambda p: (
-        p.user.last_name if hasattr(p, 'user') else p.last_name,
-        p.user.first_name if hasattr(p, 'user') else p.first_name
-    ))
-
-    # Pagination
-    paginator = Paginator(people, 20)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
+    # Sorted, filtered and paginated by the database (UNION of members and children)
+    page_obj = people_page(
+        query=query,
+        person_type=person_type,
+        after=request.GET.get('after'),
+        before=request.GET.get('before'),
+        per_page=20,
+    )
 
     return render(request, 'rank/people_list.html', {
         'page_obj': page_obj,
@@ -555,19 +492,19 @@ def person_rank_assign(request, person_type, person_id):
     if request.method == 'POST':
         form = form_class(request.POST, instance=rank_assignment)
         if form.is_valid():
-            rank_assignment = form.save(commit=False)
-            if person_type == 'member':
-                rank_assignment.member = person
-            else:
-                rank_assignment.child = person
-            rank_assignment.assigned_by = request.user
-            rank_assignment.save()
+            data = form.cleaned_data
+            bulk_assign_ranks(
+                [person], data['rank'], data.get('preferred_theme'), request.user,
+                effective_date=data.get('effective_date'), notes=data.get('notes', ''),
+            )
+            for cached in ('rank_association', 'child_rank_association'):
+                person._state.fields_cache.pop(cached, None)
             messages.success(request, f"Rank successfully assigned to {person.get_ranked_name()}")
             return redirect('rank:people_list')
     else:
         # If new person with no rank, use default rank from settings if available
         if not hasattr(person, 'rank_association' if person_type == 'member' else 'child_rank_association'):
-            settings = RankSettings.objects.first()
+            settings = RankSettings.get_cached()
             if settings and settings.default_paygrade:
                 form = form_class(instance=rank_assignment, initial={'rank': settings.default_paygrade})
             else:
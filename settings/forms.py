@@ -2,14 +2,11 @@ from django import forms
 from django.contrib.auth.models import Group, User
 
 from Members.models import Member
+from Members.widgets import MemberSearchSelect
 
 
 class MemberSelectForm(forms.Form):
-    member = forms.ModelChoiceField(queryset=Member.objects.select_related('user').all(), required=True, label='Select Member')
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['member'].widget.attrs.update({'class': 'form-select'})
+    member = forms.ModelChoiceField(queryset=Member.objects.all(), required=True, label='Select Member', widget=MemberSearchSelect())
 
 
 class MemberRolesForm(forms.Form):
@@ -0,0 +1,28 @@
+// Auto-refresh dashboard counters: elements with data-stat="members.pending" etc. are
+// updated from the JSON endpoint given on the script tag (data-stats-url).
+(function() {
+    const script = document.currentScript;
+    const url = script && script.dataset.statsUrl;
+    const interval = parseInt((script && script.dataset.interval) || '60', 10) * 1000;
+    if (!url) return;
+
+    function lookup(data, path) {
+        return path.split('.').reduce(function(obj, key) { return obj == null ? undefined : obj[key]; }, data);
+    }
+
+    function refresh() {
+        if (document.hidden) return;
+        fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(function(response) { return response.ok ? response.json() : null; })
+            .then(function(data) {
+                if (!data) return;
+                document.querySelectorAll('[data-stat]').forEach(function(el) {
+                    const value = lookup(data, el.dataset.stat);
+                    if (value !== undefined) el.textContent = value;
+                });
+            })
+            .catch(function() { /* keep the last values */ });
+    }
+
+    setInterval(refresh, interval);
+})();
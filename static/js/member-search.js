@@ -0,0 +1,86 @@
+// Typeahead for member pickers rendered by Members.widgets.MemberSearchSelect(Multiple).
+// The <select> only ships the selected member(s); matches are fetched from the search endpoint.
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('select[data-member-search]').forEach(function(select) {
+        const url = select.dataset.memberSearch;
+        const input = document.createElement('input');
+        input.type = 'search';
+        input.className = 'form-control form-control-sm mb-1';
+        input.placeholder = 'Search members...';
+        input.setAttribute('aria-label', 'Search members');
+        select.parentNode.insertBefore(input, select);
+        if (select.multiple && !select.getAttribute('size')) {
+            select.size = 8;
+        }
+
+        let timer = null;
+        let controller = null;
+        let page = 1;
+        let moreOption = null;
+        let previous = select.value;
+
+        function clearUnselected() {
+            Array.from(select.options).forEach(function(opt) {
+                if (!opt.selected && opt.value !== '') {
+                    opt.remove();
+                }
+            });
+            if (moreOption) {
+                moreOption.remove();
+                moreOption = null;
+            }
+        }
+
+        function addResults(data) {
+            const present = new Set(Array.from(select.options).map(function(opt) { return opt.value; }));
+            data.results.forEach(function(member) {
+                if (present.has(String(member.id))) return;
+                const opt = document.createElement('option');
+                opt.value = member.id;
+                opt.textContent = member.text + (member.email ? ' (' + member.email + ')' : '');
+                select.appendChild(opt);
+            });
+            if (data.has_more) {
+                moreOption = document.createElement('option');
+                moreOption.value = '__more__';
+                moreOption.textContent = 'Load more...';
+                select.appendChild(moreOption);
+            }
+        }
+
+        function search(query, nextPage) {
+            if (controller) controller.abort();
+            controller = new AbortController();
+            page = nextPage || 1;
+            const params = new URLSearchParams({q: query, page: page});
+            fetch(url + '?' + params.toString(), {signal: controller.signal, headers: {'X-Requested-With': 'XMLHttpRequest'}})
+                .then(function(response) { return response.json(); })
+                .then(function(data) {
+                    if (page === 1) {
+                        clearUnselected();
+                    } else if (moreOption) {
+                        moreOption.remove();
+                        moreOption = null;
+                    }
+                    addResults(data);
+                })
+                .catch(function() { /* aborted or network error: keep current options */ });
+        }
+
+        input.addEventListener('input', function() {
+            clearTimeout(timer);
+            const query = input.value.trim();
+            timer = setTimeout(function() { search(query); }, 250);
+        });
+
+        select.addEventListener('change', function() {
+            if (moreOption && moreOption.selected) {
+                moreOption.selected = false;
+                if (!select.multiple) select.value = previous;
+                search(input.value.trim(), page + 1);
+                return;
+            }
+            previous = select.value;
+        });
+    });
+});
@@ -6,5 +6,5 @@ class UnitsConfig(AppConfig):
     name = 'units'
 
     def ready(self):
-        # Place for signals in the future
-        pass
+        # Keep materialized unit paths and the org chart cache current
+        from . import signals  # noqa: F401
@@ -2,6 +2,7 @@ from django import forms
 from django.core.exceptions import ValidationError
 
 from Members.models import Member
+from Members.widgets import MemberSearchSelect
 from .models import Unit, UnitMembership, Position, Department, DepartmentMembership
 
 
@@ -9,12 +10,9 @@ class ChangeCommanderForm(forms.ModelForm):
     class Meta:
         model = Unit
         fields = ['commanding_officer']
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Limit dropdown to active members (if Member has is_active) or all members
-        # Ensure select has bootstrap styling
-        self.fields['commanding_officer'].widget.attrs.update({'class': 'form-select'})
+        widgets = {
+            'commanding_officer': MemberSearchSelect(),
+        }
 
 
 class UnitForm(forms.ModelForm):
@@ -28,6 +26,7 @@ class UnitForm(forms.ModelForm):
         ]
         widgets = {
             'type': forms.Select(attrs={'class': 'form-select'}),
+            'commanding_officer': MemberSearchSelect(),
         }
 
     def __init__(self, *args, **kwargs):
@@ -40,13 +39,17 @@ class UnitForm(forms.ModelForm):
             base = 'form-control'
             if name in ('type', 'parent', 'commanding_officer'):
                 base = 'form-select'
-            field.widget.attrs['class'] = (css + ' ' + base).strip()
+            if base not in css.split():
+                field.widget.attrs['class'] = (css + ' ' + base).strip()
 
 
 class AddMemberForm(forms.ModelForm):
     class Meta:
         model = UnitMembership
         fields = ['member']
+        widgets = {
+            'member': MemberSearchSelect(),
+        }
 
     def __init__(self, *args, **kwargs):
         unit: Unit = kwargs.pop('unit')
@@ -62,8 +65,6 @@ class AddMemberForm(forms.ModelForm):
         # Only members not already active in this unit
         existing_ids = unit.memberships.filter(is_active=True).values_list('member_id', flat=True)
         self.fields['member'].queryset = Member.objects.exclude(id__in=existing_ids)
-        # Nice default styling
-        self.fields['member'].widget.attrs.update({'class': 'form-select'})
 
     def save(self, commit=True):
         obj: UnitMembership = super().save(commit=False)
@@ -185,6 +186,9 @@ class AddDepartmentStaffForm(forms.ModelForm):
     class Meta:
         model = DepartmentMembership
         fields = ['member']
+        widgets = {
+            'member': MemberSearchSelect(),
+        }
 
     def __init__(self, *args, **kwargs):
         self.department: Department = kwargs.pop('department')
@@ -192,8 +196,6 @@ class AddDepartmentStaffForm(forms.ModelForm):
         # Only members not already active in this department
         existing_ids = self.department.memberships.filter(is_active=True).values_list('member_id', flat=True)
         self.fields['member'].queryset = Member.objects.exclude(id__in=list(existing_ids))
-        # Bootstrap
-        self.fields['member'].widget.attrs.update({'class': 'form-select'})
 
     def save(self, commit=True):
         obj: DepartmentMembership = super().save(commit=False)
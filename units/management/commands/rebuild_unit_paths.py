@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from units.models import Unit
+
+
+class Command(BaseCommand):
+    help = 'Rebuild (or with --verify, only check) the materialized unit hierarchy paths.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true', help='Report mismatched paths without changing anything')
+
+    def handle(self, *args, **options):
+        expected, cyclic = Unit.expected_paths()
+        current = dict(Unit.objects.values_list('id', 'path'))
+        stale = {uid: path for uid, path in expected.items() if current.get(uid) != path}
+
+        for uid in sorted(cyclic):
+            self.stdout.write(self.style.WARNING(f"Unit {uid} is part of a parent cycle"))
+
+        if options['verify']:
+            for uid, path in sorted(stale.items()):
+                self.stdout.write(f"Unit {uid}: stored '{current.get(uid)}', expected '{path}'")
+            if stale or cyclic:
+                raise CommandError(f"{len(stale)} unit path(s) out of date, {len(cyclic)} unit(s) in cycles")
+            self.stdout.write(self.style.SUCCESS(f"All {len(expected)} unit paths are consistent."))
+            return
+
+        with transaction.atomic():
+            units = [Unit(pk=uid, path=path) for uid, path in stale.items()]
+            Unit.objects.bulk_update(units, ['path'], batch_size=500)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(stale)} of {len(expected)} unit paths."))
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 00:50
+
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    Unit = apps.get_model('units', 'Unit')
+    parents = dict(Unit.objects.values_list('id', 'parent_id'))
+    for unit_id in parents:
+        chain, current = [], unit_id
+        while current is not None and current not in chain:
+            chain.append(current)
+            current = parents.get(current)
+        path = '/' + '/'.join(str(i) for i in reversed(chain)) + '/'
+        Unit.objects.filter(pk=unit_id).update(path=path)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('units', '0008_merge_0002_departments_0007_position_special_staff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:31
+
+import Members.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('units', '0009_unit_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='unit',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='unit',
+            name='image',
+            field=models.ImageField(blank=True, null=True, upload_to='unit_images/', validators=[Members.validators.validate_image_size, Members.validators.validate_image_content]),
+        ),
+    ]
@@ -1,8 +1,11 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, Length, Substr
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
 from Members.models import Member
+from Members.validators import validate_image_content, validate_image_size
 
 
 class Unit(models.Model):
@@ -28,6 +31,9 @@ class Unit(models.Model):
 
     # hierarchy
     parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='children')
+    # Materialized path of ids from the root down to this unit, e.g. "/1/5/12/".
+    # Maintained by save() and the post_delete signal; see rebuild_unit_paths.
+    path = models.CharField(max_length=255, blank=True, default='', editable=False, db_index=True)
 
     # contact/location
     street_address = models.CharField(max_length=255, blank=True)
@@ -42,7 +48,10 @@ class Unit(models.Model):
     commanding_officer = models.ForeignKey(Member, null=True, blank=True, on_delete=models.SET_NULL, related_name='units_commanded')
 
     # assets
-    image = models.ImageField(upload_to='unit_images/', null=True, blank=True)
+    image = models.ImageField(upload_to='unit_images/', null=True, blank=True,
+                              validators=[validate_image_size, validate_image_content])
+    # Resized copies of image, built by the build_image_variants worker (see MCARS.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     created_at = models.DateTimeField(default=timezone.now)
 
@@ -54,6 +63,8 @@ class Unit(models.Model):
 
     def clean(self):
         """Enforce hierarchy business rules for allowed parents based on type."""
+        if self.pk and self.parent_id and self.pk in self.path_ids(self._parent_path()):
+            raise ValidationError({'parent': 'A unit cannot be subordinate to itself or one of its subordinates.'})
         if self.type == self.TYPE_FLEET_COMMANDER:
             if self.parent is not None:
                 raise ValidationError({'parent': 'Fleet Commander cannot have a parent.'})
@@ -90,6 +101,80 @@ class Unit(models.Model):
     def get_display_name(self):
         return f"{self.name} ({self.hull})" if self.hull else self.name
 
+    # ---------------- Hierarchy ----------------
+
+    @staticmethod
+    def path_ids(path):
+        """Return the unit ids encoded in a materialized path, root first."""
+        return [int(part) for part in path.split('/') if part]
+
+    @classmethod
+    def expected_paths(cls):
+        """Compute every unit's path from the parent links.
+
+        Returns (paths, cyclic_ids); units caught in a parent cycle are rooted at the
+        first repeated unit so they still get a usable path.
+        """
+        parents = dict(cls.objects.values_list('id', 'parent_id'))
+        paths, cyclic = {}, set()
+        for unit_id in parents:
+            chain, current = [], unit_id
+            while current is not None and current not in chain:
+                chain.append(current)
+                current = parents.get(current)
+            if current is not None:
+                cyclic.add(unit_id)
+            paths[unit_id] = '/' + '/'.join(str(i) for i in reversed(chain)) + '/'
+        return paths, cyclic
+
+    def _parent_path(self):
+        if not self.parent_id:
+            return '/'
+        return Unit.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or '/'
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent' not in update_fields:
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            parent_path = self._parent_path()
+            if self.pk in self.path_ids(parent_path):
+                raise ValueError('A unit cannot be subordinate to itself or one of its subordinates.')
+            new_path = f"{parent_path}{self.pk}/"
+            old_path = Unit.objects.filter(pk=self.pk).values_list('path', flat=True).first()
+            if old_path != new_path:
+                Unit.objects.filter(pk=self.pk).update(path=new_path)
+                if old_path:
+                    # Re-root the whole subtree with one UPDATE
+                    Unit.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+                        path=Concat(Value(new_path), Substr('path', len(old_path) + 1))
+                    )
+            self.path = new_path
+
+    def _loaded_path(self):
+        if not self.path and self.pk:
+            self.path = Unit.objects.filter(pk=self.pk).values_list('path', flat=True).first() or ''
+        return self.path or f"/{self.pk}/"
+
+    def descendants(self, include_self=False):
+        """All subordinate units at any depth (one indexed prefix query)."""
+        qs = Unit.objects.filter(path__startswith=self._loaded_path())
+        return qs if include_self else qs.exclude(pk=self.pk)
+
+    def ancestors(self, include_self=False):
+        """Superior units ordered from the root down (one primary-key query)."""
+        ids = self.path_ids(self._loaded_path())
+        if not include_self:
+            ids = ids[:-1]
+        return Unit.objects.filter(pk__in=ids).order_by(Length('path'))
+
+    def ancestor_of_type(self, type_const, include_self=True):
+        """Return the nearest unit of the given type up the chain (including this unit by default)."""
+        if include_self and self.type == type_const:
+            return self
+        return self.ancestors().filter(type=type_const).order_by(Length('path').desc()).first()
+
 
 class Position(models.Model):
     unit = models.ForeignKey(Unit, on_delete=models.CASCADE, related_name='positions')
@@ -0,0 +1,55 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Value
+from django.db.models.functions import Concat, StrIndex, Substr
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from MCARS.images import track_image_variants, variants_built
+from Members.models import Member
+from rank.models import MemberRank, Rank, RankSettings
+from .models import Unit
+from .utils import bump_hierarchy_version
+
+track_image_variants(Unit, 'image', 'image_variants')
+
+
+@receiver(post_delete, sender=Unit)
+def detach_unit_subtree(sender, instance, **kwargs):
+    """Drop a deleted unit from the materialized paths of its former subtree.
+
+    parent is SET_NULL, so direct children become roots without save() running;
+    every path containing "/<id>/" is cut to start after that segment.
+    """
+    segment = f"/{instance.pk}/"
+    Unit.objects.filter(path__contains=segment).update(
+        path=Concat(Value('/'), Substr('path', StrIndex('path', Value(segment)) + len(segment)))
+    )
+
+
+@receiver(post_save, sender=Unit)
+@receiver(post_delete, sender=Unit)
+@receiver(post_delete, sender=Member)
+@receiver(post_save, sender=MemberRank)
+@receiver(post_delete, sender=MemberRank)
+@receiver(post_save, sender=Rank)
+@receiver(post_delete, sender=Rank)
+@receiver(post_save, sender=RankSettings)
+def invalidate_org_chart(sender, **kwargs):
+    """Bump the hierarchy version (and so the cached org chart) once the change is committed"""
+    transaction.on_commit(bump_hierarchy_version)
+
+
+@receiver(post_save, sender=User)
+def invalidate_org_chart_for_co(sender, instance, update_fields=None, **kwargs):
+    """A commanding officer's name change shows up on the org chart"""
+    if update_fields is not None and set(update_fields) <= {'last_login', 'password'}:
+        return
+    if Unit.objects.filter(commanding_officer__user_id=instance.pk).exists():
+        transaction.on_commit(bump_hierarchy_version)
+
+
+@receiver(variants_built, sender=Unit)
+def invalidate_org_chart_images(sender, **kwargs):
+    """The org chart links unit image variants once they exist"""
+    bump_hierarchy_version()
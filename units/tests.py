@@ -0,0 +1,115 @@
+from io import StringIO
+
+from django.core.exceptions import ValidationError
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from .models import Unit
+
+
+class UnitHierarchyTests(TestCase):
+    def setUp(self):
+        def unit(name, unit_type, parent=None):
+            return Unit.objects.create(name=name, type=unit_type, parent=parent)
+
+        self.fleet = unit('Fleet', Unit.TYPE_FLEET_COMMANDER)
+        self.hq = unit('HQ', Unit.TYPE_HQ, self.fleet)
+        self.alpha = unit('Alpha', Unit.TYPE_QUADRANT, self.hq)
+        self.beta = unit('Beta', Unit.TYPE_QUADRANT, self.hq)
+        self.sector = unit('Sector', Unit.TYPE_SECTOR, self.alpha)
+        self.ship = unit('Ship', Unit.TYPE_SHIP, self.sector)
+        self.shuttle = unit('Shuttle', Unit.TYPE_SHUTTLE, self.ship)
+        self.other_ship = unit('Other Ship', Unit.TYPE_SHIP, self.beta)
+
+    def walk_ancestors(self, unit):
+        """Ancestor ids root first, following parent pointers"""
+        parents = dict(Unit.objects.values_list('id', 'parent_id'))
+        chain, current = [], parents[unit.pk]
+        while current is not None:
+            chain.append(current)
+            current = parents[current]
+        return chain[::-1]
+
+    def walk_descendants(self, unit):
+        children = {}
+        for uid, parent_id in Unit.objects.values_list('id', 'parent_id'):
+            children.setdefault(parent_id, []).append(uid)
+        found, stack = set(), [unit.pk]
+        while stack:
+            for child_id in children.get(stack.pop(), ()):
+                found.add(child_id)
+                stack.append(child_id)
+        return found
+
+    def assertTreeConsistent(self):
+        for unit in Unit.objects.all():
+            with self.subTest(unit=unit.name):
+                self.assertEqual(list(unit.ancestors().values_list('id', flat=True)), self.walk_ancestors(unit))
+                self.assertEqual(set(unit.descendants().values_list('id', flat=True)), self.walk_descendants(unit))
+        call_command('rebuild_unit_paths', verify=True, stdout=StringIO())
+
+    def test_paths_follow_the_parent_links(self):
+        self.ship.refresh_from_db()
+        self.assertEqual(
+            self.ship.path, f'/{self.fleet.pk}/{self.hq.pk}/{self.alpha.pk}/{self.sector.pk}/{self.ship.pk}/'
+        )
+        self.assertEqual(self.shuttle.ancestor_of_type(Unit.TYPE_QUADRANT), self.alpha)
+        self.assertTreeConsistent()
+
+    def test_moving_a_subtree_re_roots_every_descendant(self):
+        self.sector.parent = self.beta
+        self.sector.save()
+
+        self.shuttle.refresh_from_db()
+        self.assertTrue(self.shuttle.path.startswith(f'/{self.fleet.pk}/{self.hq.pk}/{self.beta.pk}/{self.sector.pk}/'))
+        self.assertEqual(self.shuttle.ancestor_of_type(Unit.TYPE_QUADRANT), self.beta)
+        self.assertEqual(
+            set(self.beta.descendants().values_list('id', flat=True)),
+            {self.sector.pk, self.ship.pk, self.shuttle.pk, self.other_ship.pk},
+        )
+        self.assertFalse(self.alpha.descendants().exists())
+        self.assertTreeConsistent()
+
+    def test_saving_without_moving_leaves_paths_alone(self):
+        path = Unit.objects.get(pk=self.shuttle.pk).path
+        self.sector.name = 'Renamed'
+        self.sector.save()
+        self.sector.save(update_fields=['name'])
+
+        self.assertEqual(Unit.objects.get(pk=self.shuttle.pk).path, path)
+
+    def test_moving_a_unit_below_its_own_subtree_is_rejected(self):
+        paths = dict(Unit.objects.values_list('id', 'path'))
+        self.alpha.parent = self.ship
+
+        with self.assertRaises(ValidationError):
+            self.alpha.clean()
+        with self.assertRaises(ValueError):
+            self.alpha.save()
+
+        self.assertEqual(dict(Unit.objects.values_list('id', 'path')), paths)
+        self.assertEqual(Unit.objects.get(pk=self.alpha.pk).parent_id, self.hq.pk)
+
+    def test_deleting_a_mid_level_unit_detaches_its_subtree(self):
+        self.sector.delete()
+
+        self.ship.refresh_from_db()
+        self.shuttle.refresh_from_db()
+        self.assertIsNone(self.ship.parent_id)
+        self.assertEqual(self.ship.path, f'/{self.ship.pk}/')
+        self.assertEqual(self.shuttle.path, f'/{self.ship.pk}/{self.shuttle.pk}/')
+        self.assertEqual(list(self.shuttle.ancestors()), [self.ship])
+        self.assertEqual(set(self.alpha.descendants()), set())
+        self.assertTreeConsistent()
+
+    def test_rebuild_unit_paths_verifies_and_repairs(self):
+        Unit.objects.filter(pk=self.shuttle.pk).update(path='/stale/')
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_unit_paths', verify=True, stdout=StringIO())
+        self.assertEqual(Unit.objects.get(pk=self.shuttle.pk).path, '/stale/')
+
+        out = StringIO()
+        call_command('rebuild_unit_paths', stdout=out)
+        self.assertIn('Rebuilt 1 of 8', out.getvalue())
+        self.assertTreeConsistent()
@@ -0,0 +1,104 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+
+from MCARS.images import variant_url
+from rank.utils import RankResolver
+from .models import Unit
+
+
+HIERARCHY_VERSION_KEY = 'units:hierarchy_version'
+ORG_CHART_CACHE_KEY = 'units:org_chart:{version}'
+
+# Placeholder id used to reverse each URL pattern once instead of once per unit
+_URL_ID = 987654321
+
+
+def hierarchy_version():
+    """Return the current unit hierarchy version stamp"""
+    version = cache.get(HIERARCHY_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted stamp never reuses an old version
+        cache.add(HIERARCHY_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(HIERARCHY_VERSION_KEY)
+    return version
+
+
+def bump_hierarchy_version():
+    """Invalidate everything cached against the unit hierarchy"""
+    try:
+        cache.incr(HIERARCHY_VERSION_KEY)
+    except ValueError:
+        cache.set(HIERARCHY_VERSION_KEY, time.time_ns(), None)
+
+
+def _url_builder(name):
+    pattern = reverse(name, args=[_URL_ID])
+    return lambda pk: pattern.replace(str(_URL_ID), str(pk))
+
+
+def build_org_chart():
+    """Build the org chart as {'roots': [...], 'units_json': str}.
+
+    All units and their commanding officers are fetched together, COs get
+    their ranked names resolved in bulk, and the tree is assembled in memory.
+    Each node is a plain dict with a 'children' list, so the result is cached
+    per hierarchy version and the templates render it without queries.
+    """
+    key = ORG_CHART_CACHE_KEY.format(version=hierarchy_version())
+    chart = cache.get(key)
+    if chart is not None:
+        return chart
+
+    units = list(Unit.objects.select_related('commanding_officer__user').order_by('type', 'name'))
+    RankResolver().resolve(u.commanding_officer for u in units)
+
+    public_url = _url_builder('units:unit_public')
+    detail_url = _url_builder('units:unit_detail')
+    member_url = _url_builder('members:member_detail')
+
+    nodes = {}
+    for u in units:
+        co = u.commanding_officer
+        nodes[u.id] = {
+            'id': u.id,
+            'name': u.get_display_name(),
+            'short_name': u.name,
+            'hull': u.hull or '',
+            'type': u.get_type_display(),
+            'type_code': u.type,
+            'city': u.city or '',
+            'state': u.state or '',
+            'country': u.country or '',
+            'email': u.email or '',
+            'parent_id': u.parent_id,
+            'public_url': public_url(u.id),
+            'detail_url': detail_url(u.id),
+            'image_url': variant_url(u.image, 'medium'),
+            'thumb_url': variant_url(u.image, 'small'),
+            'co_id': (co.id if co else None),
+            'co_name': (co.get_ranked_name() if co else ''),
+            'co_url': (member_url(co.id) if co else ''),
+        }
+
+    roots = []
+    children = {}
+    for u in units:
+        if u.parent_id in nodes:
+            children.setdefault(u.parent_id, []).append(nodes[u.id])
+        else:
+            roots.append(nodes[u.id])
+
+    chart = {
+        # Serialize before attaching children so each unit appears once, flat
+        'units_json': json.dumps(list(nodes.values())),
+        'roots': roots,
+    }
+    for unit_id, node in nodes.items():
+        node['children'] = children.get(unit_id, [])
+
+    cache.set(key, chart, settings.ORG_CHART_CACHE_TTL)
+    return chart
@@ -1,15 +1,15 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, render, redirect
-from django.urls import reverse
-import json
 
+from Members.roles import get_roles
+from .utils import build_org_chart
 from .models import Unit, UnitMembership, Position, Department, DepartmentMembership
 from .forms import AddMemberForm, AssignPositionForm, PositionForm, UnitForm, ChangeCommanderForm, DepartmentForm, AddDepartmentStaffForm
 
 
 def is_unit_manager(user):
-    return user.is_staff or user.groups.filter(name='unit_manager').exists()
+    return get_roles(user).is_unit_manager
 
 
 def can_manage_unit(user, unit: Unit):
@@ -23,58 +23,28 @@ def can_manage_unit(user, unit: Unit):
     return False
 
 
+def _unit_page_queryset():
+    return Unit.objects.select_related('commanding_officer__user', 'parent').prefetch_related(
+        'children__commanding_officer__user',
+        'departments__leader__user',
+        'departments__memberships__member__user',
+    )
+
+
 @login_required
 def unit_list(request):
-    units = Unit.objects.all().select_related('commanding_officer')
+    units = Unit.objects.all().select_related('commanding_officer__user')
     return render(request, 'units/unit_list.html', {'units': units, 'title': 'Units'})
 
 
 def unit_org_chart(request):
     """Read-only organizational chart with filtering/sorting and chain-of-command navigation."""
-    # Roots are units without a parent (typically Fleet Commander)
-    roots = (
-        Unit.objects.filter(parent__isnull=True)
-        .select_related('commanding_officer')
-        .prefetch_related('children__commanding_officer', 'children__children__commanding_officer')
-        .order_by('type', 'name')
-    )
-
-    # Build lightweight dicts for client-side chain-of-command and flat list rendering
-    all_units = (
-        Unit.objects.all()
-        .select_related('commanding_officer', 'parent')
-        .only(
-            'id', 'name', 'hull', 'type', 'city', 'state', 'country', 'email', 'image', 'parent_id', 'commanding_officer__id'
-        )
-        .order_by('type', 'name')
-    )
-
-    def unit_to_dict(u: Unit):
-        return {
-            'id': u.id,
-            'name': u.get_display_name(),
-            'short_name': u.name,
-            'hull': u.hull or '',
-            'type': u.get_type_display(),
-            'type_code': u.type,
-            'city': u.city or '',
-            'state': u.state or '',
-            'country': u.country or '',
-            'email': u.email or '',
-            'parent_id': u.parent_id,
-            'public_url': reverse('units:unit_public', args=[u.id]),
-            'detail_url': reverse('units:unit_detail', args=[u.id]),
-            'image_url': (u.image.url if u.image else ''),
-            'co_id': (u.commanding_officer.id if u.commanding_officer else None),
-            'co_name': (u.commanding_officer.get_ranked_name() if u.commanding_officer else ''),
-            'co_url': (reverse('members:member_detail', args=[u.commanding_officer.id]) if u.commanding_officer else ''),
-        }
-
-    units_data = [unit_to_dict(u) for u in all_units]
-
+    chart = build_org_chart()
+    user = request.user
     context = {
-        'roots': roots,
-        'units_json': json.dumps(units_data),
+        'roots': chart['roots'],
+        'units_json': chart['units_json'],
+        'can_see_internal': user.is_authenticated and (user.is_superuser or is_unit_manager(user)),
         'title': 'Organizational Chart',
     }
     return render(request, 'units/unit_org_chart.html', context)
@@ -82,12 +52,9 @@ def unit_org_chart(request):
 
 @login_required
 def unit_detail(request, pk):
-    unit = get_object_or_404(
-        Unit.objects.select_related('commanding_officer', 'parent').prefetch_related('children__commanding_officer'),
-        pk=pk
-    )
-    positioned = UnitMembership.objects.filter(unit=unit, is_active=True, position__isnull=False).select_related('member', 'position')
-    unpositioned = UnitMembership.objects.filter(unit=unit, is_active=True, position__isnull=True).select_related('member')
+    unit = get_object_or_404(_unit_page_queryset(), pk=pk)
+    positioned = list(UnitMembership.objects.filter(unit=unit, is_active=True, position__isnull=False).select_related('member__user', 'position'))
+    unpositioned = list(UnitMembership.objects.filter(unit=unit, is_active=True, position__isnull=True).select_related('member__user'))
     context = {
         'unit': unit,
         'positioned_members': positioned,
@@ -98,11 +65,8 @@ def unit_detail(request, pk):
 
 def unit_public(request, pk):
     """Public, read-only profile view for units."""
-    unit = get_object_or_404(
-        Unit.objects.select_related('commanding_officer', 'parent').prefetch_related('children__commanding_officer'),
-        pk=pk
-    )
-    positioned = UnitMembership.objects.filter(unit=unit, is_active=True, position__isnull=False).select_related('member', 'position')
+    unit = get_object_or_404(_unit_page_queryset(), pk=pk)
+    positioned = list(UnitMembership.objects.filter(unit=unit, is_active=True, position__isnull=False).select_related('member__user', 'position'))
     # Public profile won't list unpositioned crewmembers to keep it concise
     context = {
         'unit': unit,